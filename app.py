@@ -1,577 +1,3704 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from werkzeug.utils import secure_filename
-import os
-import logging
-import requests
-import uuid
-from datetime import datetime, timezone, timedelta
-import json
-import io
-import threading
-import pandas as pd
-import numpy as np
-import skfuzzy as fuzz
-import pdfplumber
-
-PYTESSERACT_AVAILABLE = False
-try:
-    import pytesseract
-    from PIL import Image, ImageFilter, ImageEnhance
-    pytesseract.get_tesseract_version()
-    PYTESSERACT_AVAILABLE = True
-except Exception:
-    pass
-
-EASYOCR_AVAILABLE = False
-EASY_OCR_READER = None
-try:
-    import easyocr
-    EASYOCR_AVAILABLE = True
-except Exception:
-    pass
-
-app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s — %(message)s",
-)
-logger = logging.getLogger(__name__)
-logger.info(
-    "OCR availability — pytesseract: %s | easyocr: %s",
-    PYTESSERACT_AVAILABLE, EASYOCR_AVAILABLE
-)
-
-ALLOWED_EXTENSIONS    = {"pdf", "doc", "docx", "txt"}
-MAX_FILE_SIZE         = 20 * 1024 * 1024
-MIN_EMBEDDED_TEXT_LEN = 50
-SESSION_TTL_MINUTES   = 60
-
-N8N_WEBHOOK_URL = os.environ.get(
-    "N8N_WEBHOOK_URL",
-    "http://localhost:5678/webhook-test/a6fdd077-5e86-4d4f-bebf-7178962fb86e",
-)
-
-
-_store: dict = {}
-_store_lock = threading.Lock()
-
-
-def _store_set(session_id: str, payload: dict) -> None:
-    now = datetime.now(timezone.utc)
-    with _store_lock:
-        entry = _store.get(session_id, {})
-        entry.update(payload)
-        entry.setdefault("created_at", now)
-        entry["updated_at"] = now
-        _store[session_id] = entry
-
-
-def _store_get(session_id: str) -> dict | None:
-    with _store_lock:
-        return _store.get(session_id)
-
-
-def _purge_expired_sessions() -> None:
-    cutoff = datetime.now(timezone.utc) - timedelta(minutes=SESSION_TTL_MINUTES)
-    with _store_lock:
-        expired = [
-            sid for sid, v in _store.items()
-            if v.get("created_at", datetime.now(timezone.utc)) < cutoff
-        ]
-        for sid in expired:
-            del _store[sid]
-    if expired:
-        logger.info("Purged %d expired session(s)", len(expired))
-
-
-
-def classify_admission(text) -> str:
-    """
-    Reads the Academic admission requirements text for one program.
-    Returns: "Strict" | "Moderate" | "Lenient"
-    """
-    if pd.isna(text):
-        return "Lenient"
-    t = str(text).lower()
-
-    strict_keywords = [
-        "excellent academic record", "outstanding academic record",
-        "excellent performance", "outstanding performance",
-        "above-average performance", "above-average academic",
-        "top 10", "top 5", "top students",
-        "highly competitive", "limited number of places",
-        "limited number of seats", "limited capacity",
-        "selection committee", "selection based on",
-        "prior research experience", "research experience is required",
-        "first-class degree", "honours degree", "honors degree",
-        "restricted admission", "numerus clausus",
-        "must have successfully completed"
-    ]
-    for kw in strict_keywords:
-        if kw in t:
-            return "Strict"
-
-    moderate_keywords = [
-        "bachelor's degree in", "bachelors degree in", "bachelor degree in",
-        "relevant bachelor's degree", "relevant degree in",
-        "related field", "related discipline", "background in",
-        "minimum grade", "grade of at least", "overall grade",
-        "good academic standing", "ielts", "toefl",
-        "letter of motivation", "statement of purpose",
-        "letter of recommendation", "applicants must hold",
-        "admission requires", "admission requirement"
-    ]
-    for kw in moderate_keywords:
-        if kw in t:
-            return "Moderate"
-
-    lenient_keywords = [
-        "graduates from all disciplines",
-        "open to graduates of any discipline",
-        "no specific background", "no specific degree",
-        "completed undergraduate degree", "first academic degree",
-        "university degree in any discipline"
-    ]
-    for kw in lenient_keywords:
-        if kw in t:
-            return "Lenient"
-
-    return "Lenient"
-
-
-def load_daad_dataset(path: str = "DAAD_Dataset_Cleaned.csv") -> pd.DataFrame:
-    logger.info("Loading DAAD dataset from: %s", path)
-    df = pd.read_csv(path, encoding="utf-8")
-    df.columns = [c.strip() for c in df.columns]
-    df = df.drop_duplicates()
-
-    for col in ["Tuition fees per semester in EUR", "Semester contribution",
-                "Contribution per semester", "Total contribution"]:
-        if col in df.columns:
-            df[col] = (
-                df[col].astype(str)
-                       .str.replace(".", "", regex=False)
-                       .str.extract("([0-9]+)", expand=False)
-            )
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    df["Teaching language"] = df["Teaching language"].astype(str).str.lower().str.strip()
-
-    keep_cols = [
-        "Course ID", "University", "Programme", "Degree",
-        "Teaching language", "City", "Duration_in_semesters",
-        "Tuition fees per semester in EUR", "Contribution per semester",
-        "Total contribution", "Academic admission requirements",
-        "Description/content", "Master", "Bachelor", "PhD"
-    ]
-    df = df[[c for c in keep_cols if c in df.columns]]
-
-    df["admission_strictness"] = df["Academic admission requirements"].apply(classify_admission)
-    df["admission_strictness_score"] = df["admission_strictness"].map(
-        {"Lenient": 0.3, "Moderate": 0.6, "Strict": 0.9}
-    )
-
-    logger.info("Dataset loaded: %d programs", len(df))
-    return df
-
-
-
-df_daad = load_daad_dataset("DAAD_Dataset_Cleaned.csv")
-
-
-def run_fuzzy_model(cgpa: float, test_score: float, admission_strictness: float) -> float:
-    """
-    Inputs:
-      cgpa                 — 0 to 10 scale
-      test_score           — IELTS band (0–9). Converted internally to 0–120.
-      admission_strictness — 0.3 (Lenient) | 0.6 (Moderate) | 0.9 (Strict)
-
-    Output:
-      suitability_score — float between 0 and 1
-    """
-
-
-    if test_score <= 9:
-        test_score = test_score * (120 / 9)
-
-   
-    x_cgpa        = np.linspace(0, 10,  100)
-    x_test        = np.linspace(0, 120, 100)
-    x_strict      = np.linspace(0, 1,   100)
-    x_suitability = np.linspace(0, 1,   100)
-
-   
-    cgpa_low  = fuzz.trimf(x_cgpa, [0,   0,   6.5])
-    cgpa_med  = fuzz.trimf(x_cgpa, [5,   7,   9  ])
-    cgpa_high = fuzz.trimf(x_cgpa, [7.5, 10,  10 ])
-
-   
-    test_weak   = fuzz.trimf(x_test, [0,   0,   85 ])
-    test_avg    = fuzz.trimf(x_test, [80,  100, 110])
-    test_strong = fuzz.trimf(x_test, [105, 120, 120])
-
-
-    strict_lenient = fuzz.trimf(x_strict, [0,   0,   0.4])
-    strict_mod     = fuzz.trimf(x_strict, [0.3, 0.5, 0.7])
-    strict_strict  = fuzz.trimf(x_strict, [0.6, 1,   1  ])
-
-    
-    suit_low  = fuzz.trimf(x_suitability, [0,   0,   0.4])
-    suit_med  = fuzz.trimf(x_suitability, [0.3, 0.5, 0.7])
-    suit_high = fuzz.trimf(x_suitability, [0.6, 1,   1  ])
-
-   
-    cgpa_l = fuzz.interp_membership(x_cgpa, cgpa_low,  cgpa)
-    cgpa_m = fuzz.interp_membership(x_cgpa, cgpa_med,  cgpa)
-    cgpa_h = fuzz.interp_membership(x_cgpa, cgpa_high, cgpa)
-
-    test_w = fuzz.interp_membership(x_test, test_weak,   test_score)
-    test_a = fuzz.interp_membership(x_test, test_avg,    test_score)
-    test_s = fuzz.interp_membership(x_test, test_strong, test_score)
-
-    strict_l = fuzz.interp_membership(x_strict, strict_lenient, admission_strictness)
-    strict_m = fuzz.interp_membership(x_strict, strict_mod,     admission_strictness)
-    strict_s = fuzz.interp_membership(x_strict, strict_strict,  admission_strictness)
-
-  
- 
-
-       # High CGPA
-    r1  = np.fmin(np.fmin(np.fmin(cgpa_h, test_s), strict_s), suit_high)
-    r2  = np.fmin(np.fmin(np.fmin(cgpa_h, test_s), strict_m), suit_high)
-    r3  = np.fmin(np.fmin(np.fmin(cgpa_h, test_s), strict_l), suit_high)
-    r4  = np.fmin(np.fmin(np.fmin(cgpa_h, test_a), strict_s), suit_med)
-    r5  = np.fmin(np.fmin(np.fmin(cgpa_h, test_a), strict_m), suit_high)
-    r6  = np.fmin(np.fmin(np.fmin(cgpa_h, test_a), strict_l), suit_high)
-    r7  = np.fmin(np.fmin(np.fmin(cgpa_h, test_w), strict_s), suit_med)
-    r8  = np.fmin(np.fmin(np.fmin(cgpa_h, test_w), strict_m), suit_med)
-    r9  = np.fmin(np.fmin(np.fmin(cgpa_h, test_w), strict_l), suit_med)
-
-    # Medium CGPA
-    r10 = np.fmin(np.fmin(np.fmin(cgpa_m, test_s), strict_s), suit_med)
-    r11 = np.fmin(np.fmin(np.fmin(cgpa_m, test_s), strict_m), suit_med)
-    r12 = np.fmin(np.fmin(np.fmin(cgpa_m, test_s), strict_l), suit_high)
-    r13 = np.fmin(np.fmin(np.fmin(cgpa_m, test_a), strict_s), suit_low)
-    r14 = np.fmin(np.fmin(np.fmin(cgpa_m, test_a), strict_m), suit_med)
-    r15 = np.fmin(np.fmin(np.fmin(cgpa_m, test_a), strict_l), suit_med)
-    r16 = np.fmin(np.fmin(np.fmin(cgpa_m, test_w), strict_s), suit_low)
-    r17 = np.fmin(np.fmin(np.fmin(cgpa_m, test_w), strict_m), suit_low)
-    r18 = np.fmin(np.fmin(np.fmin(cgpa_m, test_w), strict_l), suit_med)
-
-    # Low CGPA
-    r19 = np.fmin(np.fmin(np.fmin(cgpa_l, test_s), strict_s), suit_low)
-    r20 = np.fmin(np.fmin(np.fmin(cgpa_l, test_s), strict_m), suit_low)
-    r21 = np.fmin(np.fmin(np.fmin(cgpa_l, test_s), strict_l), suit_med)
-    r22 = np.fmin(np.fmin(np.fmin(cgpa_l, test_a), strict_s), suit_low)
-    r23 = np.fmin(np.fmin(np.fmin(cgpa_l, test_a), strict_m), suit_low)
-    r24 = np.fmin(np.fmin(np.fmin(cgpa_l, test_a), strict_l), suit_low)
-    r25 = np.fmin(np.fmin(np.fmin(cgpa_l, test_w), strict_s), suit_low)
-    r26 = np.fmin(np.fmin(np.fmin(cgpa_l, test_w), strict_m), suit_low)
-    r27 = np.fmin(np.fmin(np.fmin(cgpa_l, test_w), strict_l), suit_low)
-
-    # Aggregate all 27
-    aggregated = r1
-    for r in [r2,r3,r4,r5,r6,r7,r8,r9,
-          r10,r11,r12,r13,r14,r15,r16,r17,r18,
-          r19,r20,r21,r22,r23,r24,r25,r26,r27]:
-        aggregated = np.fmax(aggregated, r)
-   
-    try:
-        final_score = fuzz.defuzz(x_suitability, aggregated, "centroid")
-    except Exception:
-        final_score = 0.0
-
-    return round(final_score, 3)
-
-
-
-def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
-
-
-def _preprocess_for_ocr(pil_img):
-    pil_img = pil_img.convert("L")
-    pil_img = pil_img.filter(ImageFilter.SHARPEN)
-    pil_img = ImageEnhance.Contrast(pil_img).enhance(2.0)
-    return pil_img
-
-
-def _run_pytesseract(page, page_num: int) -> str | None:
-    try:
-        img = page.to_image(resolution=400).original
-        img = _preprocess_for_ocr(img)
-        text = pytesseract.image_to_string(img, config="--psm 6")
-        if text and text.strip():
-            logger.info("pytesseract OK  page=%d  chars=%d", page_num, len(text.strip()))
-            return text.strip()
-    except Exception as exc:
-        logger.warning("pytesseract error page=%d: %s", page_num, exc)
-    return None
-
-
-def _run_easyocr(page, page_num: int) -> str | None:
-    global EASY_OCR_READER
-    try:
-        if EASY_OCR_READER is None:
-            logger.info("Initialising EasyOCR reader…")
-            EASY_OCR_READER = easyocr.Reader(["en"], gpu=False)
-        img = page.to_image(resolution=300).original.convert("RGB")
-        results = EASY_OCR_READER.readtext(np.array(img))
-        if results:
-            text = "\n".join(r[1] for r in results)
-            logger.info("EasyOCR OK  page=%d  chars=%d", page_num, len(text.strip()))
-            return text.strip()
-    except Exception as exc:
-        logger.warning("EasyOCR error page=%d: %s", page_num, exc)
-    return None
-
-
-def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
-    texts: list[str] = []
-    try:
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            logger.info("PDF opened: %d page(s)", len(pdf.pages))
-            for i, page in enumerate(pdf.pages, start=1):
-                page_text = None
-                try:
-                    page_text = page.extract_text()
-                except Exception as exc:
-                    logger.warning("pdfplumber error page=%d: %s", i, exc)
-
-                char_count = len(page_text.strip()) if page_text else 0
-                if page_text and char_count >= MIN_EMBEDDED_TEXT_LEN:
-                    texts.append(page_text.strip())
-                    continue
-
-                logger.info("Page %d — trying OCR…", i)
-                ocr_text = None
-                if PYTESSERACT_AVAILABLE:
-                    ocr_text = _run_pytesseract(page, i)
-                if not ocr_text and EASYOCR_AVAILABLE:
-                    ocr_text = _run_easyocr(page, i)
-                if ocr_text:
-                    texts.append(ocr_text)
-                else:
-                    logger.warning("Page %d — no text extracted", i)
-    except Exception as exc:
-        logger.exception("Failed to process PDF: %s", exc)
-
-    combined = "\n\n".join(texts).strip()
-    logger.info("Extraction complete: %d chars", len(combined))
-    return combined
-
-
-def _forward_to_n8n(session_id, file_bytes, filename, mimetype, preferences, parsed_text):
-    try:
-        logger.info("Forwarding to n8n — session=%s", session_id)
-        resp = requests.post(
-            N8N_WEBHOOK_URL,
-            files={"file": (filename, io.BytesIO(file_bytes), mimetype or "application/pdf")},
-            data={
-                "sessionId":   session_id,
-                "filename":    filename,
-                "preferences": json.dumps(preferences),
-                "parsedText":  parsed_text,
-            },
-            timeout=90,
-        )
-        if not resp.ok:
-            logger.warning("n8n returned %d: %s", resp.status_code, resp.text[:500])
-            _store_set(session_id, {"status": "failed", "error": f"n8n returned HTTP {resp.status_code}"})
-            return
-        try:
-            body = resp.json()
-            processed = (body.get("processedData") or body.get("parsedData")
-                         or body.get("data") or body.get("result"))
-            if processed:
-                _store_set(session_id, {"status": "completed", "data": processed})
-                return
-        except Exception:
-            pass
-        logger.info("n8n accepted — waiting for callback — session=%s", session_id)
-    except requests.exceptions.RequestException as exc:
-        logger.exception("n8n request failed — session=%s: %s", session_id, exc)
-        _store_set(session_id, {"status": "failed", "error": str(exc)})
-
-
-@app.route("/api/submit-preferences", methods=["POST"])
-def submit_preferences():
-    try:
-        content_length = request.content_length
-        if content_length and content_length > MAX_FILE_SIZE + 10_240:
-            return jsonify({"success": False, "error": "Request body too large."}), 413
-
-        session_id  = request.form.get("sessionId") or str(uuid.uuid4())
-        preferences = {
-            "fieldOfStudy":    request.form.get("fieldOfStudy"),
-            "degreeLevel":     request.form.get("degreeLevel"),
-            "location":        request.form.get("location"),
-            "courseLanguage":  request.form.get("courseLanguage"),
-            "additionalPrefs": request.form.get("additionalPrefs", ""),
-        }
-
-        resume_queued = False
-        if "resume" in request.files:
-            file = request.files["resume"]
-            if file and file.filename:
-                if not allowed_file(file.filename):
-                    return jsonify({"success": False, "error": "Invalid file type."}), 400
-                file.stream.seek(0)
-                file_bytes = file.read()
-                if len(file_bytes) > MAX_FILE_SIZE:
-                    return jsonify({"success": False, "error": "File exceeds 20 MB limit."}), 400
-                filename    = secure_filename(file.filename)
-                mimetype    = file.mimetype or "application/pdf"
-                parsed_text = extract_text_from_pdf_bytes(file_bytes)
-                _store_set(session_id, {"status": "processing", "data": None, "error": None})
-                threading.Thread(
-                    target=_forward_to_n8n,
-                    args=(session_id, file_bytes, filename, mimetype, preferences, parsed_text),
-                    daemon=True,
-                ).start()
-                resume_queued = True
-
-        if not resume_queued:
-            _store_set(session_id, {"status": "no_resume", "data": None, "error": None})
-
-        threading.Thread(target=_purge_expired_sessions, daemon=True).start()
-
-        return jsonify({
-            "success":      True,
-            "sessionId":    session_id,
-            "resumeQueued": resume_queued,
-            "message":      "Resume queued. Poll /api/status/<sessionId>."
-                            if resume_queued else "Preferences received. No resume uploaded.",
-        }), 202
-
-    except Exception as exc:
-        logger.exception("Error in /api/submit-preferences: %s", exc)
-        return jsonify({"success": False, "error": "Internal server error."}), 500
-
-
-@app.route("/api/status/<session_id>", methods=["GET"])
-def get_status(session_id: str):
-    entry = _store_get(session_id)
-    if entry is None:
-        return jsonify({"success": False, "status": "not_found", "message": "Unknown session ID."}), 404
-
-    status    = entry.get("status", "processing")
-    http_code = 200 if status in ("completed", "failed", "no_resume") else 202
-    return jsonify({
-        "success":   status == "completed",
-        "sessionId": session_id,
-        "status":    status,
-        "data":      entry.get("data"),
-        "error":     entry.get("error"),
-        "updatedAt": entry.get("updated_at", datetime.now(timezone.utc)).isoformat(),
-    }), http_code
-
-
-@app.route("/receive-extracted-data", methods=["POST"])
-def n8n_callback():
-    try:
-        data = request.get_json(force=True, silent=True) or {}
-        if not data:
-            raw = request.data.decode("utf-8", errors="replace")
-            try:
-                data = json.loads(raw)
-            except Exception:
-                data = {"raw": raw}
-
-        session_id = data.get("sessionId")
-        if not session_id:
-            return jsonify({"success": False, "error": "sessionId required"}), 400
-
-        processed = (data.get("processedData") or data.get("parsedData")
-                     or data.get("data") or data.get("result"))
-        _store_set(session_id, {"status": "completed", "data": processed, "error": None})
-        logger.info("n8n callback stored — session=%s", session_id)
-        return jsonify({"success": True}), 200
-
-    except Exception as exc:
-        logger.exception("n8n callback error: %s", exc)
-        return jsonify({"success": False, "error": "Internal server error."}), 500
-
-
-@app.route("/api/fuzzy-score", methods=["POST"])
-def fuzzy_score():
-    """
-    Called by n8n after extracting student details from resume.
-
-    Expected JSON body:
-    {
-        "cgpa":          8.5,
-        "ielts_score":   7.0,
-        "degree_filter": "Master"
-    }
-
-    Returns top 10 recommended programs sorted by suitability score.
-    """
-    try:
-        data = request.get_json(force=True, silent=True)
-        if not data:
-            return jsonify({"success": False, "error": "No JSON body received"}), 400
-
-        cgpa          = float(data.get("cgpa", 0))
-        test_score    = float(data.get("ielts_score", 0))
-        degree_filter = str(data.get("degree_filter", "Master")).strip()
-
-        # Filter by degree type
-        if degree_filter == "Master":
-            df_filtered = df_daad[df_daad["Master"] == 1].copy()
-        elif degree_filter == "Bachelor":
-            df_filtered = df_daad[df_daad["Bachelor"] == 1].copy()
-        elif degree_filter == "PhD":
-            df_filtered = df_daad[df_daad["PhD"] == 1].copy()
-        else:
-            df_filtered = df_daad.copy()
-
-        # Score every program in the filtered dataset
-        results = []
-        for _, row in df_filtered.iterrows():
-            score = run_fuzzy_model(
-                cgpa,
-                test_score,
-                float(row["admission_strictness_score"])
-            )
-            results.append({
-                "university":           row["University"],
-                "programme":            row["Programme"],
-                "degree":               row["Degree"],
-                "city":                 row["City"],
-                "suitability_score":    score,
-                "admission_strictness": row["admission_strictness"],
-                "tuition_fees":         row.get("Tuition fees per semester in EUR", "N/A"),
-            })
-
-        # Sort by score descending, return top 10
-        results = sorted(results, key=lambda x: x["suitability_score"], reverse=True)[:10]
-
-        return jsonify({"success": True, "recommendations": results}), 200
-
-    except Exception as e:
-        logger.exception("Fuzzy model error: %s", e)
-        return jsonify({"success": False, "error": str(e)}), 500
-
-
-@app.route("/api/health", methods=["GET"])
-def health_check():
-    return jsonify({
-        "status":            "healthy",
-        "programs_loaded":   len(df_daad),
-        "ocr": {
-            "pytesseract": PYTESSERACT_AVAILABLE,
-            "easyocr":     EASYOCR_AVAILABLE,
-        },
-        "sessions_in_store": len(_store),
-        "n8n_webhook":       N8N_WEBHOOK_URL,
-    }), 200
-
-
-
-if __name__ == "__main__":
-    logger.info("Starting backend on http://0.0.0.0:5000")
-    app.run(host="0.0.0.0", port=5000, debug=False)
\ No newline at end of file
+import time
+
+# Module import time (dependencies included) is reported by /api/health
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask_cors import CORS
+from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
+import os
+import sys
+import logging
+import requests
+from urllib3.exceptions import NewConnectionError
+import uuid
+import random
+import re
+from datetime import datetime, timezone, timedelta
+import json
+import math
+from collections import OrderedDict
+import io
+import tempfile
+import shutil
+import threading
+import heapq
+import bisect
+import sqlite3
+import hashlib
+import hmac
+import gc
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+import numpy as np
+import skfuzzy as fuzz
+import pdfplumber
+from pdfminer.pdftypes import PDFStream, resolve1
+
+app = Flask(__name__)
+CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s — %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS         = {"pdf", "doc", "docx", "txt"}
+MAX_FILE_SIZE              = 20 * 1024 * 1024
+MIN_EMBEDDED_TEXT_LEN      = 50
+SESSION_TTL_MINUTES        = 60
+SESSION_STORE_MAX_ENTRIES  = int(os.environ.get("SESSION_STORE_MAX_ENTRIES", 100_000))
+SESSION_STORE_SHARDS       = int(os.environ.get("SESSION_STORE_SHARDS", 16))
+SESSION_BACKEND            = os.environ.get("SESSION_BACKEND", "memory")
+SESSION_SQLITE_PATH        = os.environ.get("SESSION_SQLITE_PATH", "sessions.db")
+STATUS_MAX_WAIT            = 60
+STATUS_KEEPALIVE_SECONDS   = 15
+STATUS_STREAM_MAX_SECONDS  = 600
+STATUS_POLL_SECONDS        = float(os.environ.get("STATUS_POLL_SECONDS", 15 if SESSION_BACKEND == "memory" else 1))
+PDF_WORKERS                = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))
+PDF_PARALLEL_MIN_PAGES     = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 3))
+OCR_QUEUE_SIZE             = int(os.environ.get("OCR_QUEUE_SIZE", max(PDF_WORKERS, 1) * 4))
+OCR_JOB_TIMEOUT            = float(os.environ.get("OCR_JOB_TIMEOUT", 300))
+EXTRACT_WORKERS            = int(os.environ.get("EXTRACT_WORKERS", max(PDF_WORKERS, 2)))
+FORWARD_WORKERS            = int(os.environ.get("FORWARD_WORKERS", 8))
+PIPELINE_MAX_PENDING       = int(os.environ.get("PIPELINE_MAX_PENDING", 200))
+UPLOAD_SPOOL_DIR           = os.environ.get("UPLOAD_SPOOL_DIR") or tempfile.gettempdir()
+UPLOAD_CHUNK_SIZE          = 1024 * 1024
+EXTRACTOR_VERSION          = 2
+OCR_BASE_DPI               = int(os.environ.get("OCR_BASE_DPI", 300))
+OCR_MAX_DPI                = int(os.environ.get("OCR_MAX_DPI", 400))
+OCR_MIN_CONFIDENCE         = float(os.environ.get("OCR_MIN_CONFIDENCE", 70))
+EXTRACTION_CACHE_DIR       = os.environ.get("EXTRACTION_CACHE_DIR", "extraction_cache")
+EXTRACTION_CACHE_MEMORY_MB = int(os.environ.get("EXTRACTION_CACHE_MEMORY_MB", 64))
+EXTRACTION_CACHE_DISK_MB   = int(os.environ.get("EXTRACTION_CACHE_DISK_MB", 512))
+DATASET_PATH               = os.environ.get("DAAD_DATASET_PATH", "DAAD_Dataset_Cleaned.csv")
+DATASET_WATCH_SECONDS      = float(os.environ.get("DATASET_WATCH_SECONDS", 30))
+ADMIN_TOKEN                = os.environ.get("ADMIN_TOKEN", "")
+APP_PRELOAD                = os.environ.get("APP_PRELOAD", "0") == "1"
+DATASET_ARTIFACT_ENABLED   = os.environ.get("DATASET_ARTIFACT", "1") == "1"
+DATASET_ARTIFACT_DIR       = os.environ.get("DATASET_ARTIFACT_DIR", "")
+DATASET_ARTIFACT_VERSION   = 1
+DEFAULT_RESULTS_LIMIT      = 10
+MAX_RESULTS_LIMIT          = 100
+MAX_BATCH_SIZE             = 5000
+SEARCH_RELEVANCE_WEIGHT    = float(os.environ.get("SEARCH_RELEVANCE_WEIGHT", 0.5))
+LOCAL_EXTRACT_ENABLED      = os.environ.get("LOCAL_EXTRACT", "1") == "1"
+LOCAL_EXTRACT_CONFIDENCE   = float(os.environ.get("LOCAL_EXTRACT_CONFIDENCE", 0.85))
+N8N_RETRIES                = int(os.environ.get("N8N_RETRIES", 3))
+N8N_RETRY_BACKOFF          = float(os.environ.get("N8N_RETRY_BACKOFF", 0.5))
+N8N_CONNECT_TIMEOUT        = float(os.environ.get("N8N_CONNECT_TIMEOUT", 5))
+N8N_READ_TIMEOUT           = float(os.environ.get("N8N_READ_TIMEOUT", 90))
+N8N_BREAKER_THRESHOLD      = int(os.environ.get("N8N_BREAKER_THRESHOLD", 5))
+N8N_BREAKER_COOLDOWN       = float(os.environ.get("N8N_BREAKER_COOLDOWN", 30))
+
+N8N_WEBHOOK_URL = os.environ.get(
+    "N8N_WEBHOOK_URL",
+    "http://localhost:5678/webhook-test/a6fdd077-5e86-4d4f-bebf-7178962fb86e",
+)
+
+# Werkzeug enforces this while parsing the body, before the upload is fully read
+app.config["MAX_CONTENT_LENGTH"] = MAX_FILE_SIZE + 10_240
+
+
+def _format_labels(names: tuple, values: tuple, le: str | None = None) -> str:
+    pairs = [(n, str(v)) for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(("le", le))
+    if not pairs:
+        return ""
+    escaped = (
+        '%s="%s"' % (n, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class CounterMetric:
+    """Monotonic counter, one value per label tuple."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help_text, labelnames
+        self._lock   = threading.Lock()
+        self._values: dict = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in values]
+
+
+class HistogramMetric:
+    """
+    Fixed-bucket histogram. ``observe`` is a bisect plus two additions
+    under a per-metric lock; buckets are made cumulative only when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames = name, help_text, labelnames
+        self.bounds  = tuple(sorted(buckets))
+        self._lock   = threading.Lock()
+        self._series: dict = {}      # labels -> [count per bucket..., +Inf count, sum]
+
+    def observe(self, value: float, *labels) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.bounds) + 1) + [0.0]
+            series[i]  += 1
+            series[-1] += value
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            snapshot = [(k, list(v)) for k, v in self._series.items()]
+        out = []
+        for labels, series in snapshot:
+            running = 0
+            for bound, count in zip(self.bounds + (float("inf"),), series[:-1]):
+                running += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                out.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {running}")
+            out.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            out.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {running}")
+        return out
+
+
+class GaugeMetric:
+    """Gauge read from ``read()`` at scrape time: a number, or {label tuple: number}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read, labelnames: tuple = ()):
+        self.name, self.help, self.labelnames, self.read = name, help_text, labelnames, read
+
+    def lines(self) -> list[str]:
+        try:
+            value = self.read()
+        except Exception as exc:
+            logger.warning("Metric %s unavailable: %s", self.name, exc)
+            return []
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class MetricsRegistry:
+    """Process-local metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self, prefix: str):
+        self.prefix   = prefix
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> CounterMetric:
+        return self._add(CounterMetric(self.prefix + name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, buckets: tuple,
+                  labelnames: tuple = ()) -> HistogramMetric:
+        return self._add(HistogramMetric(self.prefix + name, help_text, buckets, labelnames))
+
+    def gauge(self, name: str, help_text: str, read, labelnames: tuple = ()) -> GaugeMetric:
+        return self._add(GaugeMetric(self.prefix + name, help_text, read, labelnames))
+
+    def render(self) -> str:
+        out = []
+        for metric in self._metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        return "\n".join(out) + "\n"
+
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 30, 60)
+WAIT_BUCKETS    = (1e-6, 1e-5, 1e-4, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+SIZE_BUCKETS    = (16e3, 64e3, 256e3, 1e6, 2.5e6, 5e6, 10e6, 20e6)
+
+METRICS = MetricsRegistry("resume_backend_")
+M_PDF_PAGE_SECONDS = METRICS.histogram(
+    "pdf_page_extract_seconds", "pdfplumber embedded-text extraction time per page.", LATENCY_BUCKETS)
+M_OCR_PAGE_SECONDS = METRICS.histogram(
+    "ocr_page_seconds", "OCR time per page by stage (render, pytesseract, easyocr).",
+    LATENCY_BUCKETS, ("engine",))
+M_OCR_PAGES = METRICS.counter(
+    "ocr_pages_total", "OCR'd pages by outcome: pytesseract, easyocr_fallback (pytesseract "
+    "produced nothing), easyocr (only engine) or failed.", ("outcome",))
+M_UPLOAD_BYTES = METRICS.histogram(
+    "upload_bytes", "Size of accepted resume uploads.", SIZE_BUCKETS)
+M_N8N_SECONDS = METRICS.histogram(
+    "n8n_forward_seconds", "n8n webhook request latency, including retries.", LATENCY_BUCKETS)
+M_N8N_RESPONSES = METRICS.counter(
+    "n8n_responses_total", "n8n forward outcomes by HTTP status code, 'error' or 'circuit_open'.",
+    ("code",))
+M_CALLBACK_SECONDS = METRICS.histogram(
+    "submit_to_callback_seconds", "Time from session creation to the n8n callback.", LATENCY_BUCKETS)
+M_FUZZY_SECONDS = METRICS.histogram(
+    "fuzzy_score_seconds", "Scoring and ranking time per request.", LATENCY_BUCKETS, ("endpoint",))
+M_FUZZY_ROWS = METRICS.counter(
+    "fuzzy_rows_scored_total", "Programme rows scored.", ("endpoint",))
+M_LOCAL_EXTRACT = METRICS.counter(
+    "local_extract_total", "Resumes by local extraction outcome: hit (completed without n8n), "
+    "miss (low confidence, forwarded) or error.", ("outcome",))
+M_SESSION_LOCK_WAIT = METRICS.histogram(
+    "session_lock_wait_seconds", "Time waiting for a session shard lock or the SQLite write lock.",
+    WAIT_BUCKETS, ("op",))
+
+
+class SessionBackend:
+    """
+    Interface for the session store behind _store_set/_store_get.
+
+    ``set`` merges ``payload`` into the session (creating it with
+    ``created_at`` on first write and stamping ``updated_at``); ``get``
+    returns a copy of the entry, or None when missing or older than the
+    TTL. Expiry is the backend's job: ``reap`` drops expired sessions and
+    is run periodically by one background thread per process.
+    """
+
+    reap_interval: float = 30.0
+
+    def set(self, session_id: str, payload: dict) -> None:
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> dict | None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def reap(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "sessions": len(self)}
+
+    def _ensure_reaper(self) -> None:
+        if getattr(self, "_reaper_pid", None) == os.getpid():
+            return
+        with self._reaper_lock:
+            if getattr(self, "_reaper_pid", None) != os.getpid():
+                threading.Thread(target=self._reap_forever, name="session-reaper",
+                                 daemon=True).start()
+                self._reaper_pid = os.getpid()
+
+    def _reap_forever(self) -> None:
+        stop = threading.Event()
+        while not stop.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as exc:
+                logger.warning("Session reaper error: %s", exc)
+
+
+class MemorySessionStore(SessionBackend):
+    """
+    In-process session store.
+
+    Entries are spread over ``shards`` independently locked shards, so
+    status polls on one session don't contend with writes to others.
+    Each shard keeps its entries in LRU order plus a min-heap of expiry
+    times; a single background reaper pops expired sessions off the heaps
+    every ``reap_interval`` seconds instead of scanning the whole store.
+    When a shard holds more than its share of ``max_entries``, the least
+    recently used sessions are evicted; their heap items are dropped when
+    the heap outgrows twice the shard's cap, so memory stays bounded by
+    ``max_entries`` however fast sessions churn.
+    """
+
+    def __init__(self, ttl: timedelta, max_entries: int, shards: int = 16,
+                 reap_interval: float = 30.0):
+        self.ttl           = ttl
+        self.shards        = shards
+        self.shard_cap     = max(1, max_entries // shards)
+        self.reap_interval = reap_interval
+        self._locks   = [threading.Lock() for _ in range(shards)]
+        self._entries = [OrderedDict() for _ in range(shards)]
+        self._expiry  = [[] for _ in range(shards)]     # heaps of (expires_at, session_id)
+        self._stats_lock = threading.Lock()
+        self._evicted = 0
+        self._expired = 0
+        self._reaper_lock = threading.Lock()
+
+    def _shard(self, session_id: str) -> int:
+        return hash(session_id) % self.shards
+
+    def set(self, session_id: str, payload: dict) -> None:
+        now = datetime.now(timezone.utc)
+        n = self._shard(session_id)
+        started = time.perf_counter()
+        with self._locks[n]:
+            waited  = time.perf_counter() - started
+            entries = self._entries[n]
+            entry = entries.get(session_id)
+            if entry is None:
+                entry = {"created_at": now}
+                heapq.heappush(self._expiry[n], (now + self.ttl, session_id))
+            entry.update(payload)
+            entry.setdefault("created_at", now)
+            entry["updated_at"] = now
+            entries[session_id] = entry
+            entries.move_to_end(session_id)
+            evicted = 0
+            while len(entries) > self.shard_cap:
+                entries.popitem(last=False)
+                evicted += 1
+            if len(self._expiry[n]) > 2 * self.shard_cap:
+                self._rebuild_expiry(n)
+        M_SESSION_LOCK_WAIT.observe(waited, "set")
+        if evicted:
+            with self._stats_lock:
+                self._evicted += evicted
+        self._ensure_reaper()
+
+    def _rebuild_expiry(self, n: int) -> None:
+        """Rebuild shard ``n``'s heap from its live entries (caller holds the lock)."""
+        heap = [(entry["created_at"] + self.ttl, sid) for sid, entry in self._entries[n].items()]
+        heapq.heapify(heap)
+        self._expiry[n] = heap
+
+    def get(self, session_id: str) -> dict | None:
+        n = self._shard(session_id)
+        started = time.perf_counter()
+        with self._locks[n]:
+            waited = time.perf_counter() - started
+            entry  = self._entries[n].get(session_id)
+            if entry is not None and entry["created_at"] + self.ttl > datetime.now(timezone.utc):
+                self._entries[n].move_to_end(session_id)
+                entry = dict(entry)
+            else:
+                entry = None
+        M_SESSION_LOCK_WAIT.observe(waited, "get")
+        return entry
+
+    def __len__(self) -> int:
+        total = 0
+        for n in range(self.shards):
+            with self._locks[n]:
+                total += len(self._entries[n])
+        return total
+
+    def reap(self) -> int:
+        """Drop expired sessions; cost is proportional to what expired."""
+        now = datetime.now(timezone.utc)
+        removed = 0
+        for n in range(self.shards):
+            with self._locks[n]:
+                heap, entries = self._expiry[n], self._entries[n]
+                while heap and heap[0][0] <= now:
+                    expires_at, sid = heapq.heappop(heap)
+                    entry = entries.get(sid)
+                    # Skip heap items left behind by evicted/re-created sessions
+                    if entry is not None and entry["created_at"] + self.ttl == expires_at:
+                        del entries[sid]
+                        removed += 1
+        with self._stats_lock:
+            self._expired += removed
+        if removed:
+            logger.info("Purged %d expired session(s)", removed)
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "backend":  "memory",
+            "sessions": len(self),
+            "capacity": self.shard_cap * self.shards,
+            "evicted":  self._evicted,
+            "expired":  self._expired,
+        }
+
+
+class SqliteSessionStore(SessionBackend):
+    """
+    Session store in a local SQLite database (WAL mode), shared by every
+    worker process on the host — an n8n callback handled by one worker is
+    visible to status polls on another.
+
+    Each thread (and each forked process) gets its own connection.
+    Expiry is indexed: ``get`` ignores expired rows and ``reap`` deletes
+    them with an index range scan, then trims the least recently updated
+    sessions beyond ``max_entries``.
+    """
+
+    def __init__(self, path: str, ttl: timedelta, max_entries: int,
+                 reap_interval: float = 30.0):
+        self.path          = path
+        self.ttl           = ttl
+        self.max_entries   = max_entries
+        self.reap_interval = reap_interval
+        self._local        = threading.local()
+        self._reaper_lock  = threading.Lock()
+        with self._conn() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS sessions (
+                       session_id TEXT PRIMARY KEY,
+                       data       TEXT NOT NULL,
+                       created_at REAL NOT NULL,
+                       updated_at REAL NOT NULL,
+                       expires_at REAL NOT NULL
+                   )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def set(self, session_id: str, payload: dict) -> None:
+        now  = time.time()
+        conn = self._conn()
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        M_SESSION_LOCK_WAIT.observe(time.perf_counter() - started, "set")
+        try:
+            row = conn.execute(
+                "SELECT data, created_at FROM sessions WHERE session_id = ? AND expires_at > ?",
+                (session_id, now),
+            ).fetchone()
+            data, created = (json.loads(row[0]), row[1]) if row else ({}, now)
+            data.update(payload)
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)",
+                (session_id, json.dumps(data, default=str), created, now,
+                 created + self.ttl.total_seconds()),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._ensure_reaper()
+
+    def get(self, session_id: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT data, created_at, updated_at FROM sessions"
+            " WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = json.loads(row[0])
+        entry["created_at"] = datetime.fromtimestamp(row[1], timezone.utc)
+        entry["updated_at"] = datetime.fromtimestamp(row[2], timezone.utc)
+        return entry
+
+    def __len__(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+    def reap(self) -> int:
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+        over = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] - self.max_entries
+        if over > 0:
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id IN"
+                " (SELECT session_id FROM sessions ORDER BY updated_at LIMIT ?)",
+                (over,),
+            )
+        if removed:
+            logger.info("Purged %d expired session(s)", removed)
+        return removed
+
+    def stats(self) -> dict:
+        return {"backend": "sqlite", "path": self.path, "sessions": len(self),
+                "capacity": self.max_entries}
+
+
+def create_session_backend(kind: str = SESSION_BACKEND) -> SessionBackend:
+    ttl = timedelta(minutes=SESSION_TTL_MINUTES)
+    if kind == "sqlite":
+        logger.info("Session backend: sqlite at %s", SESSION_SQLITE_PATH)
+        return SqliteSessionStore(SESSION_SQLITE_PATH, ttl, SESSION_STORE_MAX_ENTRIES)
+    if kind != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND {kind!r} (expected 'memory' or 'sqlite')")
+    return MemorySessionStore(ttl, SESSION_STORE_MAX_ENTRIES, SESSION_STORE_SHARDS)
+
+
+_store = create_session_backend()
+
+
+class SessionNotifier:
+    """
+    Wakes threads waiting on a session (long-poll / SSE) when it is
+    written. Only sessions with waiters have an entry. Waiters also
+    re-check every ``poll_interval`` seconds (STATUS_POLL_SECONDS), which
+    covers writes made by another process when the session backend is
+    shared: with SQLite, a callback handled by another worker reaches a
+    waiter on its next poll, up to one interval late.
+    """
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self._lock    = threading.Lock()
+        self._waiters: dict = {}        # session_id -> [Condition, waiter count, version]
+
+    def notify(self, session_id: str) -> None:
+        with self._lock:
+            waiter = self._waiters.get(session_id)
+            if waiter is not None:
+                waiter[2] += 1
+                waiter[0].notify_all()
+
+    def wait_for(self, session_id: str, check, timeout: float):
+        """Return the first non-None ``check()`` result, or None after ``timeout`` seconds."""
+        if not math.isfinite(timeout):
+            timeout = 0.0   # nan would never pass the deadline check below
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            waiter = self._waiters.setdefault(session_id, [threading.Condition(self._lock), 0, 0])
+            waiter[1] += 1
+        try:
+            while True:
+                with self._lock:
+                    version = waiter[2]
+                result = check()
+                if result is not None:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                with self._lock:
+                    if waiter[2] == version:
+                        waiter[0].wait(min(remaining, self.poll_interval))
+        finally:
+            with self._lock:
+                waiter[1] -= 1
+                if waiter[1] == 0:
+                    del self._waiters[session_id]
+
+
+_notifier = SessionNotifier(STATUS_POLL_SECONDS)
+
+
+def _store_set(session_id: str, payload: dict) -> None:
+    _store.set(session_id, payload)
+    _notifier.notify(session_id)
+
+
+def _store_get(session_id: str) -> dict | None:
+    return _store.get(session_id)
+
+
+
+# Keyword tiers for classify_admission, strongest first. A programme gets
+# the first tier with any keyword in its admission requirements text, and
+# DEFAULT_ADMISSION_TIER when none match. Override with a JSON file of
+# [[label, [keyword, ...]], ...] via ADMISSION_KEYWORDS_PATH.
+ADMISSION_KEYWORDS = [
+    ("Strict", [
+        "excellent academic record", "outstanding academic record",
+        "excellent performance", "outstanding performance",
+        "above-average performance", "above-average academic",
+        "top 10", "top 5", "top students",
+        "highly competitive", "limited number of places",
+        "limited number of seats", "limited capacity",
+        "selection committee", "selection based on",
+        "prior research experience", "research experience is required",
+        "first-class degree", "honours degree", "honors degree",
+        "restricted admission", "numerus clausus",
+        "must have successfully completed",
+    ]),
+    ("Moderate", [
+        "bachelor's degree in", "bachelors degree in", "bachelor degree in",
+        "relevant bachelor's degree", "relevant degree in",
+        "related field", "related discipline", "background in",
+        "minimum grade", "grade of at least", "overall grade",
+        "good academic standing", "ielts", "toefl",
+        "letter of motivation", "statement of purpose",
+        "letter of recommendation", "applicants must hold",
+        "admission requires", "admission requirement",
+    ]),
+    ("Lenient", [
+        "graduates from all disciplines",
+        "open to graduates of any discipline",
+        "no specific background", "no specific degree",
+        "completed undergraduate degree", "first academic degree",
+        "university degree in any discipline",
+    ]),
+]
+DEFAULT_ADMISSION_TIER = "Lenient"
+
+
+class AdmissionClassifier:
+    """
+    Keyword tiers compiled once into lowercase tuples, strongest first.
+    Matching stays on C substring search: for ~50 short literals over
+    ~500-character texts it beats a combined `re` alternation by 3-5x,
+    since CPython's regex engine has no multi-literal automaton.
+    """
+
+    def __init__(self, tiers: list, default: str):
+        self.labels   = [label for label, _ in tiers]
+        self.keywords = [tuple(kw.lower() for kw in keywords) for _, keywords in tiers]
+        self.default  = default
+        # Identifies the tiers in cached results (dataset artifacts)
+        self.fingerprint = hashlib.sha256(
+            json.dumps([self.labels, self.keywords, default]).encode("utf-8")
+        ).hexdigest()
+
+    def _tier(self, t: str):
+        for i, keywords in enumerate(self.keywords):
+            for kw in keywords:
+                if kw in t:
+                    return i
+        return None
+
+    def classify(self, text) -> str:
+        if pd.isna(text):
+            return self.default
+        tier = self._tier(str(text).lower())
+        return self.default if tier is None else self.labels[tier]
+
+    def classify_series(self, series: pd.Series) -> pd.Series:
+        """classify() over a whole text column, lowercased in one pass."""
+        labels = self.labels + [self.default]
+        texts  = series.astype(str).str.lower().tolist()
+        tiers  = [self._tier(t) for t in texts]
+        result = [labels[-1 if tier is None else tier] for tier in tiers]
+        return pd.Series(result, index=series.index, dtype=object).where(series.notna(), self.default)
+
+
+def _load_admission_keywords() -> list:
+    path = os.environ.get("ADMISSION_KEYWORDS_PATH")
+    if not path:
+        return ADMISSION_KEYWORDS
+    with open(path, encoding="utf-8") as fh:
+        return [(label, list(keywords)) for label, keywords in json.load(fh)]
+
+
+ADMISSION_CLASSIFIER = AdmissionClassifier(_load_admission_keywords(), DEFAULT_ADMISSION_TIER)
+
+
+def classify_admission(text) -> str:
+    """
+    Reads the Academic admission requirements text for one program.
+    Returns: "Strict" | "Moderate" | "Lenient"
+    """
+    return ADMISSION_CLASSIFIER.classify(text)
+
+
+def _parse_daad_csv(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, encoding="utf-8")
+    df.columns = [c.strip() for c in df.columns]
+    df = df.drop_duplicates()
+
+    for col in ["Tuition fees per semester in EUR", "Semester contribution",
+                "Contribution per semester", "Total contribution"]:
+        if col in df.columns:
+            df[col] = (
+                df[col].astype(str)
+                       .str.replace(".", "", regex=False)
+                       .str.extract("([0-9]+)", expand=False)
+            )
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df["Teaching language"] = df["Teaching language"].astype(str).str.lower().str.strip()
+
+    keep_cols = [
+        "Course ID", "University", "Programme", "Degree",
+        "Teaching language", "City", "Duration_in_semesters",
+        "Tuition fees per semester in EUR", "Contribution per semester",
+        "Total contribution", "Academic admission requirements",
+        "Description/content", "Master", "Bachelor", "PhD"
+    ]
+    df = df[[c for c in keep_cols if c in df.columns]]
+
+    df["admission_strictness"] = ADMISSION_CLASSIFIER.classify_series(df["Academic admission requirements"])
+    df["admission_strictness_score"] = df["admission_strictness"].map(
+        {"Lenient": 0.3, "Moderate": 0.6, "Strict": 0.9}
+    )
+    return df
+
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _artifact_dir(csv_path: str, csv_sha: str) -> str:
+    root = DATASET_ARTIFACT_DIR or csv_path + ".artifact"
+    return os.path.join(root, f"{csv_sha[:16]}-{ADMISSION_CLASSIFIER.fingerprint[:8]}-v{DATASET_ARTIFACT_VERSION}")
+
+
+def save_dataset_artifact(df: pd.DataFrame, directory: str, csv_sha: str) -> None:
+    """
+    Write the processed dataset as one .npy per column plus meta.json.
+    Numeric columns are stored as-is (memory-mappable); text columns as
+    a UTF-8 byte blob with an offsets array and a null mask. The
+    directory is written under a temp name and renamed into place, so
+    concurrent builders never expose a half-written artifact.
+    """
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".building-", dir=parent)
+    meta = {"csv_sha256": csv_sha, "version": DATASET_ARTIFACT_VERSION,
+            "admission_keywords": ADMISSION_CLASSIFIER.fingerprint, "rows": len(df), "columns": []}
+    np.save(os.path.join(tmp, "index.npy"), df.index.to_numpy(dtype=np.int64))
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            np.save(os.path.join(tmp, f"{i}.npy"), series.to_numpy())
+            kind = "numeric"
+        else:
+            nulls   = series.isna().to_numpy()
+            encoded = [b"" if null else str(v).encode("utf-8")
+                       for v, null in zip(series.tolist(), nulls)]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            np.save(os.path.join(tmp, f"{i}.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+            np.save(os.path.join(tmp, f"{i}.offsets.npy"), offsets)
+            np.save(os.path.join(tmp, f"{i}.nulls.npy"), nulls)
+            kind = "text"
+        meta["columns"].append({"name": col, "kind": kind, "dtype": str(series.dtype)})
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.chmod(tmp, 0o755)  # mkdtemp creates it 0700; other users' workers read it too
+    try:
+        os.rename(tmp, directory)
+    except OSError:
+        # Another worker got there first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_dataset_artifact(directory: str, csv_sha: str) -> pd.DataFrame | None:
+    """
+    The DataFrame stored by save_dataset_artifact, or None if missing or
+    stale. Numeric columns are read-only views of the memory-mapped .npy
+    files, so workers share those pages instead of each holding a copy.
+    """
+    try:
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if (meta.get("csv_sha256") != csv_sha or meta.get("version") != DATASET_ARTIFACT_VERSION
+            or meta.get("admission_keywords") != ADMISSION_CLASSIFIER.fingerprint):
+        return None
+
+    columns = {}
+    for i, spec in enumerate(meta["columns"]):
+        data = np.load(os.path.join(directory, f"{i}.npy"), mmap_mode="r")
+        if spec["kind"] == "numeric":
+            columns[spec["name"]] = pd.Series(np.asarray(data), dtype=spec["dtype"], copy=False)
+            continue
+        offsets = np.load(os.path.join(directory, f"{i}.offsets.npy"))
+        nulls   = np.load(os.path.join(directory, f"{i}.nulls.npy"))
+        blob    = data.tobytes()
+        values  = [None if nulls[j] else blob[offsets[j]:offsets[j + 1]].decode("utf-8")
+                   for j in range(meta["rows"])]
+        columns[spec["name"]] = pd.Series(values, dtype=spec["dtype"])
+    df = pd.DataFrame(columns, copy=False)   # numeric columns stay views of the memmaps
+    df.index = np.load(os.path.join(directory, "index.npy"))
+    return df
+
+
+def load_daad_dataset(path: str = "DAAD_Dataset_Cleaned.csv", csv_sha: str | None = None) -> pd.DataFrame:
+    """
+    Load the processed dataset. A columnar artifact keyed by the CSV's
+    SHA-256 and the admission keyword tiers is used when present and
+    current; otherwise the CSV is parsed and the artifact (re)built for
+    the next start.
+    """
+    logger.info("Loading DAAD dataset from: %s", path)
+    csv_sha   = csv_sha or _file_sha256(path)
+    directory = _artifact_dir(path, csv_sha)
+    df = load_dataset_artifact(directory, csv_sha) if DATASET_ARTIFACT_ENABLED else None
+    if df is not None:
+        logger.info("Dataset artifact hit: %s", directory)
+    else:
+        df = _parse_daad_csv(path)
+        if DATASET_ARTIFACT_ENABLED:
+            try:
+                save_dataset_artifact(df, directory, csv_sha)
+                logger.info("Dataset artifact written: %s", directory)
+            except OSError as exc:
+                logger.warning("Could not write dataset artifact %s: %s", directory, exc)
+
+    logger.info("Dataset loaded: %d programs", len(df))
+    return df
+
+
+DEGREE_FILTERS = ("Master", "Bachelor", "PhD")
+
+
+class DegreePartition:
+    """
+    Read-only columnar view of the programmes for one degree filter.
+
+    Holds only the columns used for scoring and for building result
+    dicts, as contiguous NumPy arrays. Output columns are object arrays of
+    plain Python values so they serialise without conversion.
+    """
+
+    OUTPUT_COLUMNS = {
+        "university":   "University",
+        "programme":    "Programme",
+        "degree":       "Degree",
+        "city":         "City",
+        "tuition_fees": "Tuition fees per semester in EUR",
+    }
+
+    def __init__(self, df: pd.DataFrame, rows: np.ndarray, total_rows: int):
+        self.course_id = self._freeze(df["Course ID"].to_numpy())
+        # Dataset row position of each partition row, and the inverse
+        # (-1 for rows outside the partition), for mapping index hits
+        self.rows = self._freeze(rows.astype(np.intp))
+        local = np.full(total_rows, -1, dtype=np.intp)
+        local[self.rows] = np.arange(len(self.rows))
+        self.local_index = self._freeze(local)
+        self.strictness_score = self._freeze(
+            df["admission_strictness_score"].to_numpy(dtype=float)
+        )
+        self.strictness = self._freeze(np.array(df["admission_strictness"].tolist(), dtype=object))
+        # Distinct strictness levels and each row's level, for batch scoring
+        levels, codes = np.unique(self.strictness_score, return_inverse=True)
+        self.strictness_levels = self._freeze(levels)
+        self.strictness_codes  = self._freeze(codes.astype(np.intp))
+        # Row order by Course ID; a stable sort on scores in this order
+        # gives the score-desc / Course ID-asc ranking
+        self.course_order = self._freeze(np.argsort(self.course_id, kind="stable"))
+        self.columns = {}
+        for key, col in self.OUTPUT_COLUMNS.items():
+            values = df[col].tolist() if col in df.columns else ["N/A"] * len(df)
+            self.columns[key] = self._freeze(np.array(values, dtype=object))
+
+    @staticmethod
+    def _freeze(arr: np.ndarray) -> np.ndarray:
+        arr = np.ascontiguousarray(arr)
+        arr.setflags(write=False)
+        return arr
+
+    def __len__(self) -> int:
+        return len(self.course_id)
+
+    def record(self, i: int, score: float) -> dict:
+        cols = self.columns
+        return {
+            "course_id":            self.course_id[i].item(),
+            "university":           cols["university"][i],
+            "programme":            cols["programme"][i],
+            "degree":               cols["degree"][i],
+            "city":                 cols["city"][i],
+            "suitability_score":    float(score),
+            "admission_strictness": self.strictness[i],
+            "tuition_fees":         cols["tuition_fees"][i],
+        }
+
+
+def build_degree_partitions(df: pd.DataFrame) -> dict:
+    """
+    One DegreePartition per degree filter, plus "All" for any other
+    filter value, so requests never mask or copy the DataFrame.
+    """
+    n = len(df)
+    partitions = {"All": DegreePartition(df, np.arange(n), n)}
+    for degree in DEGREE_FILTERS:
+        mask = (df[degree] == 1).to_numpy()
+        partitions[degree] = DegreePartition(df[mask], np.flatnonzero(mask), n)
+    logger.info(
+        "Degree partitions built: %s",
+        ", ".join(f"{k}={len(v)}" for k, v in partitions.items()),
+    )
+    return partitions
+
+
+def rank_top_k(scores: np.ndarray, tiebreak: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the ``k`` best scores, ordered by score descending then
+    ``tiebreak`` ascending. Only candidates tied with or above the k-th
+    score are sorted, so the order is deterministic without sorting the
+    whole column.
+    """
+    n = len(scores)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth  = np.partition(scores, n - k)[n - k]
+        cand = np.flatnonzero(scores >= kth)
+    else:
+        cand = np.arange(n)
+    order = np.lexsort((tiebreak[cand], -scores[cand]))
+    return cand[order[:k]]
+
+
+def rank_batch(partition: DegreePartition, cgpa: np.ndarray, test_score: np.ndarray,
+               k: int, scorer=None, chunk_size: int = 256) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k rows of ``partition`` for many applicants at once.
+
+    The fuzzy model is evaluated once per (applicant, strictness level)
+    and gathered into an applicants × programmes matrix, which is ranked
+    row-wise with the same order as rank_top_k. Returns (indices, scores),
+    each of shape (len(cgpa), min(k, len(partition))).
+    """
+    scorer = scorer or FUZZY_SCORER
+    n, k = len(cgpa), min(k, len(partition))
+    indices = np.empty((n, k), dtype=np.intp)
+    scores  = np.empty((n, k), dtype=float)
+    order   = partition.course_order
+    codes   = partition.strictness_codes[order]
+    for start in range(0, n, chunk_size):
+        stop = start + chunk_size
+        level_scores = scorer.score(
+            cgpa[start:stop, None], test_score[start:stop, None],
+            partition.strictness_levels[None, :],
+        )
+        matrix = level_scores[:, codes]
+        ranked = np.argsort(-matrix, axis=1, kind="stable")[:, :k]
+        indices[start:stop] = order[ranked]
+        scores[start:stop]  = np.take_along_axis(matrix, ranked, axis=1)
+    return indices, scores
+
+
+# Byte table mapping everything but ASCII [a-z0-9] to a space; non-ASCII
+# characters are replaced before translating, so split() yields the same
+# tokens as re.findall(r"[a-z0-9]+") on the lowercased text, only faster.
+_TOKEN_TABLE = bytes(c if 97 <= c <= 122 or 48 <= c <= 57 else 32 for c in range(256))
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "their this to was were will with".split()
+)
+
+
+def _normalize_token(tok: str) -> str | None:
+    if tok in _STOPWORDS:
+        return None
+    if len(tok) > 3 and tok[-1] == "s" and tok[-2] != "s":
+        return tok[:-1]
+    return tok
+
+
+def _raw_tokens(text: str) -> list[str]:
+    return text.lower().encode("ascii", "replace").translate(_TOKEN_TABLE).decode("ascii").split()
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens, stopwords dropped and plurals folded."""
+    tokens = (_normalize_token(tok) for tok in _raw_tokens(text))
+    return [tok for tok in tokens if tok]
+
+
+class _TermIds(dict):
+    """Raw token -> term id (-1 for stopwords), normalising each distinct token once."""
+
+    def __init__(self):
+        super().__init__()
+        self.terms: dict[str, int] = {}
+
+    def __missing__(self, raw: str) -> int:
+        term = _normalize_token(raw)
+        tid  = -1 if term is None else self.terms.setdefault(term, len(self.terms))
+        self[raw] = tid
+        return tid
+
+
+class ProgrammeSearchIndex:
+    """
+    In-memory inverted index over programme title, degree and description,
+    scored with BM25. Fields are weighted by scaling their term counts (a
+    title hit outweighs a description hit). Postings are stored CSR-style
+    with each posting's BM25 impact precomputed, so a query is a gather
+    and a sum over its terms' postings and never visits other rows.
+    """
+
+    FIELD_WEIGHTS = {"Programme": 3.0, "Degree": 2.0, "Description/content": 1.0}
+
+    def __init__(self, df: pd.DataFrame, k1: float = 1.2, b: float = 0.75):
+        n = len(df)
+        ids = _TermIds()
+        flat, rows, weights, counts = [], [], [], []
+        for field, weight in self.FIELD_WEIGHTS.items():
+            if field not in df.columns:
+                continue
+            for row, text in enumerate(df[field].tolist()):
+                if not isinstance(text, str):
+                    continue
+                tokens = _raw_tokens(text)
+                flat.extend(map(ids.__getitem__, tokens))
+                rows.append(row)
+                weights.append(weight)
+                counts.append(len(tokens))
+
+        self.vocabulary = ids.terms
+        terms   = np.array(flat, dtype=np.int64)
+        docs    = np.repeat(np.array(rows, dtype=np.int64), counts)
+        weights = np.repeat(np.array(weights, dtype=float), counts)
+        keep    = terms >= 0
+        terms, docs, weights = terms[keep], docs[keep], weights[keep]
+        lengths = np.bincount(docs, weights=weights, minlength=n)
+
+        # One posting per (term, doc); sorting the combined key groups postings by term
+        keys, inverse = np.unique(terms * max(n, 1) + docs, return_inverse=True)
+        tf        = np.bincount(inverse, weights=weights)
+        post_term = keys // max(n, 1)
+        post_doc  = keys % max(n, 1)
+        doc_freq  = np.bincount(post_term, minlength=len(self.vocabulary))
+        idf       = np.log(1 + (n - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_len   = lengths.mean() if n and lengths.any() else 1.0
+        norm      = k1 * (1 - b + b * lengths[post_doc] / avg_len)
+
+        self.offsets  = np.concatenate(([0], np.cumsum(doc_freq)))
+        self.postings = post_doc.astype(np.intp)
+        self.impacts  = idf[post_term] * tf * (k1 + 1) / (tf + norm)
+        self.documents = n
+        logger.info("Search index built: %d documents, %d terms", n, len(self.vocabulary))
+
+    def search(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (row positions, BM25 scores) of the documents containing every
+        query term, or any query term when no document contains them all.
+        """
+        tids = [self.vocabulary[tok] for tok in dict.fromkeys(tokenize(query)) if tok in self.vocabulary]
+        if not tids:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=float)
+        spans = [slice(self.offsets[t], self.offsets[t + 1]) for t in tids]
+        rows, inverse = np.unique(np.concatenate([self.postings[s] for s in spans]), return_inverse=True)
+        scores  = np.bincount(inverse, weights=np.concatenate([self.impacts[s] for s in spans]))
+        matched = np.bincount(inverse) == len(tids)
+        if matched.any():
+            rows, scores = rows[matched], scores[matched]
+        return rows, scores
+
+
+def _bitmap_rows(bitmap: np.ndarray, n: int) -> np.ndarray:
+    return np.flatnonzero(np.unpackbits(bitmap, count=n))
+
+
+def _bitmap_test(bitmap: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    return ((bitmap[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+
+class BitmapIndex:
+    """
+    Equality index over a categorical column: one packed bitmap per
+    distinct key (ceil(n / 8) bytes each) plus its row count. A row may
+    carry several keys, e.g. every language it is taught in.
+    """
+
+    def __init__(self, keys_per_row: list, n: int):
+        members: dict[str, list[int]] = {}
+        for row, keys in enumerate(keys_per_row):
+            for key in keys:
+                members.setdefault(key, []).append(row)
+        self.n = n
+        self.bitmaps: dict[str, np.ndarray] = {}
+        self.counts:  dict[str, int] = {}
+        for key, rows in members.items():
+            mask = np.zeros(n, dtype=bool)
+            mask[rows] = True
+            self.bitmaps[key] = np.packbits(mask)
+            self.counts[key]  = len(rows)
+
+    def bitmap(self, keys: list) -> np.ndarray:
+        out = np.zeros((self.n + 7) // 8, dtype=np.uint8)
+        for key in keys:
+            if key in self.bitmaps:
+                out |= self.bitmaps[key]
+        return out
+
+
+class SortedIndex:
+    """Range index over a numeric column: row positions sorted by value."""
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.asarray(values, dtype=float)
+        self.order  = np.argsort(self.values, kind="stable")
+        self.sorted = self.values[self.order]
+
+    def span(self, lo: float, hi: float) -> tuple[int, int]:
+        return (int(np.searchsorted(self.sorted, lo, side="left")),
+                int(np.searchsorted(self.sorted, hi, side="right")))
+
+
+class _EqualsFilter:
+    def __init__(self, index: BitmapIndex, keys: list):
+        self.bitmap   = index.bitmap(keys)
+        self.n        = index.n
+        # Exact for single-valued columns, an upper bound otherwise
+        self.estimate = sum(index.counts.get(key, 0) for key in keys)
+
+    def rows(self) -> np.ndarray:
+        return _bitmap_rows(self.bitmap, self.n)
+
+    def matches(self, rows: np.ndarray) -> np.ndarray:
+        return _bitmap_test(self.bitmap, rows)
+
+
+class _RangeFilter:
+    def __init__(self, index: SortedIndex, lo: float | None, hi: float | None):
+        lo = -np.inf if lo is None else lo
+        hi = np.inf if hi is None else hi
+        self.index, self.lo, self.hi = index, lo, hi
+        start, stop   = index.span(lo, hi)
+        self.slice    = slice(start, stop)
+        self.estimate = max(stop - start, 0)
+
+    def rows(self) -> np.ndarray:
+        return np.sort(self.index.order[self.slice])
+
+    def matches(self, rows: np.ndarray) -> np.ndarray:
+        values = self.index.values[rows]
+        return (values >= self.lo) & (values <= self.hi)
+
+
+class FilterIndex:
+    """
+    Precomputed indexes for the structured programme filters: bitmaps for
+    city and teaching language, sorted arrays for tuition and duration.
+
+    plan() turns request filters into predicates ordered by estimated
+    match count; select() materialises only the most selective one and
+    probes the others on its rows, so a narrow filter such as a city keeps
+    every later check down to a handful of rows.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        self.rows = n
+        self.city = BitmapIndex(
+            [[v.strip().casefold()] if isinstance(v, str) else [] for v in df["City"].tolist()], n
+        )
+        self.language = BitmapIndex(
+            [v.casefold().split() if isinstance(v, str) else [] for v in df["Teaching language"].tolist()], n
+        )
+        self.tuition  = SortedIndex(df["Tuition fees per semester in EUR"].to_numpy(dtype=float))
+        self.duration = SortedIndex(df["Duration_in_semesters"].to_numpy(dtype=float))
+        logger.info(
+            "Filter indexes built: %d cities, %d languages",
+            len(self.city.bitmaps), len(self.language.bitmaps),
+        )
+
+    def plan(self, filters: dict) -> list:
+        predicates = []
+        if "city" in filters:
+            predicates.append(_EqualsFilter(self.city, filters["city"]))
+        if "teaching_language" in filters:
+            predicates.append(_EqualsFilter(self.language, filters["teaching_language"]))
+        if "tuition" in filters:
+            predicates.append(_RangeFilter(self.tuition, *filters["tuition"]))
+        if "duration" in filters:
+            predicates.append(_RangeFilter(self.duration, *filters["duration"]))
+        return sorted(predicates, key=lambda p: p.estimate)
+
+    def select(self, plan: list) -> np.ndarray:
+        """Sorted row positions matching every predicate in ``plan``."""
+        if not plan:
+            return np.arange(self.rows)
+        rows = plan[0].rows()
+        return rows[self.matches(plan[1:], rows)]
+
+    @staticmethod
+    def matches(plan: list, rows: np.ndarray) -> np.ndarray:
+        """Boolean mask of ``rows`` matching every predicate in ``plan``."""
+        keep = np.ones(len(rows), dtype=bool)
+        for predicate in plan:
+            if not keep.any():
+                break
+            idx = np.flatnonzero(keep)
+            keep[idx] = predicate.matches(rows[idx])
+        return keep
+
+
+class DatasetSnapshot:
+    """
+    One load of the dataset with everything derived from it: degree
+    partitions, search index and filter indexes. Never modified after
+    construction; a reload builds a new snapshot and swaps the reference.
+    """
+
+    def __init__(self, path: str, csv_sha: str):
+        self.path         = path
+        self.version      = csv_sha[:12]
+        self.df           = load_daad_dataset(path, csv_sha)
+        self.partitions   = build_degree_partitions(self.df)
+        self.search_index = ProgrammeSearchIndex(self.df)
+        self.filter_index = FilterIndex(self.df)
+        self.loaded_at    = datetime.now(timezone.utc).isoformat()
+
+
+class DatasetManager:
+    """
+    Holds the current DatasetSnapshot and replaces it on reload.
+
+    Requests read ``current`` once and keep that snapshot, so in-flight
+    requests finish on the data they started with while a reload builds
+    the next one off to the side. The swap is a single reference
+    assignment. Reloads are coalesced: one at a time, and a CSV whose hash
+    matches the current version is not reloaded. Each process polls the
+    file's mtime/size every ``watch_interval`` seconds (0 disables), so
+    every worker picks up a changed file on its own. The first snapshot
+    is loaded on first use, or up front by load().
+    """
+
+    def __init__(self, path: str, watch_interval: float):
+        self.path           = path
+        self.watch_interval = watch_interval
+        self._reload_lock   = threading.Lock()
+        self._watch_lock    = threading.Lock()
+        self._stat          = None
+        self._current       = None
+        self.reloads        = 0
+        self.last_error     = None
+
+    @property
+    def current(self) -> DatasetSnapshot:
+        self._ensure_watcher()
+        return self._current or self.load()
+
+    def load(self) -> DatasetSnapshot:
+        """The current snapshot, loading the first one if needed (without starting the watch)."""
+        if self._current is None:
+            with self._reload_lock:
+                if self._current is None:
+                    self._stat    = self._file_stat()
+                    self._current = DatasetSnapshot(self.path, _file_sha256(self.path))
+        return self._current
+
+    def _file_stat(self) -> tuple | None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self, force: bool = False) -> str:
+        """Load and swap in a new snapshot: "reloaded", "unchanged", "busy" or "failed"."""
+        if not self._reload_lock.acquire(blocking=False):
+            return "busy"
+        try:
+            stat    = self._file_stat()
+            csv_sha = _file_sha256(self.path)
+            if not force and self._current is not None and csv_sha[:12] == self._current.version:
+                self._stat = stat
+                return "unchanged"
+            started  = time.monotonic()
+            snapshot = DatasetSnapshot(self.path, csv_sha)
+            previous, self._current = self._current, snapshot
+            self._stat      = stat
+            self.reloads   += 1
+            self.last_error = None
+            logger.info("Dataset reloaded: %s -> %s (%d programs, %.2fs)",
+                        previous and previous.version, snapshot.version, len(snapshot.df),
+                        time.monotonic() - started)
+            return "reloaded"
+        except Exception as exc:
+            self.last_error = str(exc)
+            logger.exception("Dataset reload failed: %s", exc)
+            return "failed"
+        finally:
+            self._reload_lock.release()
+
+    def reload_async(self, force: bool = False) -> bool:
+        """Start a background reload; False if one is already running."""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self.reload, args=(force,), name="dataset-reload",
+                         daemon=True).start()
+        return True
+
+    def stats(self) -> dict:
+        snapshot = self.current
+        return {
+            "version":        snapshot.version,
+            "path":           snapshot.path,
+            "loaded_at":      snapshot.loaded_at,
+            "programs":       len(snapshot.df),
+            "reloads":        self.reloads,
+            "reloading":      self._reload_lock.locked(),
+            "last_error":     self.last_error,
+            "watch_interval": self.watch_interval,
+        }
+
+    def _ensure_watcher(self) -> None:
+        if self.watch_interval <= 0 or getattr(self, "_watcher_pid", None) == os.getpid():
+            return
+        with self._watch_lock:
+            if getattr(self, "_watcher_pid", None) != os.getpid():
+                threading.Thread(target=self._watch_forever, name="dataset-watcher",
+                                 daemon=True).start()
+                self._watcher_pid = os.getpid()
+
+    def _watch_forever(self) -> None:
+        stop = threading.Event()
+        while not stop.wait(self.watch_interval):
+            stat = self._file_stat()
+            if stat is not None and stat != self._stat:
+                self.reload()
+
+
+DATASET = DatasetManager(DATASET_PATH, DATASET_WATCH_SECONDS)
+
+
+class FuzzySuitabilityEngine:
+    """
+    Mamdani fuzzy model (min/max inference, centroid defuzzification) with
+    the universes, membership functions and rule table built once.
+
+    All inputs broadcast against each other, so a whole column of
+    admission strictness values (or many cgpa/test pairs) is scored in a
+    single NumPy pass. Output matches the original per-call model.
+    """
+
+    # Rule consequent for [cgpa][test][strictness]; 0 = low, 1 = med, 2 = high.
+    # Index order: cgpa (low, med, high) × test (weak, avg, strong) ×
+    # strictness (lenient, moderate, strict).
+    RULES = np.array([
+        # Low CGPA
+        [[0, 0, 0],    # weak test
+         [0, 0, 0],    # avg test
+         [1, 0, 0]],   # strong test
+        # Medium CGPA
+        [[1, 0, 0],
+         [1, 1, 0],
+         [2, 1, 1]],
+        # High CGPA
+        [[1, 1, 1],
+         [2, 2, 1],
+         [2, 2, 2]],
+    ])
+
+    def __init__(self, resolution: int = 100):
+        self.x_cgpa        = np.linspace(0, 10,  resolution)
+        self.x_test        = np.linspace(0, 120, resolution)
+        self.x_strict      = np.linspace(0, 1,   resolution)
+        self.x_suitability = np.linspace(0, 1,   resolution)
+
+        self.cgpa_mfs = [
+            fuzz.trimf(self.x_cgpa, [0,   0,   6.5]),
+            fuzz.trimf(self.x_cgpa, [5,   7,   9  ]),
+            fuzz.trimf(self.x_cgpa, [7.5, 10,  10 ]),
+        ]
+        self.test_mfs = [
+            fuzz.trimf(self.x_test, [0,   0,   85 ]),
+            fuzz.trimf(self.x_test, [80,  100, 110]),
+            fuzz.trimf(self.x_test, [105, 120, 120]),
+        ]
+        self.strict_mfs = [
+            fuzz.trimf(self.x_strict, [0,   0,   0.4]),
+            fuzz.trimf(self.x_strict, [0.3, 0.5, 0.7]),
+            fuzz.trimf(self.x_strict, [0.6, 1,   1  ]),
+        ]
+        # (3, resolution) — low / med / high output sets
+        self.suit_mfs = np.stack([
+            fuzz.trimf(self.x_suitability, [0,   0,   0.4]),
+            fuzz.trimf(self.x_suitability, [0.3, 0.5, 0.7]),
+            fuzz.trimf(self.x_suitability, [0.6, 1,   1  ]),
+        ])
+
+        # Per-segment terms of the piecewise-linear centroid used by
+        # fuzz.defuzz(..., "centroid").
+        x = self.x_suitability
+        self._dx = np.diff(x)
+        self._x1 = x[:-1]
+
+    @staticmethod
+    def _memberships(x, mfs, value) -> np.ndarray:
+        # (..., 3) membership degrees, zero outside the universe
+        return np.stack([np.interp(value, x, mf, left=0.0, right=0.0) for mf in mfs], axis=-1)
+
+    def _defuzz_centroid(self, aggregated: np.ndarray) -> np.ndarray:
+        y1 = aggregated[..., :-1]
+        y2 = aggregated[..., 1:]
+        dx, x1 = self._dx, self._x1
+        area   = (0.5 * dx * (y1 + y2)).sum(axis=-1)
+        moment = (dx * dx / 3.0 * (y2 + 0.5 * y1) + 0.5 * dx * x1 * (y1 + y2)).sum(axis=-1)
+        score  = moment / np.fmax(area, np.finfo(float).eps)
+        # fuzz.defuzz raises on an empty aggregate; the model treats that as 0.0
+        return np.where(aggregated.sum(axis=-1) == 0, 0.0, score)
+
+    @staticmethod
+    def convert_test_score(test_score) -> np.ndarray:
+        """IELTS bands (<= 9) are mapped onto the 0–120 test scale."""
+        test_score = np.asarray(test_score, dtype=float)
+        return np.where(test_score <= 9, test_score * (120 / 9), test_score)
+
+    def score(self, cgpa, test_score, admission_strictness, decimals: int | None = 3) -> np.ndarray:
+        """
+        Vectorised suitability. Arguments are scalars or arrays that
+        broadcast together; test scores <= 9 are treated as IELTS bands
+        and converted to the 0–120 scale. Returns scores rounded to
+        ``decimals`` places (unrounded when None).
+        """
+        score = self.evaluate(cgpa, self.convert_test_score(test_score), admission_strictness)
+        return score if decimals is None else np.round(score, decimals)
+
+    def evaluate(self, cgpa, test_score, admission_strictness) -> np.ndarray:
+        """Unrounded suitability for a test score already on the 0–120 scale."""
+        cgpa, test_score, admission_strictness = np.broadcast_arrays(
+            np.asarray(cgpa, dtype=float),
+            np.asarray(test_score, dtype=float),
+            np.asarray(admission_strictness, dtype=float),
+        )
+        mu_c = self._memberships(self.x_cgpa,   self.cgpa_mfs,   cgpa)
+        mu_t = self._memberships(self.x_test,   self.test_mfs,   test_score)
+        mu_s = self._memberships(self.x_strict, self.strict_mfs, admission_strictness)
+
+        # Firing strength of all 27 rules: (..., 3, 3, 3)
+        firing = np.fmin(
+            np.fmin(mu_c[..., :, None, None], mu_t[..., None, :, None]),
+            mu_s[..., None, None, :],
+        )
+        # Max activation per output set, then clip and aggregate: (..., resolution)
+        activation = np.stack(
+            [np.where(self.RULES == k, firing, 0.0).max(axis=(-3, -2, -1)) for k in range(3)],
+            axis=-1,
+        )
+        aggregated = np.fmin(activation[..., :, None], self.suit_mfs).max(axis=-2)
+        return self._defuzz_centroid(aggregated)
+
+    def score_column(self, cgpa: float, test_score: float, strictness_scores) -> np.ndarray:
+        """
+        Score one applicant against a column of programme strictness values.
+        Strictness only takes a handful of distinct values, so the model is
+        evaluated once per distinct value and the results are gathered back.
+        """
+        strictness_scores = np.asarray(strictness_scores, dtype=float)
+        levels, inverse = np.unique(strictness_scores, return_inverse=True)
+        return self.score(cgpa, test_score, levels)[inverse.reshape(strictness_scores.shape)]
+
+
+FUZZY_ENGINE = FuzzySuitabilityEngine()
+
+
+class CompiledSuitabilitySurface:
+    """
+    The fuzzy model precomputed over a regular (cgpa, test, strictness)
+    grid and answered by trilinear interpolation — O(1) per query.
+
+    Test scores are converted to the 0–120 scale before lookup, so the
+    IELTS step at 9 never falls inside a grid cell. Interpolation error is
+    largest next to the kinks of the membership functions (cgpa 5 / 7.5,
+    test 80 / 105 / 110); ``max_error`` records the worst absolute
+    deviation from the exact model over ``validation_points`` random
+    queries at the 0.3 / 0.6 / 0.9 strictness levels. With the default
+    grid this stays around 0.02, and far below that away from the kinks.
+    """
+
+    GRID_SHAPE = (201, 241, 11)   # cgpa step 0.05, test step 0.5, strictness step 0.1
+    STRICTNESS_LEVELS = (0.3, 0.6, 0.9)
+
+    def __init__(self, values: np.ndarray, max_error: float | None = None):
+        self.values = np.ascontiguousarray(values, dtype=np.float32)
+        self.grids  = (
+            np.linspace(0, 10,  self.values.shape[0]),
+            np.linspace(0, 120, self.values.shape[1]),
+            np.linspace(0, 1,   self.values.shape[2]),
+        )
+        self.max_error = max_error
+        self.validation_points = 0
+
+    @classmethod
+    def compile(cls, engine: FuzzySuitabilityEngine, shape: tuple = GRID_SHAPE,
+                chunk_rows: int = 32) -> "CompiledSuitabilitySurface":
+        n_cgpa, n_test, n_strict = shape
+        g_cgpa   = np.linspace(0, 10,  n_cgpa)
+        g_test   = np.linspace(0, 120, n_test)
+        g_strict = np.linspace(0, 1,   n_strict)
+        values   = np.empty(shape, dtype=np.float32)
+        # Chunked over cgpa rows to keep the broadcast temporaries small
+        for start in range(0, n_cgpa, chunk_rows):
+            rows = g_cgpa[start:start + chunk_rows]
+            values[start:start + len(rows)] = engine.evaluate(
+                rows[:, None, None], g_test[None, :, None], g_strict[None, None, :]
+            )
+        return cls(values)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledSuitabilitySurface":
+        with np.load(path) as data:
+            return cls(data["values"])
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, values=self.values)
+
+    def validate(self, engine: FuzzySuitabilityEngine, validation_points: int = 20_000,
+                 seed: int = 0) -> float:
+        rng    = np.random.default_rng(seed)
+        cgpa   = rng.uniform(0, 10,  validation_points)
+        test   = rng.uniform(0, 120, validation_points)
+        strict = rng.choice(self.STRICTNESS_LEVELS, validation_points)
+        exact  = engine.evaluate(cgpa, test, strict)
+        self.max_error = float(np.abs(self._interpolate(cgpa, test, strict) - exact).max())
+        self.validation_points = validation_points
+        return self.max_error
+
+    def _interpolate(self, cgpa, test_score, admission_strictness) -> np.ndarray:
+        cgpa, test_score, admission_strictness = np.broadcast_arrays(
+            np.asarray(cgpa, dtype=float),
+            np.asarray(test_score, dtype=float),
+            np.asarray(admission_strictness, dtype=float),
+        )
+        idx, frac = [], []
+        for grid, value in zip(self.grids, (cgpa, test_score, admission_strictness)):
+            pos = (np.clip(value, grid[0], grid[-1]) - grid[0]) / (grid[1] - grid[0])
+            i   = np.minimum(pos.astype(np.intp), len(grid) - 2)
+            idx.append(i)
+            frac.append(pos - i)
+        (i, j, k), (a, b, c) = idx, frac
+        v = self.values
+        c00 = v[i, j,     k] * (1 - c) + v[i, j,     k + 1] * c
+        c01 = v[i, j + 1, k] * (1 - c) + v[i, j + 1, k + 1] * c
+        c10 = v[i + 1, j,     k] * (1 - c) + v[i + 1, j,     k + 1] * c
+        c11 = v[i + 1, j + 1, k] * (1 - c) + v[i + 1, j + 1, k + 1] * c
+        return (c00 * (1 - b) + c01 * b) * (1 - a) + (c10 * (1 - b) + c11 * b) * a
+
+    def score(self, cgpa, test_score, admission_strictness, decimals: int | None = 3) -> np.ndarray:
+        test_score = FuzzySuitabilityEngine.convert_test_score(test_score)
+        score = self._interpolate(cgpa, test_score, admission_strictness)
+        return score if decimals is None else np.round(score, decimals)
+
+    def score_column(self, cgpa: float, test_score: float, strictness_scores) -> np.ndarray:
+        return self.score(cgpa, test_score, strictness_scores)
+
+
+FUZZY_COMPILED_SURFACE = os.environ.get("FUZZY_COMPILED_SURFACE", "0") == "1"
+FUZZY_SURFACE_PATH     = os.environ.get("FUZZY_SURFACE_PATH", "fuzzy_surface.npz")
+
+
+def load_fuzzy_surface(path: str = FUZZY_SURFACE_PATH) -> CompiledSuitabilitySurface:
+    """Load the compiled surface from ``path``, compiling and saving it if missing or stale."""
+    surface = None
+    if os.path.exists(path):
+        try:
+            surface = CompiledSuitabilitySurface.load(path)
+            if surface.values.shape != CompiledSuitabilitySurface.GRID_SHAPE:
+                logger.info("Fuzzy surface at %s has a different grid — recompiling", path)
+                surface = None
+        except Exception as exc:
+            logger.warning("Could not load fuzzy surface from %s: %s", path, exc)
+            surface = None
+    if surface is None:
+        logger.info("Compiling fuzzy suitability surface…")
+        surface = CompiledSuitabilitySurface.compile(FUZZY_ENGINE)
+        try:
+            surface.save(path)
+        except OSError as exc:
+            logger.warning("Could not save fuzzy surface to %s: %s", path, exc)
+    surface.validate(FUZZY_ENGINE)
+    logger.info("Fuzzy surface ready — max error %.4f", surface.max_error)
+    return surface
+
+
+FUZZY_SURFACE = load_fuzzy_surface() if FUZZY_COMPILED_SURFACE else None
+FUZZY_SCORER  = FUZZY_SURFACE or FUZZY_ENGINE
+
+
+def run_fuzzy_model(cgpa: float, test_score: float, admission_strictness: float) -> float:
+    """
+    Inputs:
+      cgpa                 — 0 to 10 scale
+      test_score           — IELTS band (0–9). Converted internally to 0–120.
+      admission_strictness — 0.3 (Lenient) | 0.6 (Moderate) | 0.9 (Strict)
+
+    Output:
+      suitability_score — float between 0 and 1
+    """
+    return float(FUZZY_SCORER.score(cgpa, test_score, admission_strictness))
+
+
+
+def allowed_file(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def _render_page(page, dpi: int) -> np.ndarray:
+    """Rasterise a page once, as an 8-bit grayscale array shared by all OCR engines."""
+    img = page.to_image(resolution=dpi).original
+    return np.asarray(img.convert("L"))
+
+
+def _preprocess_for_ocr(gray: np.ndarray) -> np.ndarray:
+    """
+    Sharpen (PIL's SHARPEN kernel) then double the contrast around the
+    mean, done on the array in int16 without round-tripping through PIL.
+    """
+    g = gray.astype(np.int16)
+    padded = np.pad(g, 1, mode="edge")
+    h, w = g.shape
+    window = np.zeros_like(g)
+    for dy in range(3):
+        for dx in range(3):
+            window += padded[dy:dy + h, dx:dx + w]
+    # centre 32, neighbours -2, scale 16  ==  (34·c − 2·Σwindow) / 16
+    g *= 34
+    g -= 2 * window
+    g //= 16
+    np.clip(g, 0, 255, out=g)
+    mean = int(g.mean() + 0.5)
+    g *= 2
+    g -= mean
+    np.clip(g, 0, 255, out=g)
+    return g.astype(np.uint8)
+
+
+class OcrBackends:
+    """
+    Registry of OCR engines, each imported on first use.
+
+    ``available`` is a cheap check (the module can be found, plus
+    whatever ``probe`` requires) so it can gate code paths and cache keys
+    without importing anything; ``load`` does the import and any model
+    setup once per process. Processes that never OCR a page — text-only
+    PDFs, scoring, status polls — never import easyocr (and torch).
+    """
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._engines = {}   # name -> (module name, probe, loader)
+        self._checked = {}   # name -> bool
+        self._loaded  = {}   # name -> loaded object
+        self._errors  = {}   # name -> load error
+
+    def register(self, name: str, module: str, loader, probe=None) -> None:
+        self._engines[name] = (module, probe, loader)
+
+    def available(self, name: str) -> bool:
+        if name in self._errors:
+            return False
+        if name not in self._checked:
+            module, probe, _loader = self._engines[name]
+            found = importlib.util.find_spec(module) is not None
+            self._checked[name] = found and (probe is None or bool(probe()))
+        return self._checked[name]
+
+    def any_available(self) -> bool:
+        return any(self.available(name) for name in self._engines)
+
+    def load(self, name: str):
+        """The engine's loaded object, or None if it is missing or failed to load."""
+        if name in self._loaded:
+            return self._loaded[name]
+        if not self.available(name):
+            return None
+        with self._lock:
+            if name not in self._loaded and name not in self._errors:
+                started = time.perf_counter()
+                try:
+                    self._loaded[name] = self._engines[name][2]()
+                    logger.info("OCR backend %s loaded in %.2fs", name, time.perf_counter() - started)
+                except Exception as exc:
+                    self._errors[name] = str(exc)
+                    logger.warning("OCR backend %s unavailable: %s", name, exc)
+        return self._loaded.get(name)
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "available": self.available(name),
+                "loaded":    name in self._loaded,
+                "error":     self._errors.get(name),
+            }
+            for name in self._engines
+        }
+
+
+def _load_pytesseract():
+    import pytesseract
+    pytesseract.get_tesseract_version()
+    return pytesseract
+
+
+def _load_easyocr():
+    import easyocr
+    logger.info("Initialising EasyOCR reader…")
+    return easyocr.Reader(["en"], gpu=False)
+
+
+OCR_BACKENDS = OcrBackends()
+OCR_BACKENDS.register("pytesseract", "pytesseract", _load_pytesseract,
+                      probe=lambda: shutil.which("tesseract"))
+OCR_BACKENDS.register("easyocr", "easyocr", _load_easyocr)
+
+
+def _run_pytesseract(gray: np.ndarray, page_num: int) -> tuple[str | None, float]:
+    """OCR a rendered page; returns (text, mean word confidence 0–100)."""
+    pytesseract = OCR_BACKENDS.load("pytesseract")
+    if pytesseract is None:
+        return None, 0.0
+    try:
+        data = pytesseract.image_to_data(
+            _preprocess_for_ocr(gray), config="--psm 6", output_type=pytesseract.Output.DICT
+        )
+        lines: dict = {}
+        confs = []
+        for word, conf, block, par, line in zip(
+            data["text"], data["conf"], data["block_num"], data["par_num"], data["line_num"]
+        ):
+            if not word or not word.strip():
+                continue
+            lines.setdefault((block, par, line), []).append(word.strip())
+            if float(conf) >= 0:
+                confs.append(float(conf))
+        text = "\n".join(" ".join(words) for words in lines.values())
+        if text.strip():
+            confidence = sum(confs) / len(confs) if confs else 0.0
+            logger.info("pytesseract OK  page=%d  chars=%d  conf=%.1f",
+                        page_num, len(text.strip()), confidence)
+            return text.strip(), confidence
+    except Exception as exc:
+        logger.warning("pytesseract error page=%d: %s", page_num, exc)
+    return None, 0.0
+
+
+_easyocr_lock = threading.Lock()
+
+
+def _run_easyocr(gray: np.ndarray, page_num: int) -> tuple[str | None, float]:
+    """OCR a rendered page; returns (text, mean confidence 0–100)."""
+    reader = OCR_BACKENDS.load("easyocr")
+    if reader is None:
+        return None, 0.0
+    try:
+        # The reader is not thread-safe; in-process callers take turns
+        with _easyocr_lock:
+            results = reader.readtext(gray)
+        if results:
+            text = "\n".join(r[1] for r in results)
+            confidence = 100.0 * sum(r[2] for r in results) / len(results)
+            logger.info("EasyOCR OK  page=%d  chars=%d  conf=%.1f",
+                        page_num, len(text.strip()), confidence)
+            return text.strip(), confidence
+    except Exception as exc:
+        logger.warning("EasyOCR error page=%d: %s", page_num, exc)
+    return None, 0.0
+
+
+def _ocr_page(page, page_num: int, timings: dict | None = None) -> str | None:
+    """
+    Render the page once at OCR_BASE_DPI and share that raster between
+    pytesseract and the EasyOCR fallback. Only when Tesseract's confidence
+    is below OCR_MIN_CONFIDENCE is the page re-rendered at OCR_MAX_DPI,
+    keeping whichever pass scored higher. Per-engine seconds go into
+    ``timings``.
+    """
+    timings = {} if timings is None else timings
+
+    started = time.perf_counter()
+    try:
+        gray = _render_page(page, OCR_BASE_DPI)
+    except Exception as exc:
+        logger.warning("Render error page=%d: %s", page_num, exc)
+        return None
+    timings["render"] = time.perf_counter() - started
+
+    ocr_text = None
+    if OCR_BACKENDS.available("pytesseract"):
+        started = time.perf_counter()
+        ocr_text, confidence = _run_pytesseract(gray, page_num)
+        if confidence < OCR_MIN_CONFIDENCE and OCR_MAX_DPI > OCR_BASE_DPI:
+            logger.info("Low OCR confidence page=%d (%.1f) — re-rendering at %d dpi",
+                        page_num, confidence, OCR_MAX_DPI)
+            try:
+                hi_text, hi_confidence = _run_pytesseract(_render_page(page, OCR_MAX_DPI), page_num)
+                if hi_text and hi_confidence > confidence:
+                    ocr_text = hi_text
+            except Exception as exc:
+                logger.warning("Render error page=%d: %s", page_num, exc)
+        timings["pytesseract"] = time.perf_counter() - started
+    if not ocr_text and OCR_BACKENDS.available("easyocr"):
+        started = time.perf_counter()
+        ocr_text, _confidence = _run_easyocr(gray, page_num)
+        timings["easyocr"] = time.perf_counter() - started
+    return ocr_text
+
+
+def _ocr_worker_init() -> None:
+    """Runs once in each OCR worker process: load the OCR models up front."""
+    for name in ("pytesseract", "easyocr"):
+        OCR_BACKENDS.load(name)
+
+
+def _ocr_worker_ping() -> int:
+    return os.getpid()
+
+
+def _open_pdf(source: bytes | str):
+    """pdfplumber over in-memory bytes, or file-backed when given a path."""
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _ocr_job(source: bytes | str, page_nums: list[int]) -> tuple[list, float]:
+    """
+    Worker entry point: reopen the PDF (bytes or spooled file path) and
+    OCR ``page_nums``.
+    Returns ([(page_num, text, timings), ...], busy_seconds).
+    """
+    started = time.perf_counter()
+    out = []
+    with _open_pdf(source) as pdf:
+        for n in page_nums:
+            timings: dict = {}
+            out.append((n, _ocr_page(pdf.pages[n - 1], n, timings), timings))
+    return out, time.perf_counter() - started
+
+
+def _record_ocr_page(text: str | None, timings: dict) -> None:
+    for engine, secs in timings.items():
+        M_OCR_PAGE_SECONDS.observe(secs, engine)
+    if not text:
+        outcome = "failed"
+    elif "easyocr" in timings:
+        outcome = "easyocr_fallback" if "pytesseract" in timings else "easyocr"
+    else:
+        outcome = "pytesseract"
+    M_OCR_PAGES.inc(outcome)
+
+
+class OcrQueueFull(RuntimeError):
+    """Raised when the OCR job queue is at capacity."""
+
+
+class OcrWorkerCrashed(RuntimeError):
+    """Raised when OCR worker processes keep dying on a document."""
+
+
+class OcrWorkerPool:
+    """
+    Fixed set of OCR worker processes with warm EasyOCR/Tesseract, fed
+    from a bounded job queue.
+
+    ``capacity`` caps the number of in-flight jobs (running + queued).
+    A submission that would exceed it is rejected at once with
+    OcrQueueFull rather than waiting, so callers can shed load. Workers
+    are started on first use or by create_app(), once per process.
+    """
+
+    def __init__(self, workers: int, capacity: int, job_timeout: float):
+        self.workers     = workers
+        self.capacity    = capacity
+        self.job_timeout = job_timeout
+        self._executor   = None
+        self._pid        = None
+        self._lock       = threading.Lock()
+        self._in_flight  = 0
+        self._started_at = time.monotonic()
+        self._submitted  = 0
+        self._rejected   = 0
+        self._restarts   = 0
+        self._busy_secs  = 0.0
+        # engine -> [pages, total seconds, max seconds]
+        self._latency: dict = {}
+
+    def start(self) -> None:
+        with self._lock:
+            # An executor inherited through fork belongs to the parent process
+            if self._executor is not None and self._pid == os.getpid():
+                return
+            logger.info("Starting OCR worker pool — workers=%d capacity=%d",
+                        self.workers, self.capacity)
+            self._executor   = ProcessPoolExecutor(max_workers=self.workers,
+                                                   initializer=_ocr_worker_init)
+            self._pid        = os.getpid()
+            self._started_at = time.monotonic()
+        # Bring every worker up now so the first upload doesn't pay for model loading
+        for _ in range(self.workers):
+            self._executor.submit(_ocr_worker_ping)
+
+    def ocr_pages(self, source: bytes | str, page_groups: list[list[int]]) -> dict:
+        """
+        OCR each group of pages as one job. All jobs are admitted
+        together or not at all. Returns {page_num: text | None}.
+
+        If a worker dies (e.g. killed by the OOM killer) the executor is
+        broken for good: it is discarded, so the next call starts a fresh
+        pool, and BrokenProcessPool is raised to the caller.
+        """
+        self.start()
+        with self._lock:
+            if self._in_flight + len(page_groups) > self.capacity:
+                self._rejected += 1
+                raise OcrQueueFull(
+                    f"OCR queue full ({self._in_flight}/{self.capacity} jobs in flight)"
+                )
+            self._in_flight += len(page_groups)
+            self._submitted += len(page_groups)
+            executor = self._executor
+
+        futures = []
+        try:
+            for group in page_groups:
+                f = executor.submit(_ocr_job, source, group)
+                f.add_done_callback(self._on_done)
+                futures.append(f)
+        except Exception as exc:
+            # Submitted jobs release themselves in _on_done; the rest never will
+            self._release(len(page_groups) - len(futures))
+            if isinstance(exc, BrokenProcessPool):
+                self._discard(executor)
+            raise
+
+        texts: dict = {}
+        try:
+            for f in futures:
+                pages, _busy = f.result(timeout=self.job_timeout)
+                for n, text, _timings in pages:
+                    texts[n] = text
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+        return texts
+
+    def _discard(self, executor) -> None:
+        """Drop a broken executor so the next start() builds a new one."""
+        with self._lock:
+            if self._executor is not executor:
+                return  # another caller already replaced it
+            self._executor  = None
+            self._restarts += 1
+        logger.warning("OCR worker pool broken — restarting it on next use")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, jobs: int) -> None:
+        with self._lock:
+            self._in_flight -= jobs
+
+    def _on_done(self, future) -> None:
+        result = None if future.cancelled() or future.exception() else future.result()
+        if result is not None:
+            for _n, text, timings in result[0]:
+                _record_ocr_page(text, timings)
+        with self._lock:
+            self._in_flight -= 1
+            if result is None:
+                return
+            pages, busy = result
+            self._busy_secs += busy
+            for _n, _text, timings in pages:
+                for engine, secs in timings.items():
+                    stat = self._latency.setdefault(engine, [0, 0.0, 0.0])
+                    stat[0] += 1
+                    stat[1] += secs
+                    stat[2] = max(stat[2], secs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            uptime = max(time.monotonic() - self._started_at, 1e-9)
+            return {
+                "workers":        self.workers,
+                "capacity":       self.capacity,
+                "in_flight":      self._in_flight,
+                "queue_depth":    max(0, self._in_flight - self.workers),
+                "busy_workers":   min(self._in_flight, self.workers),
+                "utilization":    round(min(1.0, self._busy_secs / (self.workers * uptime)), 4),
+                "jobs_submitted": self._submitted,
+                "jobs_rejected":  self._rejected,
+                "restarts":       self._restarts,
+                "engine_latency": {
+                    engine: {
+                        "pages":    n,
+                        "avg_secs": round(total / n, 4),
+                        "max_secs": round(worst, 4),
+                    }
+                    for engine, (n, total, worst) in self._latency.items()
+                },
+            }
+
+
+def _page_groups(page_nums: list[int], workers: int) -> list[list[int]]:
+    """One job for short runs of pages, otherwise up to ``workers`` contiguous ranges."""
+    if len(page_nums) < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+        return [page_nums]
+    size = -(-len(page_nums) // workers)
+    return [page_nums[i:i + size] for i in range(0, len(page_nums), size)]
+
+
+OCR_POOL = (
+    OcrWorkerPool(PDF_WORKERS, OCR_QUEUE_SIZE, OCR_JOB_TIMEOUT)
+    if PDF_WORKERS > 0 and OCR_BACKENDS.any_available() else None
+)
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache for extracted text, keyed by a hash of the
+    input plus the extractor/OCR settings.
+
+    Two tiers: an in-memory LRU bounded by ``memory_bytes`` of UTF-8
+    text, and an optional directory of files bounded by ``disk_bytes``
+    that survives restarts (least recently used files are evicted first).
+    The same store holds whole-document results and per-page OCR
+    results; lookups are counted separately for each ``kind``, and
+    ``bytes_saved`` sums the input bytes (PDF, or page content streams)
+    whose extraction a hit skipped. The directory is created and sized
+    on first use, not at import.
+    """
+
+    KINDS = ("doc", "page")
+
+    def __init__(self, directory: str | None, memory_bytes: int, disk_bytes: int):
+        self.directory    = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes   = disk_bytes
+        self._lock        = threading.Lock()
+        self._memory: OrderedDict = OrderedDict()   # key -> (text, utf-8 size)
+        self._memory_size = 0
+        self._disk: dict  = {}          # path -> size
+        self._disk_size   = 0
+        self._disk_ready  = False
+        self._counters    = {
+            kind: {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bytes_saved": 0}
+            for kind in self.KINDS
+        }
+
+    def _ensure_disk(self) -> None:
+        if self._disk_ready:
+            return
+        with self._lock:
+            if self._disk_ready:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        size = os.path.getsize(path)
+                    except OSError:
+                        continue
+                    self._disk[path] = size
+                    self._disk_size += size
+            self._disk_ready = True
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def get(self, key: str, kind: str = "doc", input_bytes: int = 0) -> str | None:
+        counters = self._counters[kind]
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                counters["memory_hits"] += 1
+                counters["bytes_saved"] += input_bytes
+                return self._memory[key][0]
+        if self.directory:
+            self._ensure_disk()
+            path = self._path(key)
+            try:
+                with open(path, encoding="utf-8") as fh:
+                    text = fh.read()
+                os.utime(path)
+            except OSError:
+                text = None
+            if text is not None:
+                with self._lock:
+                    counters["disk_hits"] += 1
+                    counters["bytes_saved"] += input_bytes
+                self._remember(key, text)
+                return text
+        with self._lock:
+            counters["misses"] += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if not self.directory:
+            return
+        self._ensure_disk()
+        path = self._path(key)
+        tmp  = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+        except OSError as exc:
+            logger.warning("Extraction cache write failed: %s", exc)
+            return
+        with self._lock:
+            self._disk_size += size - self._disk.get(path, 0)
+            self._disk[path] = size
+            over = self._disk_size > self.disk_bytes
+        if over:
+            self._evict_disk()
+
+    def _remember(self, key: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory_size -= self._memory.pop(key)[1]
+            self._memory[key] = (text, size)
+            self._memory_size += size
+            while self._memory_size > self.memory_bytes:
+                _, (_old, old_size) = self._memory.popitem(last=False)
+                self._memory_size -= old_size
+
+    def _evict_disk(self) -> None:
+        with self._lock:
+            paths = list(self._disk)
+        by_age = []
+        for path in paths:
+            try:
+                by_age.append((os.path.getmtime(path), path))
+            except OSError:
+                by_age.append((0.0, path))
+        by_age.sort()
+        target = self.disk_bytes * 0.9
+        with self._lock:
+            for _mtime, path in by_age:
+                if self._disk_size <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self._disk_size -= self._disk.pop(path, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "documents":      dict(self._counters["doc"]),
+                "pages":          dict(self._counters["page"]),
+                "memory_entries": len(self._memory),
+                "memory_bytes":   self._memory_size,
+                "disk_entries":   len(self._disk),
+                "disk_bytes":     self._disk_size,
+            }
+
+
+EXTRACTION_CACHE = ExtractionCache(
+    EXTRACTION_CACHE_DIR or None, EXTRACTION_CACHE_MEMORY_MB * 1024 * 1024,
+    EXTRACTION_CACHE_DISK_MB * 1024 * 1024,
+)
+
+
+def _extraction_settings_key() -> str:
+    """Everything besides the input that changes the extracted text."""
+    return (f"v{EXTRACTOR_VERSION}|min={MIN_EMBEDDED_TEXT_LEN}"
+            f"|tesseract={OCR_BACKENDS.available('pytesseract')}"
+            f"|easyocr={OCR_BACKENDS.available('easyocr')}"
+            f"|dpi={OCR_BASE_DPI}-{OCR_MAX_DPI}|conf={OCR_MIN_CONFIDENCE}")
+
+
+def _cache_key(kind: str, digest: str) -> str:
+    return hashlib.sha256(f"{kind}|{digest}|{_extraction_settings_key()}".encode()).hexdigest()
+
+
+def _page_fingerprint(page) -> tuple[str, int] | None:
+    """
+    (hash, bytes hashed) of a page's content streams and the XObjects
+    (scanned images, forms) it draws, so an unchanged page in a
+    re-uploaded PDF maps to the same key. None when the page structure
+    cannot be read.
+    """
+    h = hashlib.sha256()
+    seen: set = set()
+    size = 0
+
+    def feed(obj, depth: int = 0) -> None:
+        obj = resolve1(obj)
+        if depth > 4 or id(obj) in seen:
+            return
+        seen.add(id(obj))
+        nonlocal size
+        if isinstance(obj, PDFStream):
+            data = obj.get_rawdata() or b""
+            h.update(data)
+            size += len(data)
+            feed(obj.attrs.get("Resources"), depth + 1)
+        elif isinstance(obj, dict):
+            for name in sorted(obj, key=str):
+                if name in ("XObject", "Resources") or depth > 0:
+                    feed(obj[name], depth + 1)
+        elif isinstance(obj, list):
+            for item in obj:
+                feed(item, depth + 1)
+
+    try:
+        page_obj = page.page_obj
+        for ref in page_obj.contents or []:
+            feed(ref)
+        feed(page_obj.resources)
+        h.update(repr(page_obj.mediabox).encode())
+    except Exception:
+        return None
+    return h.hexdigest(), size
+
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
+    """Extract text from an in-memory PDF; see _extract_text."""
+    return _extract_text(pdf_bytes, hashlib.sha256(pdf_bytes).hexdigest(), len(pdf_bytes))
+
+
+def extract_text_from_pdf_file(path: str) -> str:
+    """
+    Same as extract_text_from_pdf_bytes for a file on disk. The PDF is
+    read through a file-backed parser and OCR workers reopen it by path,
+    so the document is never held in memory as a whole.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return _extract_text(path, digest.hexdigest(), os.path.getsize(path))
+
+
+def _extract_text(source: bytes | str, sha256: str, size: int) -> str:
+    """
+    Embedded text is read page by page in-process; pages below
+    MIN_EMBEDDED_TEXT_LEN fall back to OCR. With the OCR worker pool
+    enabled those pages are OCR'd there — as one job when fewer than
+    PDF_PARALLEL_MIN_PAGES, otherwise split into page ranges across the
+    workers — and reassembled in page order. Raises OcrQueueFull when the
+    pool has no room for the document. If a pool worker dies the pages
+    are resubmitted once to the restarted pool (the crash may have been
+    another document's); OcrWorkerCrashed is raised if that dies too.
+    Pages are never OCR'd in the calling process while a pool exists.
+
+    Results are cached by content hash: an identical upload returns the
+    cached text, and OCR results are cached per page so a re-upload with
+    one changed page only re-OCRs that page.
+    """
+    doc_key = _cache_key("doc", sha256)
+    cached  = EXTRACTION_CACHE.get(doc_key, "doc", size)
+    if cached is not None:
+        logger.info("Extraction cache hit: %d chars", len(cached))
+        return cached
+
+    page_texts: dict = {}
+    ocr_needed: list[int] = []
+    page_keys: dict = {}
+    failed = False
+    try:
+        with _open_pdf(source) as pdf:
+            logger.info("PDF opened: %d page(s)", len(pdf.pages))
+            for i, page in enumerate(pdf.pages, start=1):
+                page_text = None
+                started   = time.perf_counter()
+                try:
+                    page_text = page.extract_text()
+                except Exception as exc:
+                    logger.warning("pdfplumber error page=%d: %s", i, exc)
+                M_PDF_PAGE_SECONDS.observe(time.perf_counter() - started)
+
+                char_count = len(page_text.strip()) if page_text else 0
+                if page_text and char_count >= MIN_EMBEDDED_TEXT_LEN:
+                    page_texts[i] = page_text.strip()
+                    continue
+
+                fingerprint = _page_fingerprint(page)
+                if fingerprint:
+                    digest, content_bytes = fingerprint
+                    page_keys[i] = _cache_key("page", digest)
+                    cached = EXTRACTION_CACHE.get(page_keys[i], "page", content_bytes)
+                    if cached is not None:
+                        page_texts[i] = cached
+                        continue
+                ocr_needed.append(i)
+
+            if ocr_needed and OCR_POOL is not None:
+                logger.info("OCR %d page(s) on worker pool", len(ocr_needed))
+                groups = _page_groups(ocr_needed, OCR_POOL.workers)
+                try:
+                    page_texts.update(OCR_POOL.ocr_pages(source, groups))
+                except BrokenProcessPool as exc:
+                    logger.warning("OCR worker died (%s) — resubmitting to a fresh pool", exc)
+                    try:
+                        page_texts.update(OCR_POOL.ocr_pages(source, groups))
+                    except BrokenProcessPool as exc:
+                        raise OcrWorkerCrashed("OCR workers died twice on this document") from exc
+                ocr_needed = []
+
+            for i in ocr_needed:
+                logger.info("Page %d — trying OCR…", i)
+                timings: dict = {}
+                page_texts[i] = _ocr_page(pdf.pages[i - 1], i, timings)
+                _record_ocr_page(page_texts[i], timings)
+    except (OcrQueueFull, OcrWorkerCrashed):
+        raise
+    except Exception as exc:
+        failed = True
+        logger.exception("Failed to process PDF: %s", exc)
+
+    texts = []
+    for i in sorted(page_texts):
+        if page_texts[i]:
+            texts.append(page_texts[i])
+            if i in page_keys:
+                EXTRACTION_CACHE.put(page_keys[i], page_texts[i])
+        else:
+            logger.warning("Page %d — no text extracted", i)
+
+    combined = "\n\n".join(texts).strip()
+    # Partial results (errors, pages OCR could not read) are not cached whole
+    if not failed and all(page_texts.get(i) for i in page_keys):
+        EXTRACTION_CACHE.put(doc_key, combined)
+    logger.info("Extraction complete: %d chars", len(combined))
+    return combined
+
+
+def _spool_upload(stream) -> str | None:
+    """
+    Copy an upload stream to a temp file in UPLOAD_CHUNK_SIZE chunks,
+    enforcing MAX_FILE_SIZE as it goes. Returns the path, or None (and
+    nothing left on disk) when the upload is too large.
+    """
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=UPLOAD_SPOOL_DIR)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    break
+                out.write(chunk)
+    except Exception:
+        _discard_upload(path)
+        raise
+    if size > MAX_FILE_SIZE:
+        _discard_upload(path)
+        return None
+    return path
+
+
+def _discard_upload(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MultipartFileBody:
+    """
+    multipart/form-data body that streams the file part from disk.
+
+    requests reads ``files=`` uploads fully into memory; this yields the
+    form fields, then the file in UPLOAD_CHUNK_SIZE chunks, and reports
+    its total length so the request still carries a Content-Length. Each
+    iteration reopens the file, so the body can be re-sent.
+    """
+
+    def __init__(self, fields: dict, file_field: str, path: str, filename: str, mimetype: str):
+        self.boundary = uuid.uuid4().hex
+        self.path     = path
+        head = b"".join(
+            (f"--{self.boundary}\r\n"
+             f'Content-Disposition: form-data; name="{name}"\r\n\r\n').encode()
+            + str(value).encode("utf-8") + b"\r\n"
+            for name, value in fields.items()
+        )
+        head += (f"--{self.boundary}\r\n"
+                 f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                 f"Content-Type: {mimetype}\r\n\r\n").encode()
+        self._head = head
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self._head) + os.path.getsize(self.path) + len(self._tail)
+
+    def __iter__(self):
+        yield self._head
+        with open(self.path, "rb") as fh:
+            while chunk := fh.read(UPLOAD_CHUNK_SIZE):
+                yield chunk
+        yield self._tail
+
+
+class CircuitBreaker:
+    """
+    Opens after ``threshold`` consecutive failures and rejects calls for
+    ``cooldown`` seconds; then lets a single trial call through
+    (half-open) and closes again if it succeeds.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self._lock     = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End a call that says nothing about the remote side (no success or failure)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"state": self._state(), "consecutive_failures": self._failures}
+
+
+class N8nUnavailable(RuntimeError):
+    """Raised when the circuit breaker is open or retries are exhausted."""
+
+
+class N8nForwarder:
+    """
+    Forwards uploads to the n8n webhook over one shared keep-alive
+    session whose connection pool is capped at ``max_connections``
+    (callers block for a connection rather than opening more sockets).
+
+    Failures that are safe to repeat — the connection could not be made,
+    or n8n answered 429/503 — are retried up to ``retries`` times
+    with full-jitter exponential backoff. Repeated failures trip a
+    circuit breaker, after which sessions fail immediately until n8n
+    recovers.
+    """
+
+    # n8n refused the request outright. 502/504 are not retried: the
+    # gateway may have handed the upload on, and a repeat would run the
+    # workflow (and its callback) twice.
+    RETRY_STATUSES = {429, 503}
+
+    def __init__(self, url: str, max_connections: int, retries: int, backoff: float,
+                 connect_timeout: float, read_timeout: float, breaker: CircuitBreaker):
+        self.url      = url
+        self.retries  = retries
+        self.backoff  = backoff
+        self.timeout  = (connect_timeout, read_timeout)
+        self.breaker  = breaker
+        self.session  = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=max_connections, pool_block=True, max_retries=0,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock    = threading.Lock()
+        self._counts  = {"sent": 0, "retries": 0, "failed": 0, "short_circuited": 0}
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _post(self, body: MultipartFileBody) -> requests.Response:
+        attempt = 0
+        while True:
+            try:
+                resp = self.session.post(
+                    self.url, data=body, headers={"Content-Type": body.content_type},
+                    timeout=self.timeout,
+                )
+                if resp.status_code not in self.RETRY_STATUSES:
+                    return resp
+                error = f"n8n returned HTTP {resp.status_code}"
+            except requests.exceptions.ConnectionError as exc:
+                # Only retry when no connection was made. A connection dropped
+                # mid-request, like a read timeout, is not retried: n8n may
+                # already be processing the upload.
+                if not self._not_connected(exc):
+                    raise
+                error = str(exc)
+            if attempt >= self.retries:
+                raise N8nUnavailable(error)
+            attempt += 1
+            self._count("retries")
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+            logger.info("n8n attempt %d failed (%s) — retrying in %.2fs", attempt, error, delay)
+            time.sleep(delay)
+
+    @staticmethod
+    def _not_connected(exc: requests.exceptions.ConnectionError) -> bool:
+        if isinstance(exc, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(exc.args[0], "reason", None) if exc.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def forward(self, session_id, file_path, filename, mimetype, preferences, parsed_text) -> None:
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            M_N8N_RESPONSES.inc("circuit_open")
+            logger.warning("n8n circuit open — failing session=%s", session_id)
+            _store_set(session_id, {"status": "failed", "error": "n8n is unavailable, please retry later."})
+            return
+        started = time.perf_counter()
+        try:
+            logger.info("Forwarding to n8n — session=%s", session_id)
+            body = MultipartFileBody(
+                {
+                    "sessionId":   session_id,
+                    "filename":    filename,
+                    "preferences": json.dumps(preferences),
+                    "parsedText":  parsed_text,
+                },
+                "file", file_path, filename, mimetype or "application/pdf",
+            )
+            self._count("sent")
+            resp = self._post(body)
+        except (N8nUnavailable, requests.exceptions.RequestException) as exc:
+            M_N8N_SECONDS.observe(time.perf_counter() - started)
+            M_N8N_RESPONSES.inc("error")
+            self.breaker.record_failure()
+            self._count("failed")
+            logger.warning("n8n request failed — session=%s: %s", session_id, exc)
+            _store_set(session_id, {"status": "failed", "error": str(exc)})
+            return
+        except Exception:
+            # Not n8n's doing (e.g. the spool file is gone), so the breaker
+            # only gives back a half-open trial instead of counting a failure
+            M_N8N_RESPONSES.inc("error")
+            self.breaker.release()
+            self._count("failed")
+            logger.exception("Forwarding failed — session=%s", session_id)
+            _store_set(session_id, {"status": "failed", "error": "Could not forward the upload."})
+            return
+        M_N8N_SECONDS.observe(time.perf_counter() - started)
+        M_N8N_RESPONSES.inc(str(resp.status_code))
+
+        if resp.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if not resp.ok:
+            self._count("failed")
+            logger.warning("n8n returned %d: %s", resp.status_code, resp.text[:500])
+            _store_set(session_id, {"status": "failed", "error": f"n8n returned HTTP {resp.status_code}"})
+            return
+        try:
+            body = resp.json()
+            processed = (body.get("processedData") or body.get("parsedData")
+                         or body.get("data") or body.get("result"))
+            if processed:
+                _store_set(session_id, {"status": "completed", "data": processed})
+                return
+        except Exception:
+            pass
+        logger.info("n8n accepted — waiting for callback — session=%s", session_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        return {**counts, "circuit": self.breaker.stats()}
+
+
+N8N_FORWARDER = N8nForwarder(
+    N8N_WEBHOOK_URL,
+    max_connections=FORWARD_WORKERS,
+    retries=N8N_RETRIES,
+    backoff=N8N_RETRY_BACKOFF,
+    connect_timeout=N8N_CONNECT_TIMEOUT,
+    read_timeout=N8N_READ_TIMEOUT,
+    breaker=CircuitBreaker(N8N_BREAKER_THRESHOLD, N8N_BREAKER_COOLDOWN),
+)
+
+
+_YEAR        = r"(?:19[89]\d|20[0-4]\d)"
+_MONTH       = r"(?:[A-Za-z]{3,9}\.?,?\s+|\d{1,2}[/.-])?"
+_TEST_NUMBER = re.compile(r"(?<![\d.])(\d{1,3}(?:\.\d)?)(?![\d.])")
+_HEADING_RE  = re.compile(r"^[ \t]*([A-Za-z][A-Za-z &/-]{2,40}?)[ \t]*:?[ \t]*$", re.M)
+_EDUCATION_HEADINGS = ("education", "academic", "qualification")
+_OTHER_HEADINGS = frozenset((
+    "experience", "work", "employment", "professional", "internship", "internships",
+    "projects", "project", "skills", "technical", "certifications", "certification",
+    "publications", "achievements", "awards", "languages", "interests", "hobbies",
+    "activities", "extracurricular", "summary", "objective", "profile", "references",
+    "volunteering", "courses", "training", "declaration", "personal", "contact",
+))
+
+
+def _degree_pattern(full: str, abbrev: str) -> re.Pattern:
+    # Field words must be capitalised so the match stops at "from ...",
+    # "at ...", etc.; only the degree keyword itself is case-insensitive
+    field = r"[A-Z][\w&]*(?:[ \t]+(?:(?:and|of|in|&)[ \t]+)?[A-Z][\w&]*){0,6}"
+    return re.compile(
+        rf"\b(?:(?i:{full})(?:'s|s)?[ \t]+(?:(?i:degree)[ \t]+)?(?:(?i:of|in)[ \t]+){field}"
+        rf"|(?:{abbrev})(?:[ \t]*(?:in|-|–|—|,|\()[ \t]*{field})?)"
+    )
+
+
+class ResumeFieldExtractor:
+    """
+    Rule-based extraction of the fields the n8n workflow asks its LLM for
+    (cgpa, degree, year_of_education, ielts_score, toefl_score), each with
+    a 0–1 confidence. Values use the workflow's format — strings, or
+    "Not Found" — so a local result can stand in for the n8n one.
+
+    ``overall`` is the lowest confidence among cgpa, degree and the test
+    scores (the inputs /api/fuzzy-score needs); year_of_education is
+    reported but does not gate it. A test that is never mentioned counts
+    as confidently absent, one that is mentioned without a readable score
+    does not. With neither test found there is no score to give the
+    fuzzy model, so ``overall`` is 0.
+    """
+
+    NOT_FOUND = "Not Found"
+
+    # (level, pattern); the highest level found is the applicant's degree
+    DEGREES = (
+        (3, _degree_pattern(r"Doctor", r"Ph\.?[ \t]?D\.?")),
+        (2, _degree_pattern(r"Master", r"M\.?[ \t]?Tech\b|M\.?[ \t]?Sc\b|M\.[ \t]?E\.|M\.[ \t]?S\.|"
+                                       r"M\.[ \t]?A\.|M\.?[ \t]?Eng\b|MBA\b|MCA\b|M\.[ \t]?Com\b")),
+        (1, _degree_pattern(r"Bachelor", r"B\.?[ \t]?Tech\b|B\.?[ \t]?Sc\b|B\.[ \t]?E\.|BE(?=[ \t]+in\b)|"
+                                         r"B\.[ \t]?S\.|B\.[ \t]?A\.|B\.?[ \t]?Eng\b|BBA\b|BCA\b|B\.?[ \t]?Com\b")),
+    )
+    CGPA_RE = re.compile(
+        r"\b(?:c\.?[ \t]?g\.?[ \t]?p\.?[ \t]?a|g\.?[ \t]?p\.?[ \t]?a|cpi|grade[ \t]+point[ \t]+average)\b"
+        r"[^0-9\n]{0,20}?(?<![\d.])(\d{1,2}(?:\.\d{1,3})?)(?![\d])"
+        r"(?:[ \t]*(?:/|out[ \t]+of|on[ \t]+a)[ \t]*(\d{1,2}(?:\.\d+)?))?",
+        re.I,
+    )
+    CGPA_SUFFIX_RE = re.compile(
+        r"(?<![\d.])(\d{1,2}\.\d{1,3})(?:[ \t]*/[ \t]*(\d{1,2}(?:\.\d+)?))?[ \t]*"
+        r"\(?(?:c\.?g\.?p\.?a|g\.?p\.?a|cpi)\b",
+        re.I,
+    )
+    GRADUATION_RE = re.compile(
+        r"\b(?:graduat\w*|class[ \t]+of|passing[ \t]+year|year[ \t]+of[ \t]+passing|passed[ \t]+out|"
+        r"completed|completion|expected)\b[^\n\d]{0,25}?" + _MONTH + r"(" + _YEAR + r")\b",
+        re.I,
+    )
+    YEAR_RANGE_RE = re.compile(
+        r"\b(" + _YEAR + r")[ \t]*(?:-|–|—|to)[ \t]*" + _MONTH
+        + r"(" + _YEAR + r"|present|current|now|ongoing|till[ \t]+date)\b",
+        re.I,
+    )
+    YEAR_RE   = re.compile(r"(?<![\d.])(" + _YEAR + r")(?![\d.])")
+    INTENT_RE = re.compile(r"\b(?:seek\w*|pursu\w*|apply\w*|looking|aspir\w*|plan\w*|interested|want\w*)\b", re.I)
+    IELTS_RE  = re.compile(r"\bielts\b|international english language testing", re.I)
+    TOEFL_RE  = re.compile(r"\btoefl\b", re.I)
+    OVERALL_RE = re.compile(r"\b(?:overall|band|total|score)\b", re.I)
+
+    def extract(self, text: str) -> dict:
+        text = text or ""
+        section = self._education_section(text)
+        scope, scoped = (section, True) if section else (text, False)
+
+        degree, degree_conf, degree_at = self._degree(scope, scoped)
+        cgpa, scale, cgpa_conf = self._cgpa(scope)
+        year, year_conf = self._year(scope, degree_at)
+        ielts, ielts_conf = self._test_score(text, self.IELTS_RE, 0.0, 9.0, band=True)
+        toefl, toefl_conf = self._test_score(text, self.TOEFL_RE, 0.0, 120.0, band=False)
+
+        fields = {
+            "cgpa":              self._fmt(cgpa),
+            "degree":            degree or self.NOT_FOUND,
+            "year_of_education": str(year) if year else self.NOT_FOUND,
+            "ielts_score":       self._fmt(ielts),
+            "toefl_score":       self._fmt(toefl),
+        }
+        confidence = {
+            "cgpa":              cgpa_conf,
+            "degree":            degree_conf,
+            "year_of_education": year_conf,
+            "ielts_score":       ielts_conf,
+            "toefl_score":       toefl_conf,
+        }
+        test_score = ielts if ielts is not None else toefl
+        overall = min(cgpa_conf, degree_conf, ielts_conf, toefl_conf) if test_score is not None else 0.0
+        return {
+            "fields":     fields,
+            "confidence": {k: round(v, 2) for k, v in confidence.items()},
+            "overall":    round(overall, 2),
+            "cgpa_scale": scale,
+            "fuzzy_input": {
+                "cgpa":        round(cgpa * 10 / scale, 2) if cgpa is not None else None,
+                "ielts_score": test_score,
+            },
+        }
+
+    def _fmt(self, value: float | None) -> str:
+        return self.NOT_FOUND if value is None else f"{value:g}"
+
+    @staticmethod
+    def _education_section(text: str) -> str | None:
+        """Text between an Education-like heading and the next known heading."""
+        start = None
+        for m in _HEADING_RE.finditer(text):
+            name  = m.group(1).lower()
+            first = name.split()[0].strip("&/-")
+            if start is None:
+                if any(h in name for h in _EDUCATION_HEADINGS):
+                    start = m.end()
+            elif first in _OTHER_HEADINGS:
+                return text[start:m.start()]
+        return text[start:] if start is not None else None
+
+    def _degree(self, scope: str, scoped: bool) -> tuple[str | None, float, int]:
+        for level, pattern in self.DEGREES:
+            found = {}
+            for m in pattern.finditer(scope):
+                line_start = scope.rfind("\n", 0, m.start()) + 1
+                if self.INTENT_RE.search(scope, line_start, m.start()):
+                    continue  # "seeking a Master of Science in ..."
+                name = m.group(0).strip(" \t,(-–—")
+                if name.count("(") > name.count(")"):
+                    name += ")"
+                found.setdefault(name.casefold(), (name, m.start()))
+            if not found:
+                continue
+            # Prefer the most specific spelling, e.g. one that names the field
+            name, at = max(found.values(), key=lambda v: len(v[0]))
+            has_field = len(name.split()) > 1
+            conf = 0.95 if has_field else 0.8
+            distinct = {k for k in found if not name.casefold().startswith(k)}
+            if distinct:
+                conf *= 0.8  # two different degrees at the same level
+            if not scoped:
+                conf *= 0.9
+            return name, conf, at
+        return None, 0.0, -1
+
+    def _cgpa(self, scope: str) -> tuple[float | None, float, float]:
+        candidates = []
+        for pattern, base in ((self.CGPA_RE, 1.0), (self.CGPA_SUFFIX_RE, 0.95)):
+            for m in pattern.finditer(scope):
+                value = float(m.group(1))
+                scale = float(m.group(2)) if m.group(2) else None
+                if scale is not None:
+                    if scale not in (4.0, 5.0, 10.0) or value > scale:
+                        continue
+                    conf = 0.95
+                elif value > 10:
+                    continue
+                elif value > 5:
+                    scale, conf = 10.0, 0.85
+                else:
+                    scale, conf = 4.0, 0.6  # 3.6 could be /4 or a weak /10
+                candidates.append((m.start(), value, scale, conf * base))
+        if not candidates:
+            return None, 10.0, 0.0
+        candidates.sort()
+        _, value, scale, conf = candidates[0]
+        if len({(v, s) for _, v, s, _ in candidates}) > 1:
+            conf *= 0.8  # several grades listed; take the first (most recent)
+        return value, scale, conf
+
+    def _year(self, scope: str, degree_at: int) -> tuple[int | None, float]:
+        years = {int(m.group(1)) for m in self.GRADUATION_RE.finditer(scope)}
+        if years:
+            return max(years), 0.9 if len(years) == 1 else 0.75
+        if degree_at >= 0:
+            # The line holding the degree and one either side
+            lo = scope.rfind("\n", 0, max(scope.rfind("\n", 0, degree_at), 0)) + 1
+            hi = degree_at
+            for _ in range(2):
+                nxt = scope.find("\n", hi + 1)
+                hi = len(scope) if nxt < 0 else nxt
+            window = scope[lo:hi]
+            ends = [int(m.group(2)) for m in self.YEAR_RANGE_RE.finditer(window)
+                    if m.group(2).isdigit()]
+            if ends:
+                return max(ends), 0.85
+            if self.YEAR_RANGE_RE.search(window) is None:
+                singles = [int(y) for y in self.YEAR_RE.findall(window)]
+                if singles:
+                    return max(singles), 0.8
+        return None, 0.0
+
+    def _test_score(self, text: str, name_re: re.Pattern, lo: float, hi: float,
+                    band: bool) -> tuple[float | None, float]:
+        mention = name_re.search(text)
+        if mention is None:
+            return None, 1.0  # never mentioned: confidently absent
+        window = text[mention.end():mention.end() + 160]
+        # Stop at the second line break: the score sits next to the test name
+        cut = window.find("\n", window.find("\n") + 1)
+        window = window[:cut] if cut >= 0 else window
+
+        values = []
+        for m in _TEST_NUMBER.finditer(window):
+            value = float(m.group(1))
+            if lo <= value <= hi and (not band or value * 2 == int(value * 2)):
+                labelled = self.OVERALL_RE.search(window, max(m.start() - 12, 0), m.start())
+                values.append((value, labelled is not None))
+        if not values:
+            return None, 0.3
+        labelled = [v for v, is_labelled in values if is_labelled]
+        if labelled:
+            return labelled[0], 0.95
+        if len(values) == 1:
+            return values[0][0], 0.9
+        numbers = [v for v, _ in values]
+        best = max(numbers)
+        if not band and abs(sum(numbers) - 2 * best) < 1:
+            return best, 0.9  # TOEFL total followed by its section scores
+        return (best if not band else numbers[0]), 0.6
+
+
+RESUME_EXTRACTOR = ResumeFieldExtractor()
+
+
+class PipelineFull(RuntimeError):
+    """Raised when the ingestion pipeline has no room for another upload."""
+
+
+class IngestionPipeline:
+    """
+    Staged resume ingestion: the request thread receives and validates
+    the upload and spools it to disk, then extraction/OCR and the n8n forward each run on their
+    own bounded thread pool. Session status moves through
+    queued → extracting → forwarding → completed | failed.
+
+    With LOCAL_EXTRACT enabled, extracted text first goes through
+    RESUME_EXTRACTOR; when its confidence reaches
+    LOCAL_EXTRACT_CONFIDENCE the session is scored and completed on
+    the extract worker and never reaches n8n (the "fast path").
+
+    At most ``max_pending`` uploads may be in the pipeline at once;
+    beyond that submit() raises PipelineFull so the endpoint can shed load.
+    """
+
+    def __init__(self, extract_workers: int, forward_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._extract    = ThreadPoolExecutor(max_workers=extract_workers,
+                                              thread_name_prefix="extract")
+        self._forward    = ThreadPoolExecutor(max_workers=forward_workers,
+                                              thread_name_prefix="forward")
+        self._lock       = threading.Lock()
+        self._pending    = {"extracting": 0, "forwarding": 0}
+        self._completed  = 0
+        self._failed     = 0
+        self._local      = {"hit": 0, "miss": 0, "error": 0}
+
+    def submit(self, session_id, file_path, filename, mimetype, preferences) -> None:
+        with self._lock:
+            if sum(self._pending.values()) >= self.max_pending:
+                raise PipelineFull(f"{self.max_pending} uploads already in the pipeline")
+            self._pending["extracting"] += 1
+        try:
+            _store_set(session_id, {"status": "queued", "data": None, "error": None})
+            self._extract.submit(self._run_extract, session_id, file_path, filename,
+                                 mimetype, preferences)
+        except Exception:
+            _discard_upload(file_path)
+            self._move("extracting", None)
+            raise
+
+    def _move(self, src: str | None, dst: str | None) -> None:
+        with self._lock:
+            if src:
+                self._pending[src] -= 1
+            if dst:
+                self._pending[dst] += 1
+
+    def _run_extract(self, session_id, file_path, filename, mimetype, preferences) -> None:
+        # Whatever fails here (including the session store), the stage's
+        # pending slot and the spool file are released unless handed on
+        stage = "extracting"
+        try:
+            _store_set(session_id, {"status": "extracting"})
+            try:
+                parsed_text = self._extract_with_retry(session_id, file_path)
+            except Exception as exc:
+                logger.exception("Extraction failed — session=%s: %s", session_id, exc)
+                error = ("OCR crashed on this document; it may be damaged or too large."
+                         if isinstance(exc, OcrWorkerCrashed) else "Text extraction failed.")
+                _store_set(session_id, {"status": "failed", "error": error})
+                with self._lock:
+                    self._failed += 1
+                return
+            if LOCAL_EXTRACT_ENABLED and self._complete_locally(session_id, parsed_text, preferences):
+                return
+            self._move("extracting", "forwarding")
+            stage = "forwarding"
+            _store_set(session_id, {"status": "forwarding"})
+            self._forward.submit(self._run_forward, session_id, file_path, filename,
+                                 mimetype, preferences, parsed_text)
+            stage = None  # _run_forward owns both now
+        except Exception as exc:
+            logger.exception("Ingestion failed — session=%s: %s", session_id, exc)
+            with self._lock:
+                self._failed += 1
+            try:
+                _store_set(session_id, {"status": "failed", "error": "Processing failed."})
+            except Exception:
+                pass
+        finally:
+            if stage:
+                _discard_upload(file_path)
+                self._move(stage, None)
+
+    def _complete_locally(self, session_id, parsed_text, preferences) -> bool:
+        """Finish the session from the local extractor if it is confident enough."""
+        confidence = 0.0
+        try:
+            result     = RESUME_EXTRACTOR.extract(parsed_text)
+            confidence = result["overall"]
+            outcome    = "hit" if confidence >= LOCAL_EXTRACT_CONFIDENCE else "miss"
+            if outcome == "hit":
+                profile = result["fuzzy_input"]
+                response = recommend_programmes(
+                    DATASET.current,
+                    cgpa=profile["cgpa"],
+                    test_score=profile["ielts_score"],
+                    degree_filter=(preferences.get("degreeLevel") or "Master").strip(),
+                    field_query=(preferences.get("fieldOfStudy") or "").strip(),
+                    filters=_parse_filters(preferences),  # location, courseLanguage
+                    limit=DEFAULT_RESULTS_LIMIT,
+                    offset=0,
+                    endpoint="local",
+                )
+                _store_set(session_id, {"status": "completed", "data": {
+                    **response,
+                    "source":         "local",
+                    "extracted_data": result["fields"],
+                    "confidence":     result["confidence"],
+                }})
+        except Exception as exc:
+            logger.exception("Local extraction failed — session=%s: %s", session_id, exc)
+            outcome = "error"
+        M_LOCAL_EXTRACT.inc(outcome)
+        with self._lock:
+            self._local[outcome] += 1
+        logger.info("Local extraction %s (confidence %.2f) — session=%s",
+                    outcome, confidence, session_id)
+        return outcome == "hit"
+
+    @staticmethod
+    def _extract_with_retry(session_id, file_path, attempts: int = 3, delay: float = 2.0) -> str:
+        for attempt in range(1, attempts + 1):
+            try:
+                return extract_text_from_pdf_file(file_path)
+            except OcrQueueFull as exc:
+                if attempt == attempts:
+                    raise
+                logger.info("OCR queue full, retrying in %.1fs — session=%s: %s",
+                            delay * attempt, session_id, exc)
+                time.sleep(delay * attempt)
+
+    def _run_forward(self, session_id, file_path, filename, mimetype, preferences,
+                     parsed_text) -> None:
+        try:
+            N8N_FORWARDER.forward(session_id, file_path, filename, mimetype, preferences, parsed_text)
+        finally:
+            _discard_upload(file_path)
+            self._move("forwarding", None)
+            status = (_store_get(session_id) or {}).get("status")
+            with self._lock:
+                if status == "failed":
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            local = dict(self._local)
+            attempts = sum(local.values())
+            return {
+                "extracting":  self._pending["extracting"],
+                "forwarding":  self._pending["forwarding"],
+                "max_pending": self.max_pending,
+                "forwarded":   self._completed,
+                "failed":      self._failed,
+                "local_extract": {
+                    **local,
+                    "hit_rate": round(local["hit"] / attempts, 3) if attempts else None,
+                },
+            }
+
+
+INGESTION = IngestionPipeline(EXTRACT_WORKERS, FORWARD_WORKERS, PIPELINE_MAX_PENDING)
+
+
+@app.route("/api/submit-preferences", methods=["POST"])
+def submit_preferences():
+    try:
+        content_length = request.content_length
+        if content_length and content_length > MAX_FILE_SIZE + 10_240:
+            return jsonify({"success": False, "error": "Request body too large."}), 413
+
+        session_id  = request.form.get("sessionId") or str(uuid.uuid4())
+        preferences = {
+            "fieldOfStudy":    request.form.get("fieldOfStudy"),
+            "degreeLevel":     request.form.get("degreeLevel"),
+            "location":        request.form.get("location"),
+            "courseLanguage":  request.form.get("courseLanguage"),
+            "additionalPrefs": request.form.get("additionalPrefs", ""),
+        }
+
+        resume_queued = False
+        if "resume" in request.files:
+            file = request.files["resume"]
+            if file and file.filename:
+                if not allowed_file(file.filename):
+                    return jsonify({"success": False, "error": "Invalid file type."}), 400
+                file.stream.seek(0)
+                file_path = _spool_upload(file.stream)
+                if file_path is None:
+                    return jsonify({"success": False, "error": "File exceeds 20 MB limit."}), 400
+                M_UPLOAD_BYTES.observe(os.path.getsize(file_path))
+                filename    = secure_filename(file.filename)
+                mimetype    = file.mimetype or "application/pdf"
+                try:
+                    INGESTION.submit(session_id, file_path, filename, mimetype, preferences)
+                except PipelineFull as exc:
+                    _discard_upload(file_path)
+                    logger.warning("Ingestion backpressure — session=%s: %s", session_id, exc)
+                    return jsonify({"success": False, "error": "Too many uploads in progress, retry shortly."}), 503, {"Retry-After": "5"}
+                resume_queued = True
+
+        if not resume_queued:
+            _store_set(session_id, {"status": "no_resume", "data": None, "error": None})
+
+        return jsonify({
+            "success":      True,
+            "sessionId":    session_id,
+            "resumeQueued": resume_queued,
+            "message":      "Resume queued. Poll /api/status/<sessionId>."
+                            if resume_queued else "Preferences received. No resume uploaded.",
+        }), 202
+
+    except RequestEntityTooLarge:
+        return jsonify({"success": False, "error": "Request body too large."}), 413
+    except Exception as exc:
+        logger.exception("Error in /api/submit-preferences: %s", exc)
+        return jsonify({"success": False, "error": "Internal server error."}), 500
+
+
+TERMINAL_STATUSES = ("completed", "failed", "no_resume")
+
+
+def _status_payload(session_id: str, entry: dict) -> tuple[dict, int]:
+    status    = entry.get("status", "processing")
+    http_code = 200 if status in TERMINAL_STATUSES else 202
+    return {
+        "success":   status == "completed",
+        "sessionId": session_id,
+        "status":    status,
+        "data":      entry.get("data"),
+        "error":     entry.get("error"),
+        "updatedAt": entry.get("updated_at", datetime.now(timezone.utc)).isoformat(),
+    }, http_code
+
+
+def _wait_for_update(session_id: str, since, timeout: float) -> dict | None:
+    """
+    The session entry once its updated_at differs from ``since``; {} if
+    the session disappeared, None on timeout.
+    """
+    def check():
+        entry = _store_get(session_id)
+        if entry is None or entry.get("updated_at") != since:
+            return entry or {}
+        return None
+    return _notifier.wait_for(session_id, check, timeout)
+
+
+@app.route("/api/status/<session_id>", methods=["GET"])
+def get_status(session_id: str):
+    """
+    Current session status. With ``?wait=N`` (seconds, up to
+    STATUS_MAX_WAIT) a pending session is held open until its status
+    changes or the wait runs out, instead of the client polling.
+    """
+    entry = _store_get(session_id)
+    if entry is None:
+        return jsonify({"success": False, "status": "not_found", "message": "Unknown session ID."}), 404
+
+    try:
+        wait = float(request.args.get("wait", 0))
+    except ValueError:
+        wait = math.nan
+    if not math.isfinite(wait):
+        return jsonify({"success": False, "error": "wait must be a number of seconds"}), 400
+    wait = min(max(wait, 0.0), STATUS_MAX_WAIT)
+    if wait and entry.get("status") not in TERMINAL_STATUSES:
+        updated = _wait_for_update(session_id, entry.get("updated_at"), wait)
+        if updated == {}:
+            return jsonify({"success": False, "status": "not_found", "message": "Unknown session ID."}), 404
+        entry = updated or entry
+
+    payload, http_code = _status_payload(session_id, entry)
+    return jsonify(payload), http_code
+
+
+@app.route("/api/status/<session_id>/events", methods=["GET"])
+def status_events(session_id: str):
+    """
+    Server-Sent Events stream of status updates for one session. Sends a
+    ``status`` event on every change, keep-alive comments in between, and
+    closes after a terminal status or STATUS_STREAM_MAX_SECONDS.
+    """
+    if _store_get(session_id) is None:
+        return jsonify({"success": False, "status": "not_found", "message": "Unknown session ID."}), 404
+
+    def stream():
+        deadline = time.monotonic() + STATUS_STREAM_MAX_SECONDS
+        entry = _store_get(session_id)
+        while True:
+            if not entry:
+                yield 'event: status\ndata: {"success": false, "status": "not_found"}\n\n'
+                return
+            payload, _ = _status_payload(session_id, entry)
+            yield f"event: status\ndata: {json.dumps(payload, default=str)}\n\n"
+            if payload["status"] in TERMINAL_STATUSES:
+                return
+            since = entry.get("updated_at")
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                entry = _wait_for_update(session_id, since, min(remaining, STATUS_KEEPALIVE_SECONDS))
+                if entry is not None:
+                    break
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/receive-extracted-data", methods=["POST"])
+def n8n_callback():
+    try:
+        data = request.get_json(force=True, silent=True) or {}
+        if not data:
+            raw = request.data.decode("utf-8", errors="replace")
+            try:
+                data = json.loads(raw)
+            except Exception:
+                data = {"raw": raw}
+
+        session_id = data.get("sessionId")
+        if not session_id:
+            return jsonify({"success": False, "error": "sessionId required"}), 400
+
+        processed = (data.get("processedData") or data.get("parsedData")
+                     or data.get("data") or data.get("result"))
+        entry = _store_get(session_id)
+        if entry and entry.get("created_at"):
+            M_CALLBACK_SECONDS.observe(
+                (datetime.now(timezone.utc) - entry["created_at"]).total_seconds()
+            )
+        _store_set(session_id, {"status": "completed", "data": processed, "error": None})
+        logger.info("n8n callback stored — session=%s", session_id)
+        return jsonify({"success": True}), 200
+
+    except Exception as exc:
+        logger.exception("n8n callback error: %s", exc)
+        return jsonify({"success": False, "error": "Internal server error."}), 500
+
+
+def _parse_page(data: dict) -> tuple[int, int]:
+    try:
+        limit  = int(data.get("limit", DEFAULT_RESULTS_LIMIT))
+        offset = int(data.get("offset", 0))
+    except (TypeError, ValueError):
+        raise ValueError("limit and offset must be integers")
+    if not 1 <= limit <= MAX_RESULTS_LIMIT:
+        raise ValueError(f"limit must be between 1 and {MAX_RESULTS_LIMIT}")
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    return limit, offset
+
+
+def _as_list(value, name: str) -> list:
+    """Casefolded keys from a string/number or a list of them; anything else is a ValueError."""
+    values = value if isinstance(value, list) else [value]
+    for v in values:
+        if v is not None and (isinstance(v, bool) or not isinstance(v, (str, int, float))):
+            raise ValueError(f"{name} must be a string or a list of strings")
+    return [str(v).strip().casefold() for v in values if v is not None and str(v).strip()]
+
+
+def _parse_range(data: dict, lo_key: str, hi_key: str) -> tuple | None:
+    """(lo, hi) from two optional bounds, None for an open end; None if both are absent."""
+    if data.get(lo_key) is None and data.get(hi_key) is None:
+        return None
+    try:
+        lo = float(data[lo_key]) if data.get(lo_key) is not None else None
+        hi = float(data[hi_key]) if data.get(hi_key) is not None else None
+    except (TypeError, ValueError):
+        raise ValueError(f"{lo_key} and {hi_key} must be numbers")
+    if not all(math.isfinite(v) for v in (lo, hi) if v is not None):
+        raise ValueError(f"{lo_key} and {hi_key} must be finite")
+    if lo is not None and hi is not None and lo > hi:
+        raise ValueError(f"{lo_key} must not exceed {hi_key}")
+    return lo, hi
+
+
+def _parse_filters(data: dict) -> dict:
+    """Structured filters from a request body, normalised for FilterIndex.plan()."""
+    filters = {}
+    location = data.get("location")
+    city = data.get("city")
+    if not city and location:
+        if not isinstance(location, str):
+            raise ValueError("location must be a string")
+        city = location.split(",")[0]
+    if city and (cities := _as_list(city, "city")):
+        filters["city"] = cities
+    language = data.get("teaching_language") or data.get("courseLanguage")
+    if language and (languages := _as_list(language, "teaching_language")):
+        filters["teaching_language"] = languages
+    tuition = _parse_range(data, "tuition_min", "tuition_max")
+    if tuition:
+        filters["tuition"] = tuition
+    if data.get("duration_semesters") is not None:
+        data = {"duration_min": data["duration_semesters"], "duration_max": data["duration_semesters"]}
+    duration = _parse_range(data, "duration_min", "duration_max")
+    if duration:
+        filters["duration"] = duration
+    return filters
+
+
+def _score_candidates(partition: DegreePartition, cgpa: float, test_score: float,
+                      rows: np.ndarray, relevance: np.ndarray | None,
+                      limit: int, offset: int) -> tuple[list, int]:
+    """
+    Fuzzy-score only the dataset rows in ``rows`` that fall in ``partition``
+    and return (page of records, total). With ``relevance`` (BM25 per row)
+    the ranking blends it with suitability by SEARCH_RELEVANCE_WEIGHT.
+    """
+    local = partition.local_index[rows]
+    keep  = local >= 0
+    cand  = local[keep]
+
+    suitability = FUZZY_SCORER.score_column(cgpa, test_score, partition.strictness_score[cand])
+    if relevance is None:
+        match = suitability
+    else:
+        relevance = relevance[keep]
+        if len(cand):
+            relevance = relevance / relevance.max()
+        w = SEARCH_RELEVANCE_WEIGHT
+        match = (1 - w) * suitability + w * relevance
+
+    top = rank_top_k(match, partition.course_id[cand], offset + limit)[offset:]
+    results = []
+    for i in top:
+        record = partition.record(cand[i], suitability[i])
+        if relevance is not None:
+            record["relevance"]   = round(float(relevance[i]), 3)
+            record["match_score"] = round(float(match[i]), 3)
+        results.append(record)
+    return results, len(cand)
+
+
+def recommend_programmes(snapshot: DatasetSnapshot, cgpa: float, test_score: float,
+                         degree_filter: str, field_query: str, filters: dict,
+                         limit: int, offset: int, endpoint: str = "single") -> dict:
+    """One page of recommendations from ``snapshot``; the body of /api/fuzzy-score."""
+    started   = time.perf_counter()
+    partition = snapshot.partitions.get(degree_filter, snapshot.partitions["All"])
+    if field_query and not tokenize(field_query):
+        field_query = ""  # only stopwords/punctuation ("the", "-"): nothing to search for
+
+    # Narrow to candidate dataset rows: search hits first (already
+    # small), else the most selective filter, then probe the rest
+    rows, relevance = None, None
+    if field_query:
+        rows, relevance = snapshot.search_index.search(field_query)
+    if filters:
+        plan = snapshot.filter_index.plan(filters)
+        if rows is None:
+            rows = snapshot.filter_index.select(plan)
+        else:
+            keep = snapshot.filter_index.matches(plan, rows)
+            rows, relevance = rows[keep], relevance[keep]
+
+    if rows is not None:
+        results, total = _score_candidates(
+            partition, cgpa, test_score, rows, relevance, limit, offset
+        )
+    else:
+        # Score every program in the partition in one vectorised pass
+        scores = FUZZY_SCORER.score_column(cgpa, test_score, partition.strictness_score)
+
+        # Score descending, Course ID ascending on ties; only the requested page is built
+        top = rank_top_k(scores, partition.course_id, offset + limit)[offset:]
+        results = [partition.record(i, scores[i]) for i in top]
+        total   = len(partition)
+    M_FUZZY_SECONDS.observe(time.perf_counter() - started, endpoint)
+    M_FUZZY_ROWS.inc(endpoint, amount=total)
+
+    response = {
+        "recommendations": results,
+        "total":           total,
+        "limit":           limit,
+        "offset":          offset,
+        "dataset_version": snapshot.version,
+    }
+    if field_query:
+        response["field_of_study"] = field_query
+    if filters:
+        response["filters"] = filters
+    return response
+
+
+@app.route("/api/fuzzy-score", methods=["POST"])
+def fuzzy_score():
+    """
+    Called by n8n after extracting student details from resume.
+
+    Expected JSON body:
+    {
+        "cgpa":          8.5,
+        "ielts_score":   7.0,
+        "degree_filter": "Master",
+        "field_of_study": "computer science",   (optional, also "fieldOfStudy")
+        "city":          "Berlin",  (optional, string or list; also "location")
+        "teaching_language": "english",         (optional, also "courseLanguage")
+        "tuition_min":   0,         (optional, EUR per semester)
+        "tuition_max":   1500,      (optional)
+        "duration_min":  2,         (optional, semesters; or "duration_semesters")
+        "duration_max":  4,         (optional)
+        "limit":         10,        (optional, max MAX_RESULTS_LIMIT)
+        "offset":        0          (optional)
+    }
+
+    Returns one page of recommended programs sorted by suitability score,
+    ties broken by Course ID so pages are stable across calls. With a
+    field of study, only programmes matching it in the search index are
+    scored, and they are ranked by a blend of suitability and normalised
+    BM25 relevance (SEARCH_RELEVANCE_WEIGHT). Structured filters are
+    resolved against the precomputed filter indexes before scoring.
+    """
+    try:
+        data = request.get_json(force=True, silent=True)
+        if not data:
+            return jsonify({"success": False, "error": "No JSON body received"}), 400
+        if not isinstance(data, dict):
+            return jsonify({"success": False, "error": "JSON body must be an object"}), 400
+
+        cgpa          = float(data.get("cgpa", 0))
+        test_score    = float(data.get("ielts_score", 0))
+        degree_filter = str(data.get("degree_filter", "Master")).strip()
+        field_query   = str(data.get("field_of_study") or data.get("fieldOfStudy") or "").strip()
+        try:
+            limit, offset = _parse_page(data)
+            filters = _parse_filters(data)
+        except ValueError as exc:
+            return jsonify({"success": False, "error": str(exc)}), 400
+
+        # One snapshot for the whole request, even if a reload swaps it meanwhile
+        response = recommend_programmes(DATASET.current, cgpa, test_score, degree_filter,
+                                        field_query, filters, limit, offset)
+        return jsonify({"success": True, **response}), 200
+
+    except Exception as e:
+        logger.exception("Fuzzy model error: %s", e)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _parse_applicant(item) -> tuple[float, float, str]:
+    if not isinstance(item, dict):
+        raise ValueError("applicant must be a JSON object")
+    try:
+        cgpa       = float(item.get("cgpa", 0))
+        test_score = float(item.get("ielts_score", 0))
+    except (TypeError, ValueError):
+        raise ValueError("cgpa and ielts_score must be numbers")
+    if not (np.isfinite(cgpa) and np.isfinite(test_score)):
+        raise ValueError("cgpa and ielts_score must be finite")
+    return cgpa, test_score, str(item.get("degree_filter", "Master")).strip()
+
+
+@app.route("/api/fuzzy-score/batch", methods=["POST"])
+def fuzzy_score_batch():
+    """
+    Scores many applicants against the DAAD programmes in one request.
+
+    Expected JSON body:
+    {
+        "applicants": [
+            {"id": "s1", "cgpa": 8.5, "ielts_score": 7.0, "degree_filter": "Master"},
+            ...
+        ],
+        "limit": 10        (optional, max MAX_RESULTS_LIMIT)
+    }
+
+    Returns one result per applicant, in input order. An invalid applicant
+    gets its own error entry instead of failing the whole batch.
+    """
+    try:
+        data = request.get_json(force=True, silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get("applicants"), list):
+            return jsonify({"success": False, "error": "JSON body with an 'applicants' list required"}), 400
+
+        applicants = data["applicants"]
+        if len(applicants) > MAX_BATCH_SIZE:
+            return jsonify({"success": False, "error": f"At most {MAX_BATCH_SIZE} applicants per batch"}), 413
+        try:
+            limit, _ = _parse_page({"limit": data.get("limit", DEFAULT_RESULTS_LIMIT)})
+        except ValueError as exc:
+            return jsonify({"success": False, "error": str(exc)}), 400
+
+        snapshot = DATASET.current
+        results: list = [None] * len(applicants)
+        groups: dict = {}
+        for i, item in enumerate(applicants):
+            try:
+                cgpa, test_score, degree_filter = _parse_applicant(item)
+            except ValueError as exc:
+                results[i] = {"index": i, "success": False, "error": str(exc)}
+                continue
+            key = degree_filter if degree_filter in snapshot.partitions else "All"
+            groups.setdefault(key, []).append((i, cgpa, test_score))
+
+        # One vectorised pass per degree partition
+        started = time.perf_counter()
+        scored  = 0
+        for key, members in groups.items():
+            partition = snapshot.partitions[key]
+            idx   = [m[0] for m in members]
+            cgpas = np.array([m[1] for m in members], dtype=float)
+            tests = np.array([m[2] for m in members], dtype=float)
+            top, scores = rank_batch(partition, cgpas, tests, limit)
+            scored += len(partition) * len(members)
+            for row, i in enumerate(idx):
+                results[i] = {
+                    "index":           i,
+                    "success":         True,
+                    "recommendations": [partition.record(j, s) for j, s in zip(top[row], scores[row])],
+                }
+
+        M_FUZZY_SECONDS.observe(time.perf_counter() - started, "batch")
+        M_FUZZY_ROWS.inc("batch", amount=scored)
+
+        for i, item in enumerate(applicants):
+            if isinstance(item, dict) and "id" in item:
+                results[i]["id"] = item["id"]
+
+        return jsonify({
+            "success": True,
+            "dataset_version": snapshot.version,
+            "count":   len(results),
+            "failed":  sum(1 for r in results if not r["success"]),
+            "results": results,
+        }), 200
+
+    except Exception as e:
+        logger.exception("Batch fuzzy model error: %s", e)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _process_memory() -> dict:
+    """
+    This process's memory in bytes: rss, plus pss (shared pages divided
+    among the processes sharing them) and uss (private pages) where
+    /proc/self/smaps_rollup exists. Forked workers sharing preloaded
+    state show a uss well below their rss.
+    """
+    try:
+        fields = {}
+        with open("/proc/self/smaps_rollup") as fh:
+            for line in fh:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                    fields[key] = int(value.split()[0]) * 1024
+        return {"rss": fields["Rss"], "pss": fields["Pss"],
+                "uss": fields["Private_Clean"] + fields["Private_Dirty"]}
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        with open("/proc/self/statm") as fh:
+            return {"rss": int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")}
+    except (OSError, ValueError):
+        return {}
+
+
+METRICS.gauge("sessions", "Sessions in the session store.", lambda: len(_store))
+METRICS.gauge("ingestion_pending", "Uploads in each ingestion stage.",
+              lambda: {(stage,): INGESTION.stats()[stage] for stage in ("extracting", "forwarding")},
+              ("stage",))
+METRICS.gauge("ocr_jobs_in_flight", "OCR pool jobs running or queued.",
+              lambda: OCR_POOL.stats()["in_flight"] if OCR_POOL else 0)
+METRICS.gauge("n8n_circuit_open", "1 while the n8n circuit breaker is open.",
+              lambda: int(N8N_FORWARDER.stats()["circuit"]["state"] == "open"))
+METRICS.gauge("dataset_programs", "Programmes in the current dataset snapshot (0 until it loads).",
+              lambda: len(DATASET._current.df) if DATASET._current is not None else 0)
+METRICS.gauge("process_memory_bytes", "Memory of this process by kind: rss, pss, uss.",
+              lambda: {(kind,): value for kind, value in _process_memory().items()}, ("kind",))
+METRICS.gauge("import_seconds", "Time taken to import the app module.", lambda: IMPORT_SECONDS)
+
+
+@app.route("/api/metrics", methods=["GET"])
+def metrics():
+    """
+    Metrics in the Prometheus text exposition format. Values are per
+    process; with several workers, scrape each or aggregate by instance.
+    """
+    return Response(METRICS.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _is_admin_request() -> bool:
+    """
+    ADMIN_TOKEN in X-Admin-Token. Without ADMIN_TOKEN admin endpoints are
+    disabled: behind a same-host reverse proxy every caller is loopback.
+    """
+    if not ADMIN_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN)
+
+
+@app.route("/api/admin/reload-dataset", methods=["POST"])
+def reload_dataset():
+    """
+    Reloads the DAAD dataset in the background and swaps it in when ready.
+
+    Optional JSON body: {"wait": true} to reload synchronously, and
+    {"force": true} to rebuild even if the CSV hash is unchanged. Only
+    this worker reloads; others pick the change up via their file watch.
+    """
+    if not _is_admin_request():
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+    data  = request.get_json(force=True, silent=True) or {}
+    force = bool(data.get("force"))
+    if data.get("wait"):
+        outcome = DATASET.reload(force=force)
+        code    = {"failed": 500, "busy": 409}.get(outcome, 200)
+        return jsonify({"success": outcome in ("reloaded", "unchanged"), "result": outcome,
+                        "dataset": DATASET.stats()}), code
+    started = DATASET.reload_async(force=force)
+    return jsonify({"success": True, "result": "started" if started else "busy",
+                    "dataset": DATASET.stats()}), 202
+
+
+@app.route("/api/health", methods=["GET"])
+def health_check():
+    return jsonify({
+        "status":            "healthy",
+        "programs_loaded":   len(DATASET.current.df),
+        "dataset":           DATASET.stats(),
+        "search_terms":      len(DATASET.current.search_index.vocabulary),
+        "ocr": {
+            "pytesseract": OCR_BACKENDS.available("pytesseract"),
+            "easyocr":     OCR_BACKENDS.available("easyocr"),
+            "backends":    OCR_BACKENDS.stats(),
+            "pool":        OCR_POOL.stats() if OCR_POOL else None,
+        },
+        "fuzzy": {
+            "compiled_surface": FUZZY_SURFACE is not None,
+            "surface_max_error": FUZZY_SURFACE.max_error if FUZZY_SURFACE else None,
+            "surface_validation_points": FUZZY_SURFACE.validation_points if FUZZY_SURFACE else 0,
+        },
+        "ingestion":         INGESTION.stats(),
+        "extraction_cache":  EXTRACTION_CACHE.stats(),
+        "sessions_in_store": len(_store),
+        "session_store":     _store.stats(),
+        "n8n_webhook":       N8N_WEBHOOK_URL,
+        "n8n_forwarder":     N8N_FORWARDER.stats(),
+        "process": {
+            "pid":            os.getpid(),
+            "import_seconds": round(IMPORT_SECONDS, 3),
+            "preloaded":      PRELOADED,
+            "memory_mb":      {k: round(v / 2**20, 1) for k, v in _process_memory().items()},
+        },
+    }), 200
+
+
+PRELOADED = False
+
+
+def preload() -> None:
+    """
+    Load the heavy read-only state now rather than on first use: the
+    dataset snapshot and the OCR backends (the fuzzy tables are built at
+    import). Run in a server's master process before it forks, workers
+    share these pages copy-on-write; gc.freeze() keeps the collector from
+    writing to (and so copying) them.
+    """
+    global PRELOADED
+    started = time.perf_counter()
+    snapshot = DATASET.load()
+    for name in ("pytesseract", "easyocr"):
+        OCR_BACKENDS.load(name)
+    gc.freeze()
+    PRELOADED = True
+    logger.info("Preloaded dataset %s and OCR backends in %.2fs",
+                snapshot.version, time.perf_counter() - started)
+
+
+def create_app(preload_state: bool = APP_PRELOAD) -> Flask:
+    """
+    App factory for WSGI servers. With ``preload_state`` (or APP_PRELOAD=1)
+    the heavy state is loaded here; with gunicorn's --preload that is the
+    master, and every forked worker shares it:
+
+        gunicorn --preload -w 4 "app:create_app(preload_state=True)"
+
+    Otherwise each worker loads what it needs on first use. The OCR pool
+    is always started lazily, in the process that first needs it.
+    """
+    if preload_state:
+        preload()
+    logger.info("App ready in %.2fs since import (pid %d)",
+                time.perf_counter() - _IMPORT_STARTED, os.getpid())
+    return app
+
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+
+if __name__ == "__main__":
+    if "--build-dataset-artifact" in sys.argv:
+        csv_path = DATASET_PATH
+        csv_sha  = _file_sha256(csv_path)
+        save_dataset_artifact(_parse_daad_csv(csv_path), _artifact_dir(csv_path, csv_sha), csv_sha)
+        logger.info("Dataset artifact ready: %s", _artifact_dir(csv_path, csv_sha))
+        sys.exit(0)
+    if "--compile-fuzzy-surface" in sys.argv:
+        surface = CompiledSuitabilitySurface.compile(FUZZY_ENGINE)
+        surface.save(FUZZY_SURFACE_PATH)
+        logger.info("Saved fuzzy surface to %s — max error %.4f",
+                    FUZZY_SURFACE_PATH, surface.validate(FUZZY_ENGINE))
+        sys.exit(0)
+    logger.info("Starting backend on http://0.0.0.0:5000")
+    create_app().run(host="0.0.0.0", port=5000, debug=False)
\ No newline at end of file
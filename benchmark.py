@@ -0,0 +1,446 @@
+"""
+Offline benchmark suite for the backend.
+
+Covers the fuzzy model, /api/fuzzy-score per degree filter, dataset cold
+start, PDF text extraction on a generated corpus (text-only, scanned and
+mixed documents) and the submit/status cycle against a local stand-in
+for the n8n webhook. Nothing leaves the machine.
+
+Each benchmark reports p50/p95/p99 latency in milliseconds, the peak
+Python allocation of one traced iteration, and process RSS. Results are
+written as JSON and compared against a stored baseline; p50 or p95 more
+than --tolerance above the baseline is flagged as a regression.
+
+    python benchmark.py                          # run, compare, write results
+    python benchmark.py --quick --only fuzzy     # fewer iterations, one group
+    python benchmark.py --update-baseline        # store this run as the baseline
+    python benchmark.py --fail-on-regression     # exit 1 on any regression
+"""
+
+import argparse
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+HERE             = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(HERE, "benchmark_baseline.json")
+DEFAULT_OUTPUT   = os.path.join(HERE, "benchmark_results.json")
+GROUPS           = ("fuzzy", "endpoint", "dataset", "extract", "cycle")
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def measure(fn, iterations: int, warmup: int = 2) -> dict:
+    """Time ``fn`` ``iterations`` times, then trace one more call for peak allocation."""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ms = samples * 1000
+    return {
+        "iterations":    iterations,
+        "mean_ms":       round(float(ms.mean()), 4),
+        "min_ms":        round(float(ms.min()), 4),
+        "p50_ms":        round(float(np.percentile(ms, 50)), 4),
+        "p95_ms":        round(float(np.percentile(ms, 95)), 4),
+        "p99_ms":        round(float(np.percentile(ms, 99)), 4),
+        "max_ms":        round(float(ms.max()), 4),
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "rss_mb":        round(_rss_mb(), 1),
+    }
+
+
+# ---------------------------------------------------------------------------
+# PDF corpus (minimal writer, so the corpus needs no extra dependencies)
+# ---------------------------------------------------------------------------
+
+RESUME_LINES = [
+    "Jane Doe - Curriculum Vitae",
+    "Education: Bachelor of Technology in Computer Science, 2019 - 2023",
+    "CGPA: 8.6 / 10",
+    "IELTS overall band score: 7.5",
+    "Experience: Software engineering intern, data pipelines and APIs",
+    "Skills: Python, SQL, machine learning, distributed systems",
+]
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _scan_image(seed: int, width: int = 850, height: int = 1100) -> bytes:
+    """Grayscale page of dark 'word' blocks on white, like a scanned letter."""
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width), 245, dtype=np.uint8)
+    for y in range(80, height - 80, 28):
+        x = 70
+        while x < width - 120:
+            w = int(rng.integers(20, 90))
+            img[y:y + 14, x:x + w] = rng.integers(10, 60)
+            x += w + int(rng.integers(8, 16))
+    img = np.clip(img.astype(int) + rng.integers(-12, 12, img.shape), 0, 255).astype(np.uint8)
+    return img.tobytes()
+
+
+def build_pdf(pages: list) -> bytes:
+    """
+    A PDF with one page per spec: ("text", [lines]) draws Helvetica text,
+    ("scan", seed) embeds a full-page grayscale image and no text layer.
+    """
+    objects: list = [None]                      # 1-based object numbers
+
+    def add(body) -> int:
+        objects.append(body)
+        return len(objects) - 1
+
+    def stream(data: bytes, extra: str = "") -> bytes:
+        return b"<< %s /Length %d >>\nstream\n%s\nendstream" % (extra.encode(), len(data), data)
+
+    font     = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(None)
+    kids = []
+    for kind, arg in pages:
+        if kind == "text":
+            ops = ["BT /F1 11 Tf 15 TL 72 740 Td"]
+            ops += [f"({_pdf_escape(line)}) Tj T*" for line in arg]
+            ops.append("ET")
+            content   = add(stream("\n".join(ops).encode("latin-1")))
+            resources = f"<< /Font << /F1 {font} 0 R >> >>"
+        else:
+            data  = zlib.compress(_scan_image(arg))
+            image = add(stream(data, "/Type /XObject /Subtype /Image /Width 850 /Height 1100 "
+                                     "/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode"))
+            content   = add(stream(b"q 612 0 0 792 0 0 cm /Im1 Do Q"))
+            resources = f"<< /XObject << /Im1 {image} 0 R >> >>"
+        kids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 612 792] "
+            f"/Resources {resources} /Contents {content} 0 R >>".encode()
+        ))
+    objects[pages_id] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+    )
+    catalog = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for num in range(1, len(objects)):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (num, objects[num]))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % len(objects))
+    for off in offsets:
+        out.write(b"%010d 00000 n \n" % off)
+    out.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+              % (len(objects), catalog, xref))
+    return out.getvalue()
+
+
+def pdf_corpus() -> dict:
+    text = [("text", RESUME_LINES + [f"Project {i}: coursework and publications" for i in range(30)])]
+    return {
+        "text_only": build_pdf(text * 3),
+        "scanned":   build_pdf([("scan", 1), ("scan", 2)]),
+        "mixed":     build_pdf(text + [("scan", 3)] + text),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Local n8n stand-in
+# ---------------------------------------------------------------------------
+
+class _N8nStub(BaseHTTPRequestHandler):
+    reply = json.dumps({"processedData": {
+        "cgpa": 8.6, "degree": "B.Tech", "year_of_education": 4, "ielts_score": 7.5,
+    }}).encode()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        else:
+            # Chunked upload from the streaming multipart body
+            while True:
+                size = int(self.rfile.readline().strip() or b"0", 16)
+                self.rfile.read(size + 2)
+                if size == 0:
+                    break
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.reply)))
+        self.end_headers()
+        self.wfile.write(self.reply)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_n8n_stub() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _N8nStub)
+    threading.Thread(target=server.serve_forever, name="n8n-stub", daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_fuzzy(app, scale: float) -> dict:
+    rng   = np.random.default_rng(0)
+    cases = list(zip(rng.uniform(4, 10, 256), rng.uniform(5, 9, 256),
+                     rng.choice([0.3, 0.6, 0.9], 256)))
+    state = {"i": 0}
+
+    def one_call():
+        cgpa, test, strict = cases[state["i"] % len(cases)]
+        state["i"] += 1
+        app.run_fuzzy_model(cgpa, test, strict)
+
+    return {"fuzzy.run_fuzzy_model": measure(one_call, int(2000 * scale))}
+
+
+def bench_endpoint(app, scale: float) -> dict:
+    client  = app.app.test_client()
+    results = {}
+    for degree in ("Master", "Bachelor", "PhD", "All"):
+        body = {"cgpa": 8.2, "ielts_score": 7.0, "degree_filter": degree}
+
+        def call(body=body):
+            resp = client.post("/api/fuzzy-score", json=body)
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+
+        results[f"endpoint.fuzzy_score[{degree}]"] = measure(call, int(300 * scale))
+    return results
+
+
+def bench_dataset(app, scale: float) -> dict:
+    path = app.DATASET_PATH
+    iterations = max(int(10 * scale), 3)
+    return {
+        "dataset.parse_csv":     measure(lambda: app._parse_daad_csv(path), iterations, warmup=1),
+        "dataset.load":          measure(lambda: app.load_daad_dataset(path), iterations, warmup=1),
+        "dataset.snapshot":      measure(lambda: app.DatasetSnapshot(path, app._file_sha256(path)),
+                                         iterations, warmup=1),
+    }
+
+
+def bench_extract(app, scale: float) -> dict:
+    results = {}
+    for name, pdf in pdf_corpus().items():
+        results[f"extract.{name}"] = measure(
+            lambda pdf=pdf: app.extract_text_from_pdf_bytes(pdf), max(int(30 * scale), 3)
+        )
+    return results
+
+
+def bench_cycle(app, scale: float) -> dict:
+    client = app.app.test_client()
+    pdf    = pdf_corpus()["text_only"]
+
+    def cycle():
+        resp = client.post("/api/submit-preferences", data={
+            "fieldOfStudy": "computer-science", "degreeLevel": "Master",
+            "location": "Berlin", "courseLanguage": "english",
+            "resume": (io.BytesIO(pdf), "resume.pdf"),
+        }, content_type="multipart/form-data")
+        assert resp.status_code == 202, resp.get_data(as_text=True)
+        session_id = resp.get_json()["sessionId"]
+        deadline   = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            status = client.get(f"/api/status/{session_id}?wait=10").get_json().get("status")
+            if status in app.TERMINAL_STATUSES:
+                assert status == "completed", status
+                return
+        raise TimeoutError(f"session {session_id} did not finish")
+
+    # The corpus resume is confident enough for the local fast path; turn
+    # it off to time the n8n round trip through the stub
+    iterations = max(int(40 * scale), 3)
+    results    = {}
+    enabled    = app.LOCAL_EXTRACT_ENABLED
+    try:
+        for name, local in (("cycle.fast_path", True), ("cycle.submit_to_completed", False)):
+            app.LOCAL_EXTRACT_ENABLED = local
+            results[name] = measure(cycle, iterations)
+    finally:
+        app.LOCAL_EXTRACT_ENABLED = enabled
+    return results
+
+
+BENCHMARKS = {
+    "fuzzy":    bench_fuzzy,
+    "endpoint": bench_endpoint,
+    "dataset":  bench_dataset,
+    "extract":  bench_extract,
+    "cycle":    bench_cycle,
+}
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+def compare(current: dict, baseline: dict, tolerance: float) -> dict:
+    comparison = {}
+    for name, result in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        entry = {}
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "peak_alloc_kb"):
+            ratio = result[metric] / base[metric] if base.get(metric) else None
+            entry[metric] = {"baseline": base.get(metric), "current": result[metric],
+                             "ratio": round(ratio, 3) if ratio is not None else None}
+        # p99 is too noisy at these iteration counts to gate on
+        entry["regression"] = any(
+            entry[m]["ratio"] is not None and entry[m]["ratio"] > 1 + tolerance
+            for m in ("p50_ms", "p95_ms")
+        )
+        comparison[name] = entry
+    return comparison
+
+
+def print_report(results: dict, comparison: dict) -> None:
+    print(f"\n{'benchmark':<36} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'alloc KB':>10}  vs baseline")
+    for name, r in results.items():
+        cmp = comparison.get(name)
+        note = ""
+        if cmp:
+            ratio = cmp["p50_ms"]["ratio"]
+            note  = f"p50 x{ratio:.2f}" if ratio is not None else ""
+            if cmp["regression"]:
+                note += "  REGRESSION"
+        print(f"{name:<36} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} {r['p99_ms']:>10.3f} "
+              f"{r['peak_alloc_kb']:>10.1f}  {note}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(GROUPS),
+                        help=f"comma-separated groups to run ({', '.join(GROUPS)})")
+    parser.add_argument("--quick", action="store_true", help="run a tenth of the iterations")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="write this run's results to the baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p50/p95 slowdown before flagging (default 0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's INFO logging")
+    args = parser.parse_args(argv)
+
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+    scale = 0.1 if args.quick else 1.0
+
+    # Isolate the run: no file watch, no extraction cache (every extraction
+    # is cold), artifacts and sessions in a scratch directory, n8n on the stub
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    stub    = start_n8n_stub()
+    os.environ.update({
+        "N8N_WEBHOOK_URL":            f"http://127.0.0.1:{stub.server_address[1]}/webhook",
+        "DATASET_WATCH_SECONDS":      "0",
+        "DATASET_ARTIFACT_DIR":       os.path.join(scratch, "artifacts"),
+        "EXTRACTION_CACHE_DIR":       "",
+        "EXTRACTION_CACHE_MEMORY_MB": "0",
+        "SESSION_BACKEND":            "memory",
+        "UPLOAD_SPOOL_DIR":           scratch,
+    })
+    os.chdir(HERE)
+    sys.path.insert(0, HERE)
+
+    rss_before = _rss_mb()
+    start      = time.perf_counter()
+    import app
+    import_seconds = time.perf_counter() - start
+    import_rss_mb  = _rss_mb() - rss_before
+    # Heavy optional modules that importing app pulled in; OCR backends load lazily
+    heavy_imports  = sorted(m for m in ("torch", "easyocr", "pytesseract") if m in sys.modules)
+    if not args.verbose:
+        app.logger.setLevel(logging.WARNING)
+
+    results = {}
+    for group in groups:
+        print(f"running {group} ...", file=sys.stderr)
+        results.update(BENCHMARKS[group](app, scale))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh).get("benchmarks", {})
+    comparison = compare(results, baseline, args.tolerance)
+
+    report = {
+        "meta": {
+            "timestamp":      time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python":         platform.python_version(),
+            "numpy":          np.__version__,
+            "platform":       platform.platform(),
+            "cpu_count":      os.cpu_count(),
+            "quick":          args.quick,
+            "import_seconds": round(import_seconds, 3),
+            "import_rss_mb":  round(import_rss_mb, 1),
+            "heavy_imports":  heavy_imports,
+            "ocr":            app.OCR_BACKENDS.stats(),
+        },
+        "benchmarks": results,
+        "comparison": comparison,
+        "regressions": sorted(name for name, c in comparison.items() if c["regression"]),
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({"meta": report["meta"], "benchmarks": results}, fh, indent=2)
+
+    print_report(results, comparison)
+    print(f"\nresults written to {args.output}"
+          + (f"; baseline updated at {args.baseline}" if args.update_baseline else ""))
+    stub.shutdown()
+    if report["regressions"]:
+        print(f"regressions: {', '.join(report['regressions'])}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+"""
+Bulk resume extraction.
+
+Walks a directory tree (or a .zip / .tar[.gz] archive) for PDFs and runs
+each one through app.extract_text_from_pdf_bytes on a pool of worker
+processes. Results stream to a JSONL file as they finish, one line per
+file with per-stage timings and the profile found by the local field
+extractor. Files already recorded in the output are skipped, so an
+interrupted run resumes where it stopped. A worker killed by the OS
+fails the files it had in flight (recorded as errors, so a rerun does
+not trip over them again) and the pool is rebuilt. With --score, each
+profile is also scored against the DAAD dataset in the same run.
+
+    python bulk_ingest.py resumes/ -o resumes.jsonl
+    python bulk_ingest.py resumes.zip -o resumes.jsonl --score --top 5
+    python bulk_ingest.py resumes/ -o resumes.jsonl --retry-errors
+
+Memory stays flat however large the corpus is:
+  - at most --max-in-flight files are queued or being processed;
+  - workers are replaced after --max-tasks-per-child files;
+  - the extraction cache is off unless --cache-dir is given.
+Workers OCR pages in-process (no nested OCR pool) with OpenMP held to
+one thread, so --workers processes keep that many cores busy.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+
+HERE          = os.path.dirname(os.path.abspath(__file__))
+PDF_SUFFIX    = ".pdf"
+MAX_PDF_BYTES = 20 * 1024 * 1024
+
+# Applied before app is imported, in this process and (inherited) in workers
+WORKER_ENV = {
+    "PDF_WORKERS":                "0",   # OCR in the worker itself; the pool is the parallelism
+    "EXTRACTION_CACHE_MEMORY_MB": "0",
+    "DATASET_WATCH_SECONDS":      "0",
+}
+THREAD_ENV = {
+    "OMP_THREAD_LIMIT": "1",   # tesseract
+    "OMP_NUM_THREADS":  "1",
+}
+
+_app = None
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+def iter_sources(source: str):
+    """
+    Yield (key, path, read) for every PDF under ``source``. Files on disk
+    come with a path (the worker reads them); archive members come with a
+    ``read`` callable that must be called before the next item is taken.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(PDF_SUFFIX):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path, None
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(PDF_SUFFIX):
+                    yield os.path.normpath(info.filename), None, lambda info=info: zf.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source, "r:*") as tar:
+            for member in tar:
+                if member.isfile() and member.name.lower().endswith(PDF_SUFFIX):
+                    yield (os.path.normpath(member.name), None,
+                           lambda member=member: tar.extractfile(member).read())
+                tar.members = []   # TarFile otherwise keeps every header it has read
+    else:
+        raise ValueError(f"{source} is not a directory, zip or tar archive")
+
+
+def load_done(output: str, retry_errors: bool) -> set:
+    """
+    Keys already in ``output``. A torn last line from an interrupted run
+    is removed first. With ``retry_errors`` failed files are left out;
+    their new line supersedes the old one.
+    """
+    done = set()
+    if not os.path.exists(output):
+        return done
+    _drop_torn_line(output)
+    with open(output, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok" or not retry_errors:
+                done.add(record["file"])
+    return done
+
+
+def _drop_torn_line(output: str) -> None:
+    """Truncate ``output`` after its last newline, dropping a half-written record."""
+    with open(output, "rb+") as fh:
+        end = pos = fh.seek(0, os.SEEK_END)
+        while pos > 0:
+            step = min(pos, 1 << 16)
+            pos -= step
+            fh.seek(pos)
+            chunk = fh.read(step)
+            if pos + step == end and chunk.endswith(b"\n"):
+                return
+            cut = chunk.rfind(b"\n")
+            if cut >= 0:
+                fh.truncate(pos + cut + 1)
+                return
+        fh.truncate(0)
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _init_worker(verbose: bool) -> None:
+    global _app
+    import app
+    if not verbose:
+        app.logger.setLevel(logging.ERROR)
+    _app = app
+
+
+def process_file(key: str, path: str | None, data: bytes | None, include_text: bool) -> dict:
+    """Extract one PDF; never raises, failures come back as status "error"."""
+    timings = {}
+    record  = {"file": key, "worker": os.getpid()}
+    started = time.perf_counter()
+    try:
+        if data is None:
+            with open(path, "rb") as fh:
+                data = fh.read(MAX_PDF_BYTES + 1)
+        timings["read"] = time.perf_counter() - started
+        if len(data) > MAX_PDF_BYTES:
+            raise ValueError(f"larger than {MAX_PDF_BYTES // 2**20} MB")
+
+        step = time.perf_counter()
+        text = _app.extract_text_from_pdf_bytes(data)
+        timings["extract"] = time.perf_counter() - step
+        if not text.strip():
+            # Unreadable PDFs and scans without an OCR engine both come back empty
+            raise ValueError("no text extracted")
+
+        step    = time.perf_counter()
+        profile = _app.RESUME_EXTRACTOR.extract(text)
+        timings["fields"] = time.perf_counter() - step
+
+        record.update({
+            "status":  "ok",
+            "bytes":   len(data),
+            "sha256":  hashlib.sha256(data).hexdigest(),
+            "chars":   len(text),
+            "profile": profile,
+        })
+        if include_text:
+            record["text"] = text
+    except Exception as exc:
+        record.update({"status": "error", "error": f"{type(exc).__name__}: {exc}"})
+    timings["total"] = time.perf_counter() - started
+    record["timings"] = {k: round(v, 4) for k, v in timings.items()}
+    return record
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+def score_record(app, record: dict, degree_filter: str, field_query: str, top: int) -> None:
+    """Add the top ``top`` programmes for the record's profile (in place)."""
+    profile = record["profile"]["fuzzy_input"]
+    if profile["cgpa"] is None or profile["ielts_score"] is None:
+        record["recommendations"] = None   # the fuzzy model needs both inputs
+        return
+    started  = time.perf_counter()
+    response = app.recommend_programmes(
+        app.DATASET.current, profile["cgpa"], profile["ielts_score"],
+        degree_filter, field_query, {}, top, 0, endpoint="bulk",
+    )
+    record["recommendations"]  = response["recommendations"]
+    record["dataset_version"]  = response["dataset_version"]
+    record["timings"]["score"] = round(time.perf_counter() - started, 4)
+
+
+def _new_pool(args) -> ProcessPoolExecutor:
+    # spawn so workers start clean and can be recycled (max_tasks_per_child)
+    return ProcessPoolExecutor(
+        max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(args.verbose,),
+        max_tasks_per_child=args.max_tasks_per_child,
+    )
+
+
+def _percentile(values: list, q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory, .zip or .tar[.gz] of PDFs")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to write (appended to)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-in-flight", type=int, default=0,
+                        help="files queued or in progress at once (default 2 x workers)")
+    parser.add_argument("--max-tasks-per-child", type=int, default=200,
+                        help="replace a worker after this many files, bounding leaks")
+    parser.add_argument("--retry-errors", action="store_true",
+                        help="reprocess files recorded with status error")
+    parser.add_argument("--no-text", action="store_true", help="omit the extracted text")
+    parser.add_argument("--cache-dir", default="",
+                        help="reuse/populate the on-disk extraction cache (off by default)")
+    parser.add_argument("--score", action="store_true", help="score each profile against the DAAD dataset")
+    parser.add_argument("--degree-filter", default="Master")
+    parser.add_argument("--field-of-study", default="")
+    parser.add_argument("--top", type=int, default=5, help="programmes per profile with --score")
+    parser.add_argument("--progress", type=float, default=10.0, help="seconds between progress lines")
+    parser.add_argument("--verbose", action="store_true", help="keep the app's INFO/WARNING logging")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    max_in_flight = args.max_in_flight or 2 * args.workers
+
+    source, output = os.path.abspath(args.source), os.path.abspath(args.output)
+    os.environ.update(WORKER_ENV, EXTRACTION_CACHE_DIR=args.cache_dir and os.path.abspath(args.cache_dir))
+    for key, value in THREAD_ENV.items():
+        os.environ.setdefault(key, value)
+    os.chdir(HERE)
+    sys.path.insert(0, HERE)
+
+    app = None
+    if args.score:
+        import app
+        if not args.verbose:
+            app.logger.setLevel(logging.WARNING)
+        app.DATASET.load()
+
+    done     = load_done(output, args.retry_errors)
+    counts   = {"ok": 0, "error": 0, "skipped": 0}
+    extract  = []
+    restarts = 0
+    started  = last_report = time.monotonic()
+
+    def write(out, record: dict) -> None:
+        if args.score and record["status"] == "ok":
+            score_record(app, record, args.degree_filter, args.field_of_study, args.top)
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        counts[record["status"]] += 1
+        if "extract" in record["timings"]:
+            extract.append(record["timings"]["extract"])
+
+    def collect(out, future, key: str) -> None:
+        try:
+            record = future.result()
+        except BrokenProcessPool:
+            # A worker was killed (OOM, native crash). Every file in flight on
+            # that pool is recorded as failed so a rerun does not hit it again;
+            # --retry-errors picks them up.
+            record = {"file": key, "status": "error", "error": "worker process died", "timings": {}}
+        write(out, record)
+
+    def report(final: bool = False) -> None:
+        elapsed = time.monotonic() - started
+        n = counts["ok"] + counts["error"]
+        print(f"{'done' if final else 'progress'}: {n} processed ({counts['error']} errors), "
+              f"{counts['skipped']} skipped, {n / max(elapsed, 1e-9):.1f} files/s, "
+              f"{elapsed:.0f}s", file=sys.stderr)
+
+    pool = _new_pool(args)
+    out  = open(output, "a", encoding="utf-8")
+    pending: dict = {}   # future -> key
+    try:
+        for key, path, read in iter_sources(source):
+            if key in done:
+                counts["skipped"] += 1
+                continue
+            job = (process_file, key, path, read() if read else None, not args.no_text)
+            try:
+                future = pool.submit(*job)
+            except BrokenProcessPool:
+                pool.shutdown(wait=False)
+                pool = _new_pool(args)
+                restarts += 1
+                print(f"worker pool died; restarted ({restarts})", file=sys.stderr)
+                future = pool.submit(*job)
+            pending[future] = key
+            while len(pending) >= max_in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    collect(out, future, pending.pop(future))
+            if time.monotonic() - last_report >= args.progress:
+                last_report = time.monotonic()
+                report()
+        for future in as_completed(list(pending)):
+            collect(out, future, pending.pop(future))
+    except KeyboardInterrupt:
+        pool.shutdown(wait=False, cancel_futures=True)
+        out.close()
+        print("interrupted; rerun the same command to resume", file=sys.stderr)
+        return 130
+    pool.shutdown()
+    out.close()
+
+    report(final=True)
+    summary = {
+        **counts,
+        "pool_restarts":       restarts,
+        "elapsed_seconds":     round(time.monotonic() - started, 2),
+        "extract_p50_seconds": _percentile(extract, 0.50),
+        "extract_p95_seconds": _percentile(extract, 0.95),
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Isolate app before it is imported: no file watch, no caches or OCR pool,
+# sessions in memory and n8n pointed at a closed port
+os.environ.update({
+    "DATASET_WATCH_SECONDS":      "0",
+    "EXTRACTION_CACHE_DIR":       "",
+    "EXTRACTION_CACHE_MEMORY_MB": "0",
+    "SESSION_BACKEND":            "memory",
+    "PDF_WORKERS":                "0",
+    "N8N_WEBHOOK_URL":            "http://127.0.0.1:9/webhook",
+})
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
@@ -0,0 +1,91 @@
+"""/api/admin/reload-dataset: token checks and snapshot swaps."""
+
+import os
+import time
+
+import pytest
+
+import app
+from conftest import ROOT
+
+TOKEN = "s3cret-admin-token"
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """A DatasetManager on a 200-programme copy of the CSV, installed as app.DATASET."""
+    monkeypatch.setattr(app, "DATASET_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    path = tmp_path / "daad.csv"
+    with open(os.path.join(ROOT, "DAAD_Dataset_Cleaned.csv"), encoding="utf-8") as src:
+        path.write_text("".join(src.readlines()[:201]), encoding="utf-8")
+    manager = app.DatasetManager(str(path), watch_interval=0)
+    monkeypatch.setattr(app, "DATASET", manager)
+    manager.load()
+    return manager
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def _reload(client, token=None, **body):
+    headers = {"X-Admin-Token": token} if token is not None else {}
+    return client.post("/api/admin/reload-dataset", json=body, headers=headers)
+
+
+def _truncate(manager, programmes):
+    with open(manager.path, encoding="utf-8") as fh:
+        lines = fh.readlines()
+    with open(manager.path, "w", encoding="utf-8") as fh:
+        fh.writelines(lines[:programmes + 1])
+
+
+def test_disabled_without_admin_token(client, dataset, monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", "")
+    assert _reload(client, wait=True).status_code == 403
+    assert _reload(client, "", wait=True).status_code == 403
+    assert _reload(client, TOKEN, wait=True).status_code == 403
+    assert dataset.reloads == 0
+
+
+def test_wrong_token_is_forbidden(client, dataset, monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", TOKEN)
+    assert _reload(client, wait=True).status_code == 403
+    resp = _reload(client, TOKEN[:-1], wait=True, force=True)
+    assert resp.status_code == 403 and resp.get_json() == {"success": False, "error": "Forbidden"}
+    assert dataset.reloads == 0
+
+
+def test_reload_swaps_in_the_changed_csv(client, dataset, monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", TOKEN)
+    before = dataset.current.version
+    resp = _reload(client, TOKEN, wait=True)
+    assert resp.status_code == 200 and resp.get_json()["result"] == "unchanged"
+
+    _truncate(dataset, 100)
+    resp = _reload(client, TOKEN, wait=True)
+    body = resp.get_json()
+    assert resp.status_code == 200 and body["result"] == "reloaded"
+    assert body["dataset"]["version"] != before and body["dataset"]["programs"] == 100
+    response = app.recommend_programmes(dataset.current, 8.5, 7.0, "", "", {}, 5, 0)
+    assert response["dataset_version"] == body["dataset"]["version"]
+
+
+def test_forced_reload_rebuilds_the_same_version(client, dataset, monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", TOKEN)
+    previous = dataset.current
+    body = _reload(client, TOKEN, wait=True, force=True).get_json()
+    assert body["result"] == "reloaded" and body["dataset"]["reloads"] == 1
+    assert dataset.current is not previous and dataset.current.version == previous.version
+
+
+def test_background_reload(client, dataset, monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN", TOKEN)
+    _truncate(dataset, 50)
+    resp = _reload(client, TOKEN)
+    assert resp.status_code == 202 and resp.get_json()["result"] == "started"
+    deadline = time.monotonic() + 10
+    while dataset.reloads == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(dataset.current.df) == 50
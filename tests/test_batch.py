@@ -0,0 +1,48 @@
+"""/api/fuzzy-score/batch request validation."""
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize("body", [[{"cgpa": 8.5}], "applicants", 42, {"applicants": {"cgpa": 8.5}}, {}])
+def test_body_must_be_an_object_with_applicants(client, body):
+    resp = client.post("/api/fuzzy-score/batch", json=body)
+    assert resp.status_code == 400
+    assert resp.get_json()["success"] is False
+
+
+def test_invalid_applicants_fail_individually(client):
+    resp = client.post("/api/fuzzy-score/batch", json={"applicants": [
+        {"id": "ok", "cgpa": 8.5, "ielts_score": 7.0},
+        ["not", "an", "object"],
+        "s2",
+        None,
+        {"id": "bad", "cgpa": "eight", "ielts_score": 7.0},
+        {"cgpa": "nan", "ielts_score": 7.0},
+    ], "limit": 3})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["count"] == 6 and body["failed"] == 5
+    first, *rest = body["results"]
+    assert first["success"] and first["id"] == "ok" and len(first["recommendations"]) == 3
+    assert [r["index"] for r in rest] == [1, 2, 3, 4, 5]
+    assert not any(r["success"] for r in rest)
+    assert rest[3]["id"] == "bad"
+
+
+def test_batch_matches_single_endpoint(client):
+    single = client.post("/api/fuzzy-score", json={"cgpa": 7.9, "ielts_score": 6.5, "limit": 5}).get_json()
+    batch  = client.post("/api/fuzzy-score/batch",
+                         json={"applicants": [{"cgpa": 7.9, "ielts_score": 6.5}], "limit": 5}).get_json()
+    assert batch["results"][0]["recommendations"] == single["recommendations"]
+
+
+def test_single_endpoint_rejects_non_object(client):
+    resp = client.post("/api/fuzzy-score", json=[{"cgpa": 8.5}])
+    assert resp.status_code == 400
@@ -0,0 +1,114 @@
+"""bulk_ingest: resuming from the output file and surviving dead workers."""
+
+import json
+import os
+
+import pytest
+
+import bulk_ingest
+
+
+def fake_process_file(key, path, data, include_text):
+    """Runs in the spawned workers in place of process_file; "crash" files kill the worker."""
+    if "crash" in key:
+        os._exit(1)
+    status = "error" if "bad" in key else "ok"
+    return {"file": key, "status": status, "profile": {}, "timings": {"extract": 0.0}}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    source = tmp_path / "resumes"
+    source.mkdir()
+    return source
+
+
+def _add(source, *names):
+    for name in names:
+        (source / name).write_bytes(b"%PDF-1.4")
+
+
+def _run(monkeypatch, source, output, *extra):
+    monkeypatch.setattr(bulk_ingest, "process_file", fake_process_file)
+    return bulk_ingest.main([str(source), "-o", str(output), "--workers", "1",
+                             "--max-in-flight", "1", "--no-text", *extra])
+
+
+def _records(output):
+    with open(output, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+# ---------------------------------------------------------------------------
+# load_done / _drop_torn_line
+# ---------------------------------------------------------------------------
+
+def _write(path, text):
+    path.write_bytes(text.encode())
+
+
+def test_load_done(tmp_path):
+    output = tmp_path / "out.jsonl"
+    assert bulk_ingest.load_done(str(output), retry_errors=False) == set()
+    _write(output, '{"file": "a.pdf", "status": "ok"}\n{"file": "b.pdf", "status": "error"}\nnot json\n')
+    assert bulk_ingest.load_done(str(output), retry_errors=False) == {"a.pdf", "b.pdf"}
+    assert bulk_ingest.load_done(str(output), retry_errors=True) == {"a.pdf"}
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _write(output, '{"file": "a.pdf", "status": "ok"}\n{"file": "b.pdf", "sta')
+    assert bulk_ingest.load_done(str(output), retry_errors=False) == {"a.pdf"}
+    assert output.read_text() == '{"file": "a.pdf", "status": "ok"}\n'
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", ""),
+    ("torn", ""),
+    ("one\n", "one\n"),
+    ("one\ntwo\n", "one\ntwo\n"),
+    ("x" * 70000 + "\n" + "y" * 70000, "x" * 70000 + "\n"),   # the newline is several chunks back
+    ("x" * 140000, ""),
+])
+def test_drop_torn_line(tmp_path, text, expected):
+    output = tmp_path / "out.jsonl"
+    _write(output, text)
+    bulk_ingest._drop_torn_line(str(output))
+    assert output.read_text() == expected
+
+
+# ---------------------------------------------------------------------------
+# main
+# ---------------------------------------------------------------------------
+
+def test_rerun_skips_recorded_files(monkeypatch, corpus, tmp_path, capsys):
+    output = tmp_path / "out.jsonl"
+    _add(corpus, "a.pdf", "b.pdf", "bad.pdf", "notes.txt")
+    assert _run(monkeypatch, corpus, output) == 0
+    assert sorted((r["file"], r["status"]) for r in _records(output)) == [
+        ("a.pdf", "ok"), ("b.pdf", "ok"), ("bad.pdf", "error"),
+    ]
+
+    _add(corpus, "c.pdf")
+    assert _run(monkeypatch, corpus, output) == 0
+    assert [r["file"] for r in _records(output)][3:] == ["c.pdf"]
+    assert '"skipped": 3' in capsys.readouterr().err
+
+    assert _run(monkeypatch, corpus, output, "--retry-errors") == 0
+    assert [r["file"] for r in _records(output)][4:] == ["bad.pdf"]
+
+
+def test_dead_worker_is_recorded_and_the_run_continues(monkeypatch, corpus, tmp_path, capsys):
+    output = tmp_path / "out.jsonl"
+    _add(corpus, "a.pdf", "b-crash.pdf", "c.pdf")
+    assert _run(monkeypatch, corpus, output) == 0
+    records = {r["file"]: r for r in _records(output)}
+    assert records["a.pdf"]["status"] == "ok"
+    assert records["b-crash.pdf"] == {"file": "b-crash.pdf", "status": "error",
+                                      "error": "worker process died", "timings": {}}
+    assert records["c.pdf"]["status"] == "ok"
+    assert '"pool_restarts": 1' in capsys.readouterr().err
+
+    # The crashing file is not retried on a plain rerun
+    assert _run(monkeypatch, corpus, output) == 0
+    assert len(_records(output)) == 3
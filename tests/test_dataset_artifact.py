@@ -0,0 +1,104 @@
+"""The columnar dataset artifact: round trip, memory mapping and staleness."""
+
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from conftest import ROOT
+
+
+@pytest.fixture
+def csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "DATASET_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(app, "DATASET_ARTIFACT_ENABLED", True)
+    path = tmp_path / "daad.csv"
+    with open(os.path.join(ROOT, "DAAD_Dataset_Cleaned.csv"), encoding="utf-8") as src:
+        path.write_text("".join(src.readlines()[:201]), encoding="utf-8")
+    return str(path)
+
+
+def _artifacts(csv_path):
+    root = app.DATASET_ARTIFACT_DIR
+    return sorted(os.listdir(root)) if os.path.isdir(root) else []
+
+
+def _is_mapped(values: np.ndarray) -> bool:
+    while values is not None:
+        if isinstance(values, mmap.mmap):
+            return True
+        values = getattr(values, "base", None)
+    return False
+
+
+def test_round_trip_matches_the_csv(csv):
+    sha = app._file_sha256(csv)
+    expected = app._parse_daad_csv(csv)
+    directory = app._artifact_dir(csv, sha)
+    app.save_dataset_artifact(expected, directory, sha)
+
+    loaded = app.load_dataset_artifact(directory, sha)
+    pd.testing.assert_frame_equal(loaded, expected)
+    assert oct(os.stat(directory).st_mode & 0o777) == "0o755"
+
+
+def test_numeric_columns_are_memory_mapped(csv):
+    app.load_daad_dataset(csv)                   # builds the artifact
+    df = app.load_daad_dataset(csv)              # loads it
+    numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    assert numeric
+    for col in numeric:
+        assert _is_mapped(df[col].to_numpy()), col
+
+
+def test_first_load_builds_then_reuses(csv, monkeypatch):
+    app.load_daad_dataset(csv)
+    assert len(_artifacts(csv)) == 1
+
+    def no_parse(path):
+        raise AssertionError("CSV parsed although the artifact is current")
+    monkeypatch.setattr(app, "_parse_daad_csv", no_parse)
+    assert len(app.load_daad_dataset(csv)) == 200
+
+
+def test_changed_csv_rebuilds(csv):
+    first = app.load_daad_dataset(csv)
+    with open(csv, encoding="utf-8") as fh:
+        lines = fh.readlines()
+    with open(csv, "w", encoding="utf-8") as fh:
+        fh.writelines(lines[:101])
+    second = app.load_daad_dataset(csv)
+    assert len(first) == 200 and len(second) == 100
+    assert len(_artifacts(csv)) == 2
+
+
+@pytest.mark.parametrize("field, value", [
+    ("version", app.DATASET_ARTIFACT_VERSION + 1),
+    ("csv_sha256", "0" * 64),
+    ("admission_keywords", "stale"),
+])
+def test_stale_meta_is_rebuilt(csv, field, value):
+    sha = app._file_sha256(csv)
+    directory = app._artifact_dir(csv, sha)
+    app.load_daad_dataset(csv)
+    meta_path = os.path.join(directory, "meta.json")
+    with open(meta_path, encoding="utf-8") as fh:
+        meta = json.load(fh)
+    with open(meta_path, "w", encoding="utf-8") as fh:
+        json.dump({**meta, field: value}, fh)
+
+    assert app.load_dataset_artifact(directory, sha) is None
+    pd.testing.assert_frame_equal(app.load_daad_dataset(csv), app._parse_daad_csv(csv))
+
+
+def test_keyword_tiers_are_part_of_the_key(csv, monkeypatch):
+    default = app.load_daad_dataset(csv)
+    monkeypatch.setattr(app, "ADMISSION_CLASSIFIER",
+                        app.AdmissionClassifier([("Strict", ["ielts"])], "Lenient"))
+    custom = app.load_daad_dataset(csv)
+    assert len(_artifacts(csv)) == 2
+    assert (custom["admission_strictness"] != default["admission_strictness"]).any()
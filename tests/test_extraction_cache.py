@@ -0,0 +1,125 @@
+"""ExtractionCache tiers and statistics, alone and behind _extract_text."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import app
+from benchmark import build_pdf
+from conftest import ROOT
+
+
+def _cache(directory=None, memory_bytes=1 << 20, disk_bytes=1 << 20):
+    return app.ExtractionCache(str(directory) if directory else None, memory_bytes, disk_bytes)
+
+
+def test_memory_tier_is_an_lru_bounded_in_utf8_bytes():
+    cache = _cache(memory_bytes=10)
+    cache.put("a", "ééé")      # 6 bytes, 3 characters
+    cache.put("b", "xxxx")     # 4 bytes
+    assert cache.stats()["memory_bytes"] == 10
+    assert cache.get("a") == "ééé"             # a is now the most recent
+    cache.put("c", "yy")
+    assert cache.get("b") is None              # b was least recently used
+    assert cache.get("a") == "ééé" and cache.get("c") == "yy"
+    assert cache.stats()["memory_bytes"] == 8
+
+
+def test_oversized_text_skips_the_memory_tier():
+    cache = _cache(memory_bytes=4)
+    cache.put("big", "ééé")
+    assert cache.get("big") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_documents_and_pages_are_counted_separately():
+    cache = _cache()
+    cache.put("doc", "document text")
+    cache.put("page", "page text")
+    assert cache.get("doc", "doc", 1000) == "document text"
+    assert cache.get("page", "page", 200) == "page text"
+    assert cache.get("page", "page", 200) == "page text"
+    assert cache.get("other-page", "page", 300) is None
+    stats = cache.stats()
+    assert stats["documents"] == {"memory_hits": 1, "disk_hits": 0, "misses": 0, "bytes_saved": 1000}
+    assert stats["pages"] == {"memory_hits": 2, "disk_hits": 0, "misses": 1, "bytes_saved": 400}
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    _cache(tmp_path).put("k" * 64, "persisted ü")
+    restarted = _cache(tmp_path, memory_bytes=0)
+    assert restarted.get("k" * 64, "doc", 50) == "persisted ü"
+    stats = restarted.stats()
+    assert stats["documents"]["disk_hits"] == 1 and stats["documents"]["bytes_saved"] == 50
+    assert stats["disk_entries"] == 1
+    assert stats["disk_bytes"] == len("persisted ü".encode())
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, memory_bytes=0, disk_bytes=250)
+    k0, k1, k2 = (f"{i:02d}" + "0" * 62 for i in range(3))
+    cache.put(k0, "x" * 100)
+    cache.put(k1, "x" * 100)
+    os.utime(cache._path(k0), (1000, 1000))
+    os.utime(cache._path(k1), (2000, 2000))
+    assert cache.get(k0) is not None            # a read makes k0 the most recent
+
+    cache.put(k2, "x" * 100)                    # 300 bytes > 250: evict down to 90%
+    assert not os.path.exists(cache._path(k1))
+    assert os.path.exists(cache._path(k0)) and os.path.exists(cache._path(k2))
+    assert cache.stats()["disk_entries"] == 2 and cache.stats()["disk_bytes"] == 200
+
+
+def test_directory_is_created_and_sized_on_first_use(tmp_path):
+    directory = tmp_path / "cache"
+    cache = _cache(directory)
+    assert not directory.exists()
+    assert cache.get("a" * 64) is None
+    assert directory.is_dir()
+
+    (directory / "ab").mkdir()
+    (directory / "ab" / ("ab" * 32 + ".txt")).write_text("12345")
+    assert _cache(directory).stats()["disk_entries"] == 0         # nothing walked yet
+    reopened = _cache(directory)
+    reopened.get("cd" * 32)
+    assert reopened.stats()["disk_entries"] == 1 and reopened.stats()["disk_bytes"] == 5
+
+
+def test_import_does_not_touch_the_cache_directory(tmp_path):
+    directory = tmp_path / "cache"
+    env = {**os.environ, "EXTRACTION_CACHE_DIR": str(directory), "EXTRACTION_CACHE_MEMORY_MB": "1"}
+    subprocess.run([sys.executable, "-c", "import app"], cwd=ROOT, env=env, check=True)
+    assert not directory.exists()
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    cache = _cache()
+    monkeypatch.setattr(app, "EXTRACTION_CACHE", cache)
+    monkeypatch.setattr(app, "OCR_POOL", None)
+    monkeypatch.setattr(app, "_ocr_page", lambda page, i, timings=None: f"ocr page {i}")
+    return cache
+
+
+def test_extract_text_statistics(fresh_cache):
+    scans = [("scan", 1), ("scan", 2)]
+    first = build_pdf(scans)
+    app.extract_text_from_pdf_bytes(first)
+    stats = fresh_cache.stats()
+    assert stats["documents"]["misses"] == 1
+    assert stats["pages"]["misses"] == 2 and stats["pages"]["memory_hits"] == 0
+
+    app.extract_text_from_pdf_bytes(first)
+    stats = fresh_cache.stats()
+    assert stats["documents"]["memory_hits"] == 1
+    assert stats["documents"]["bytes_saved"] == len(first)
+
+    # Same scanned pages in a new document: the document misses, its pages hit
+    second = build_pdf(scans + [("text", ["A new cover page with enough embedded text to skip OCR."])])
+    app.extract_text_from_pdf_bytes(second)
+    stats = fresh_cache.stats()
+    assert stats["documents"]["misses"] == 2
+    assert stats["pages"]["memory_hits"] == 2 and stats["pages"]["misses"] == 2
+    assert stats["pages"]["bytes_saved"] > 0
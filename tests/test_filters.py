@@ -0,0 +1,167 @@
+"""Request filter parsing and the FilterIndex planner against plain pandas masks."""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+# ---------------------------------------------------------------------------
+# _parse_filters
+# ---------------------------------------------------------------------------
+
+def test_parse_filters():
+    assert app._parse_filters({
+        "location":       "Berlin, Germany",
+        "courseLanguage": ["English", " German "],
+        "tuition_max":    "1500",
+        "duration_semesters": 4,
+    }) == {
+        "city":              ["berlin"],
+        "teaching_language": ["english", "german"],
+        "tuition":           (None, 1500.0),
+        "duration":          (4.0, 4.0),
+    }
+
+
+def test_city_wins_over_location():
+    assert app._parse_filters({"city": "Munich", "location": {"ignored": True}}) == {"city": ["munich"]}
+
+
+def test_empty_values_are_no_filter():
+    assert app._parse_filters({"city": "", "teaching_language": [None, " "], "tuition_min": None}) == {}
+
+
+@pytest.mark.parametrize("value", ["NaN", "nan", "inf", "-inf", "Infinity", "1e400", float("nan")])
+def test_non_finite_range_is_rejected(value):
+    with pytest.raises(ValueError, match="finite"):
+        app._parse_filters({"tuition_min": value})
+
+
+@pytest.mark.parametrize("data", [
+    {"city": {"name": "Berlin"}},
+    {"city": ["Berlin", ["Munich"]]},
+    {"city": True},
+    {"teaching_language": [{"en": 1}]},
+    {"location": ["Berlin"]},
+])
+def test_non_scalar_keys_are_rejected(data):
+    with pytest.raises(ValueError, match="must be a string"):
+        app._parse_filters(data)
+
+
+def test_inverted_range_is_rejected():
+    with pytest.raises(ValueError, match="must not exceed"):
+        app._parse_filters({"duration_min": 6, "duration_max": 2})
+
+
+@pytest.mark.parametrize("body", [
+    {"tuition_min": "NaN"},
+    {"tuition_max": "inf"},
+    {"city": {"name": "Berlin"}},
+    {"courseLanguage": [["english"]]},
+])
+def test_endpoint_rejects_bad_filters(body):
+    resp = app.app.test_client().post("/api/fuzzy-score", json={"cgpa": 8.5, "ielts_score": 7, **body})
+    assert resp.status_code == 400
+    assert resp.get_json()["success"] is False
+
+
+# ---------------------------------------------------------------------------
+# FilterIndex
+# ---------------------------------------------------------------------------
+
+SMALL = pd.DataFrame({
+    "City":              ["Berlin", "Munich", " berlin ", None, "Hamburg", "Munich"],
+    "Teaching language": ["english", "german english", "german", "english", None, "english french"],
+    "Tuition fees per semester in EUR": [0, 1500, np.nan, 300, 20000, 0],
+    "Duration_in_semesters":            [4, 4, 6, 2, 3, 4],
+})
+
+
+def _pandas_mask(df: pd.DataFrame, filters: dict) -> np.ndarray:
+    mask = pd.Series(True, index=df.index)
+    if "city" in filters:
+        mask &= df["City"].map(lambda v: isinstance(v, str) and v.strip().casefold() in filters["city"])
+    if "teaching_language" in filters:
+        wanted = set(filters["teaching_language"])
+        mask &= df["Teaching language"].map(lambda v: isinstance(v, str) and bool(wanted & set(v.split())))
+    for key, col in (("tuition", "Tuition fees per semester in EUR"), ("duration", "Duration_in_semesters")):
+        if key in filters:
+            lo, hi = filters[key]
+            values = df[col].astype(float)
+            mask &= values.notna()
+            if lo is not None:
+                mask &= values >= lo
+            if hi is not None:
+                mask &= values <= hi
+    return np.flatnonzero(mask.to_numpy())
+
+
+def test_plan_orders_predicates_by_estimate():
+    index = app.FilterIndex(SMALL)
+    plan  = index.plan({"city": ["munich"], "teaching_language": ["english"], "duration": (4, 4)})
+    assert [p.estimate for p in plan] == sorted(p.estimate for p in plan)
+    assert plan[0].estimate == 2   # two rows in Munich
+
+
+def test_small_frame_matches_pandas():
+    index = app.FilterIndex(SMALL)
+    cases = [
+        {},
+        {"city": ["berlin"]},
+        {"city": ["munich", "hamburg"]},
+        {"city": ["nowhere"]},
+        {"teaching_language": ["german"]},
+        {"tuition": (None, 1000.0)},
+        {"tuition": (0.0, None)},
+        {"duration": (3.0, 4.0)},
+        {"city": ["munich"], "teaching_language": ["english"], "tuition": (None, 0.0)},
+    ]
+    for filters in cases:
+        expected = _pandas_mask(SMALL, filters)
+        np.testing.assert_array_equal(index.select(index.plan(filters)), expected, err_msg=str(filters))
+
+
+def _dataset_cases(df: pd.DataFrame):
+    cities    = [[c] for c in df["City"].dropna().str.strip().str.casefold().value_counts().index[:3]]
+    cities   += [["berlin", "munich"], ["nowhere"]]
+    languages = [["english"], ["german"], ["french", "german"]]
+    tuition   = [(None, 0.0), (1.0, 3000.0), (500.0, None)]
+    duration  = [(4.0, 4.0), (2.0, 3.0), (None, 6.0)]
+    yield {}
+    for c in cities:
+        yield {"city": c}
+    for combo in itertools.product([None, *languages], [None, *tuition], [None, *duration]):
+        filters = {k: v for k, v in zip(("teaching_language", "tuition", "duration"), combo) if v}
+        yield filters
+        yield {"city": cities[0], **filters}
+
+
+def test_dataset_filters_match_pandas():
+    snapshot = app.DATASET.current
+    df, index = snapshot.df.reset_index(drop=True), snapshot.filter_index
+    for filters in _dataset_cases(df):
+        plan     = index.plan(filters)
+        expected = _pandas_mask(df, filters)
+        np.testing.assert_array_equal(index.select(plan), expected, err_msg=str(filters))
+        # Probing arbitrary candidate rows (the search path) agrees as well
+        rows = np.arange(0, len(df), 3)
+        np.testing.assert_array_equal(rows[index.matches(plan, rows)],
+                                      np.intersect1d(rows, expected), err_msg=str(filters))
+
+
+def test_bitmap_and_sorted_index_match_pandas():
+    snapshot = app.DATASET.current
+    df, index = snapshot.df.reset_index(drop=True), snapshot.filter_index
+    for key in list(index.language.bitmaps)[:10]:
+        rows = app._bitmap_rows(index.language.bitmap([key]), len(df))
+        np.testing.assert_array_equal(rows, _pandas_mask(df, {"teaching_language": [key]}))
+        assert index.language.counts[key] == len(rows)
+    for lo, hi in [(0.0, 0.0), (1.0, 500.0), (1000.0, 1e9)]:
+        start, stop = index.tuition.span(lo, hi)
+        np.testing.assert_array_equal(np.sort(index.tuition.order[start:stop]),
+                                      _pandas_mask(df, {"tuition": (lo, hi)}))
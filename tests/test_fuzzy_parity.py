@@ -0,0 +1,135 @@
+"""The vectorised fuzzy engine must match the original model exactly, the compiled surface closely."""
+
+import numpy as np
+import pytest
+import skfuzzy as fuzz
+
+import app
+
+
+def original_fuzzy_model(cgpa: float, test_score: float, admission_strictness: float) -> float:
+    """run_fuzzy_model as it was before the engine was vectorised (verbatim logic)."""
+    if test_score <= 9:
+        test_score = test_score * (120 / 9)
+
+    x_cgpa        = np.linspace(0, 10,  100)
+    x_test        = np.linspace(0, 120, 100)
+    x_strict      = np.linspace(0, 1,   100)
+    x_suitability = np.linspace(0, 1,   100)
+
+    cgpa_low  = fuzz.trimf(x_cgpa, [0,   0,   6.5])
+    cgpa_med  = fuzz.trimf(x_cgpa, [5,   7,   9  ])
+    cgpa_high = fuzz.trimf(x_cgpa, [7.5, 10,  10 ])
+
+    test_weak   = fuzz.trimf(x_test, [0,   0,   85 ])
+    test_avg    = fuzz.trimf(x_test, [80,  100, 110])
+    test_strong = fuzz.trimf(x_test, [105, 120, 120])
+
+    strict_lenient = fuzz.trimf(x_strict, [0,   0,   0.4])
+    strict_mod     = fuzz.trimf(x_strict, [0.3, 0.5, 0.7])
+    strict_strict  = fuzz.trimf(x_strict, [0.6, 1,   1  ])
+
+    suit_low  = fuzz.trimf(x_suitability, [0,   0,   0.4])
+    suit_med  = fuzz.trimf(x_suitability, [0.3, 0.5, 0.7])
+    suit_high = fuzz.trimf(x_suitability, [0.6, 1,   1  ])
+
+    cgpa_l = fuzz.interp_membership(x_cgpa, cgpa_low,  cgpa)
+    cgpa_m = fuzz.interp_membership(x_cgpa, cgpa_med,  cgpa)
+    cgpa_h = fuzz.interp_membership(x_cgpa, cgpa_high, cgpa)
+
+    test_w = fuzz.interp_membership(x_test, test_weak,   test_score)
+    test_a = fuzz.interp_membership(x_test, test_avg,    test_score)
+    test_s = fuzz.interp_membership(x_test, test_strong, test_score)
+
+    strict_l = fuzz.interp_membership(x_strict, strict_lenient, admission_strictness)
+    strict_m = fuzz.interp_membership(x_strict, strict_mod,     admission_strictness)
+    strict_s = fuzz.interp_membership(x_strict, strict_strict,  admission_strictness)
+
+    rules = [
+        # High CGPA
+        (cgpa_h, test_s, strict_s, suit_high), (cgpa_h, test_s, strict_m, suit_high),
+        (cgpa_h, test_s, strict_l, suit_high), (cgpa_h, test_a, strict_s, suit_med),
+        (cgpa_h, test_a, strict_m, suit_high), (cgpa_h, test_a, strict_l, suit_high),
+        (cgpa_h, test_w, strict_s, suit_med),  (cgpa_h, test_w, strict_m, suit_med),
+        (cgpa_h, test_w, strict_l, suit_med),
+        # Medium CGPA
+        (cgpa_m, test_s, strict_s, suit_med),  (cgpa_m, test_s, strict_m, suit_med),
+        (cgpa_m, test_s, strict_l, suit_high), (cgpa_m, test_a, strict_s, suit_low),
+        (cgpa_m, test_a, strict_m, suit_med),  (cgpa_m, test_a, strict_l, suit_med),
+        (cgpa_m, test_w, strict_s, suit_low),  (cgpa_m, test_w, strict_m, suit_low),
+        (cgpa_m, test_w, strict_l, suit_med),
+        # Low CGPA
+        (cgpa_l, test_s, strict_s, suit_low),  (cgpa_l, test_s, strict_m, suit_low),
+        (cgpa_l, test_s, strict_l, suit_med),  (cgpa_l, test_a, strict_s, suit_low),
+        (cgpa_l, test_a, strict_m, suit_low),  (cgpa_l, test_a, strict_l, suit_low),
+        (cgpa_l, test_w, strict_s, suit_low),  (cgpa_l, test_w, strict_m, suit_low),
+        (cgpa_l, test_w, strict_l, suit_low),
+    ]
+    aggregated = None
+    for c, t, s, out in rules:
+        r = np.fmin(np.fmin(np.fmin(c, t), s), out)
+        aggregated = r if aggregated is None else np.fmax(aggregated, r)
+
+    try:
+        final_score = fuzz.defuzz(x_suitability, aggregated, "centroid")
+    except Exception:
+        final_score = 0.0
+    return round(final_score, 3)
+
+
+def _inputs(n: int = 3000, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    cgpa   = rng.uniform(0, 10, n).round(2)
+    # Half IELTS bands, half TOEFL totals
+    test   = np.where(rng.random(n) < 0.5, rng.uniform(0, 9, n).round(1), rng.uniform(10, 120, n).round(0))
+    strict = rng.choice([0.3, 0.6, 0.9], n)
+    edges  = [(0, 0, 0.3), (10, 9, 0.9), (10, 120, 0.6), (6.5, 85, 0.3), (7.5, 9, 0.6), (5, 80, 0.9)]
+    for c, t, s in edges:
+        cgpa, test, strict = np.append(cgpa, c), np.append(test, t), np.append(strict, s)
+    return cgpa, test, strict
+
+
+def test_run_fuzzy_model_matches_original():
+    for c, t, s in zip(*_inputs(500)):
+        assert app.run_fuzzy_model(c, t, s) == original_fuzzy_model(c, t, s), (c, t, s)
+
+
+def test_vectorised_engine_matches_original():
+    cgpa, test, strict = _inputs()
+    expected = np.array([original_fuzzy_model(c, t, s) for c, t, s in zip(cgpa, test, strict)])
+    np.testing.assert_array_equal(app.FUZZY_ENGINE.score(cgpa, test, strict), expected)
+
+
+def test_score_column_matches_original():
+    strictness = np.array([0.3, 0.6, 0.9, 0.6, 0.3])
+    for cgpa, test in [(8.5, 7.0), (6.0, 95), (9.7, 118), (3.2, 5.5)]:
+        expected = [original_fuzzy_model(cgpa, test, s) for s in strictness]
+        np.testing.assert_array_equal(app.FUZZY_ENGINE.score_column(cgpa, test, strictness), expected)
+
+
+# ---------------------------------------------------------------------------
+# CompiledSuitabilitySurface (FUZZY_COMPILED_SURFACE=1) is an approximation
+# ---------------------------------------------------------------------------
+
+SURFACE_TOLERANCE = 0.02     # worst case, next to the membership kinks; measured ~0.018
+
+
+@pytest.fixture(scope="module")
+def surface():
+    return app.CompiledSuitabilitySurface.compile(app.FUZZY_ENGINE)
+
+
+def test_surface_matches_engine_on_a_dense_ielts_grid(surface):
+    # CGPA step 0.025 and IELTS step 0.05 fall between the surface's grid points
+    cgpa, ielts, strict = np.meshgrid(np.linspace(0, 10, 401), np.linspace(0, 9, 181),
+                                      app.CompiledSuitabilitySurface.STRICTNESS_LEVELS, indexing="ij")
+    error = np.abs(surface.score(cgpa, ielts, strict) - app.FUZZY_ENGINE.score(cgpa, ielts, strict))
+    assert error.max() <= SURFACE_TOLERANCE
+    assert (error <= 0.005).mean() > 0.99          # and close almost everywhere else
+
+
+def test_surface_validation_and_round_trip(surface, tmp_path):
+    assert surface.validate(app.FUZZY_ENGINE) <= SURFACE_TOLERANCE
+    path = str(tmp_path / "surface.npz")
+    surface.save(path)
+    np.testing.assert_array_equal(app.CompiledSuitabilitySurface.load(path).values, surface.values)
@@ -0,0 +1,66 @@
+"""IngestionPipeline releases its pending slots and spool files on every path."""
+
+import os
+import sqlite3
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = app.IngestionPipeline(1, 1, 4)
+    yield pipeline
+    pipeline._extract.shutdown()
+    pipeline._forward.shutdown()
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "upload.pdf"
+    path.write_bytes(b"%PDF-1.4 not really")
+    return str(path)
+
+
+def _store_locked_on(monkeypatch, status):
+    real_set = app._store.set
+
+    def set_(session_id, payload):
+        if payload.get("status") == status:
+            raise sqlite3.OperationalError("database is locked")
+        real_set(session_id, payload)
+    monkeypatch.setattr(app._store, "set", set_)
+
+
+def _run(pipeline, session_id, upload):
+    pipeline._pending["extracting"] += 1  # as submit() does
+    pipeline._run_extract(session_id, upload, "upload.pdf", "application/pdf", {})
+
+
+@pytest.mark.parametrize("status", ["extracting", "forwarding"])
+def test_store_error_releases_stage(pipeline, upload, monkeypatch, status):
+    monkeypatch.setattr(app.IngestionPipeline, "_extract_with_retry",
+                        staticmethod(lambda session_id, path: "some text"))
+    monkeypatch.setattr(app, "LOCAL_EXTRACT_ENABLED", False)
+    _store_locked_on(monkeypatch, status)
+
+    _run(pipeline, "ingest-locked-" + status, upload)
+
+    assert pipeline._pending == {"extracting": 0, "forwarding": 0}
+    assert pipeline.stats()["failed"] == 1
+    assert not os.path.exists(upload)
+    assert app._store_get("ingest-locked-" + status)["status"] == "failed"
+
+
+def test_extraction_failure_releases_stage(pipeline, upload, monkeypatch):
+    def fail(session_id, path):
+        raise ValueError("unreadable PDF")
+    monkeypatch.setattr(app.IngestionPipeline, "_extract_with_retry", staticmethod(fail))
+
+    _run(pipeline, "ingest-bad-pdf", upload)
+
+    assert pipeline._pending == {"extracting": 0, "forwarding": 0}
+    assert pipeline.stats()["failed"] == 1
+    assert not os.path.exists(upload)
+    assert app._store_get("ingest-bad-pdf")["status"] == "failed"
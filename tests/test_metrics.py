@@ -0,0 +1,37 @@
+"""/api/metrics: value formatting and side-effect-free scrapes."""
+
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize("value, text", [
+    (3, "3"),
+    (2.5, "2.5"),
+    (float("nan"), "NaN"),
+    (float("inf"), "+Inf"),
+    (float("-inf"), "-Inf"),
+])
+def test_format_value(value, text):
+    assert app._format_value(value) == text
+
+
+def test_non_finite_gauges_render_in_prometheus_syntax():
+    registry = app.MetricsRegistry("t_")
+    registry.gauge("ratio", "A ratio.", lambda: float("nan"))
+    registry.gauge("limit", "A limit.", lambda: float("inf"))
+    text = registry.render()
+    assert "t_ratio NaN" in text and "t_limit +Inf" in text
+
+
+def test_scrape_does_not_load_the_dataset(monkeypatch):
+    manager = app.DatasetManager(app.DATASET_PATH, watch_interval=60)
+    monkeypatch.setattr(app, "DATASET", manager)
+    body = app.app.test_client().get("/api/metrics").get_data(as_text=True)
+    assert "resume_backend_dataset_programs 0" in body
+    assert manager._current is None
+    assert getattr(manager, "_watcher_pid", None) is None
+
+    manager.load()
+    body = app.app.test_client().get("/api/metrics").get_data(as_text=True)
+    assert f"resume_backend_dataset_programs {len(manager._current.df)}" in body
@@ -0,0 +1,142 @@
+"""N8nForwarder retry rules and the CircuitBreaker state machine."""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app
+
+
+class _N8n(BaseHTTPRequestHandler):
+    statuses: list = []
+    hits = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        cls = type(self)
+        status = cls.statuses[min(cls.hits, len(cls.statuses) - 1)]
+        cls.hits += 1
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def n8n():
+    handler = type("Handler", (_N8n,), {"statuses": [200], "hits": 0})
+    server  = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield handler, f"http://127.0.0.1:{server.server_port}/webhook"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4 test")
+    return str(path)
+
+
+def _forwarder(url, threshold=5, cooldown=30.0):
+    return app.N8nForwarder(url, max_connections=2, retries=2, backoff=0.001,
+                            connect_timeout=1, read_timeout=5,
+                            breaker=app.CircuitBreaker(threshold, cooldown))
+
+
+def _forward(forwarder, session_id, upload):
+    forwarder.forward(session_id, upload, "resume.pdf", "application/pdf", {}, "text")
+    return app._store_get(session_id)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retries_refusals(n8n, upload, status):
+    handler, url = n8n
+    handler.statuses = [status, 200]
+    forwarder = _forwarder(url)
+    app._store_set("fwd-retry", {"status": "forwarding"})
+
+    assert _forward(forwarder, "fwd-retry", upload)["status"] == "forwarding"  # awaiting callback
+    assert handler.hits == 2
+    assert forwarder.stats()["retries"] == 1
+
+
+@pytest.mark.parametrize("status", [500, 502, 504])
+def test_does_not_repeat_a_post_n8n_may_have_received(n8n, upload, status):
+    handler, url = n8n
+    handler.statuses = [status, 200]
+    forwarder = _forwarder(url)
+
+    entry = _forward(forwarder, "fwd-terminal", upload)
+    assert entry["status"] == "failed"
+    assert entry["error"] == f"n8n returned HTTP {status}"
+    assert handler.hits == 1
+    assert forwarder.stats()["retries"] == 0
+
+
+def test_gives_up_after_retries(n8n, upload):
+    handler, url = n8n
+    handler.statuses = [503]
+    forwarder = _forwarder(url)
+
+    assert _forward(forwarder, "fwd-exhausted", upload)["status"] == "failed"
+    assert handler.hits == 3
+
+
+def test_retries_refused_connections(upload):
+    forwarder = _forwarder("http://127.0.0.1:9/webhook")
+    assert _forward(forwarder, "fwd-refused", upload)["status"] == "failed"
+    assert forwarder.stats()["retries"] == 2
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = app.CircuitBreaker(threshold=2, cooldown=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()          # the single trial call
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats()["consecutive_failures"] == 0
+
+
+def test_failed_trial_reopens():
+    breaker = app.CircuitBreaker(threshold=5, cooldown=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_released_trial_lets_the_next_call_try():
+    breaker = app.CircuitBreaker(threshold=1, cooldown=0.0)
+    breaker.record_failure()
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_open_circuit_fails_sessions_without_a_request(n8n, upload):
+    handler, url = n8n
+    handler.statuses = [500]
+    forwarder = _forwarder(url, threshold=1)
+
+    _forward(forwarder, "fwd-trip", upload)
+    entry = _forward(forwarder, "fwd-short", upload)
+    assert entry["status"] == "failed"
+    assert entry["error"] == "n8n is unavailable, please retry later."
+    assert handler.hits == 1
+    assert forwarder.stats()["short_circuited"] == 1
@@ -0,0 +1,62 @@
+"""What extraction does when an OCR worker process dies."""
+
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import app
+from benchmark import build_pdf
+
+
+class _CrashingPool:
+    """Stands in for OcrWorkerPool; the first ``crashes`` calls lose a worker."""
+
+    workers = 1
+
+    def __init__(self, crashes: int):
+        self.crashes = crashes
+        self.calls   = 0
+
+    def ocr_pages(self, source, page_groups):
+        self.calls += 1
+        if self.calls <= self.crashes:
+            raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+        return {n: f"page {n} text" for group in page_groups for n in group}
+
+
+@pytest.fixture
+def scanned_pdf(monkeypatch):
+    def in_process(*args):
+        raise AssertionError("OCR ran in the web process")
+    monkeypatch.setattr(app, "_ocr_page", in_process)
+    return build_pdf([("scan", 1), ("scan", 2)])
+
+
+def test_resubmits_once_to_the_restarted_pool(monkeypatch, scanned_pdf):
+    pool = _CrashingPool(crashes=1)
+    monkeypatch.setattr(app, "OCR_POOL", pool)
+    assert app.extract_text_from_pdf_bytes(scanned_pdf) == "page 1 text\n\npage 2 text"
+    assert pool.calls == 2
+
+
+def test_gives_up_when_the_document_crashes_it_again(monkeypatch, scanned_pdf):
+    pool = _CrashingPool(crashes=2)
+    monkeypatch.setattr(app, "OCR_POOL", pool)
+    with pytest.raises(app.OcrWorkerCrashed):
+        app.extract_text_from_pdf_bytes(scanned_pdf)
+    assert pool.calls == 2
+
+
+def test_session_fails_with_a_clear_error(monkeypatch, scanned_pdf, tmp_path):
+    monkeypatch.setattr(app, "OCR_POOL", _CrashingPool(crashes=2))
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(scanned_pdf)
+    pipeline = app.IngestionPipeline(1, 1, 4)
+    pipeline._pending["extracting"] += 1
+
+    pipeline._run_extract("ocr-crash", str(path), "scan.pdf", "application/pdf", {})
+
+    entry = app._store_get("ocr-crash")
+    assert entry["status"] == "failed"
+    assert entry["error"].startswith("OCR crashed on this document")
+    assert pipeline._pending["extracting"] == 0
@@ -0,0 +1,62 @@
+"""recommend_programmes: field-of-study queries, ranking and paging."""
+
+import numpy as np
+import pytest
+
+import app
+
+
+def _recommend(field_query):
+    return app.recommend_programmes(app.DATASET.current, 8.5, 7.0, "Master", field_query, {}, 5, 0)
+
+
+@pytest.mark.parametrize("field_query", ["the", "-", "of the", "  "])
+def test_query_without_terms_is_ignored(field_query):
+    response = _recommend(field_query)
+    assert response["recommendations"] == _recommend("")["recommendations"]
+    assert response["total"] > 0
+    assert "field_of_study" not in response
+
+
+def test_query_narrows_results():
+    response = _recommend("computer science")
+    assert 0 < response["total"] < _recommend("")["total"]
+    assert response["field_of_study"] == "computer science"
+
+
+# ---------------------------------------------------------------------------
+# Ranking and paging
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("k", [1, 7, 50, 200, 300])
+def test_rank_top_k_matches_a_full_stable_sort(seed, k):
+    rng = np.random.default_rng(seed)
+    scores   = rng.integers(0, 6, 200) / 10          # few distinct values: many ties at the k-th score
+    tiebreak = rng.permutation(200) + 1000
+    expected = sorted(range(200), key=lambda i: (-scores[i], tiebreak[i]))[:k]
+    assert app.rank_top_k(scores, tiebreak, k).tolist() == expected
+
+
+def test_rank_top_k_keeps_row_order_when_tiebreaks_repeat():
+    scores   = np.array([0.5, 0.7, 0.5, 0.7, 0.5])
+    tiebreak = np.array([1, 2, 1, 2, 1])
+    assert app.rank_top_k(scores, tiebreak, 4).tolist() == [1, 3, 0, 2]
+
+
+@pytest.mark.parametrize("field_query", ["", "computer science"])
+def test_pages_follow_one_order_without_overlap(field_query):
+    snapshot = app.DATASET.current
+    full = app.recommend_programmes(snapshot, 7.2, 6.5, "Master", field_query, {}, 10_000, 0)
+    rows = full["recommendations"]
+    assert len(rows) == full["total"] > 50
+    if not field_query:
+        assert rows == sorted(rows, key=lambda r: (-r["suitability_score"], r["course_id"]))
+
+    paged = []
+    for offset in range(0, full["total"], 25):
+        page = app.recommend_programmes(snapshot, 7.2, 6.5, "Master", field_query, {}, 25, offset)
+        assert page["total"] == full["total"] and len(page["recommendations"]) <= 25
+        paged += page["recommendations"]
+    assert [r["course_id"] for r in paged] == [r["course_id"] for r in rows]
+    assert len({r["course_id"] for r in paged}) == len(paged)
@@ -0,0 +1,134 @@
+"""ResumeFieldExtractor on CV snippets, and when the fast path may use it."""
+
+import io
+
+import pytest
+
+import app
+from benchmark import build_pdf
+
+NF = app.ResumeFieldExtractor.NOT_FOUND
+
+CVS = {
+    "ielts_overall": (
+        """Priya Sharma
+EDUCATION
+Bachelor of Technology in Computer Science, IIT Delhi    2016 - 2020
+CGPA: 8.7/10
+TEST SCORES
+IELTS: Overall 7.5 (L 8.0, R 7.5, W 6.5, S 7.0)
+EXPERIENCE
+Software Engineer, Infosys 2020 - 2023
+""",
+        {"cgpa": "8.7", "degree": "Bachelor of Technology in Computer Science",
+         "year_of_education": "2020", "ielts_score": "7.5", "toefl_score": NF},
+    ),
+    "toefl_with_sections": (
+        """John Doe
+Education
+Master of Science in Data Science, University of Leeds, graduated 2021
+GPA 3.6 / 4.0
+Skills
+Python, SQL
+TOEFL iBT 105 (Reading 27, Listening 26, Speaking 25, Writing 27)
+""",
+        {"cgpa": "3.6", "degree": "Master of Science in Data Science",
+         "year_of_education": "2021", "ielts_score": NF, "toefl_score": "105"},
+    ),
+    "intent_is_not_a_degree": (
+        """Objective
+Seeking a Master of Science in Robotics.
+Education
+Bachelor of Engineering in Electronics, 2022
+CGPA: 9.1/10
+IELTS band 8
+""",
+        {"cgpa": "9.1", "degree": "Bachelor of Engineering in Electronics",
+         "year_of_education": "2022", "ielts_score": "8", "toefl_score": NF},
+    ),
+    "no_test": (
+        """Education
+B.E. in Mechanical Engineering, Anna University, 2019
+CGPA 7.9 / 10
+Experience
+Design engineer
+""",
+        {"cgpa": "7.9", "degree": "B.E. in Mechanical Engineering",
+         "year_of_education": "2019", "ielts_score": NF, "toefl_score": NF},
+    ),
+    "test_without_score": (
+        """Education
+B.Sc in Physics, 2020
+CGPA 8.2/10
+IELTS: awaiting result
+""",
+        {"cgpa": "8.2", "degree": "B.Sc in Physics",
+         "year_of_education": "2020", "ielts_score": NF, "toefl_score": NF},
+    ),
+    "no_grades": (
+        """Education
+Bachelor of Arts in History, 2018
+Experience
+Teacher
+IELTS 6.5
+""",
+        {"cgpa": NF, "degree": "Bachelor of Arts in History",
+         "year_of_education": "2018", "ielts_score": "6.5", "toefl_score": NF},
+    ),
+}
+
+
+@pytest.mark.parametrize("name", CVS)
+def test_fields(name):
+    text, expected = CVS[name]
+    assert app.RESUME_EXTRACTOR.extract(text)["fields"] == expected
+
+
+def test_gpa_is_normalised_to_ten():
+    result = app.RESUME_EXTRACTOR.extract(CVS["toefl_with_sections"][0])
+    assert result["cgpa_scale"] == 4.0
+    assert result["fuzzy_input"] == {"cgpa": 9.0, "ielts_score": 105.0}
+
+
+@pytest.mark.parametrize("name", ["ielts_overall", "toefl_with_sections", "intent_is_not_a_degree"])
+def test_complete_profiles_are_confident(name):
+    assert app.RESUME_EXTRACTOR.extract(CVS[name][0])["overall"] >= app.LOCAL_EXTRACT_CONFIDENCE
+
+
+@pytest.mark.parametrize("name", ["no_test", "test_without_score", "no_grades"])
+def test_missing_fuzzy_input_is_not_confident(name):
+    result = app.RESUME_EXTRACTOR.extract(CVS[name][0])
+    assert None in result["fuzzy_input"].values()
+    assert result["overall"] == 0.0
+
+
+def test_resume_without_test_goes_to_n8n():
+    session_id = "extractor-no-test"
+    app._store_set(session_id, {"status": "extracting"})
+    assert not app.INGESTION._complete_locally(session_id, CVS["no_test"][0], {})
+    assert app._store_get(session_id)["status"] == "extracting"
+
+
+def test_fast_path_applies_location_and_language(monkeypatch):
+    monkeypatch.setattr(app, "LOCAL_EXTRACT_ENABLED", True)
+    client = app.app.test_client()
+    pdf = build_pdf([("text", CVS["ielts_overall"][0].splitlines())])
+    resp = client.post("/api/submit-preferences", data={
+        "sessionId":      "extractor-fast-path-filters",
+        "degreeLevel":    "Master",
+        "location":       "Munich, Bavaria",
+        "courseLanguage": "english",
+        "resume":         (io.BytesIO(pdf), "resume.pdf"),
+    }, content_type="multipart/form-data")
+    assert resp.status_code == 202
+
+    for _ in range(20):
+        entry = client.get("/api/status/extractor-fast-path-filters?wait=5").get_json()
+        if entry["status"] in app.TERMINAL_STATUSES:
+            break
+    assert entry["status"] == "completed"
+    data = entry["data"]
+    assert data["source"] == "local"
+    assert data["filters"] == {"city": ["munich"], "teaching_language": ["english"]}
+    assert data["recommendations"]
+    assert {r["city"] for r in data["recommendations"]} == {"Munich"}
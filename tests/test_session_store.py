@@ -0,0 +1,135 @@
+"""Session backends: TTL expiry, eviction order and cross-connection reads."""
+
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+import app
+
+
+# ---------------------------------------------------------------------------
+# MemorySessionStore
+# ---------------------------------------------------------------------------
+
+def _memory(max_entries=3, ttl=timedelta(minutes=5)):
+    return app.MemorySessionStore(ttl, max_entries, shards=1)
+
+
+def test_memory_ttl_expiry():
+    store = _memory(ttl=timedelta(milliseconds=50))
+    store.set("s", {"status": "queued"})
+    assert store.get("s")["status"] == "queued"
+    time.sleep(0.06)
+    assert store.get("s") is None
+    assert store.reap() == 1
+    assert len(store) == 0 and store.stats()["expired"] == 1
+
+
+def test_memory_ttl_counts_from_creation():
+    store = _memory(ttl=timedelta(milliseconds=80))
+    store.set("s", {"status": "queued"})
+    time.sleep(0.05)
+    store.set("s", {"status": "extracting"})       # an update does not extend the TTL
+    time.sleep(0.04)
+    assert store.get("s") is None
+
+
+def test_memory_evicts_least_recently_used():
+    store = _memory(max_entries=3)
+    for sid in "abc":
+        store.set(sid, {"status": "queued"})
+    store.get("a")                                  # reads count as use
+    store.set("d", {"status": "queued"})
+    assert store.get("b") is None
+    assert all(store.get(sid) for sid in "acd")
+    assert store.stats()["evicted"] == 1
+
+
+def test_memory_set_merges_and_stamps():
+    store = _memory()
+    store.set("s", {"status": "queued", "data": None})
+    created = store.get("s")["created_at"]
+    store.set("s", {"status": "completed"})
+    entry = store.get("s")
+    assert entry["status"] == "completed" and "data" in entry
+    assert entry["created_at"] == created and entry["updated_at"] >= created
+
+
+def test_memory_expiry_heap_is_bounded_by_the_cap():
+    store = _memory(max_entries=10)
+    for i in range(5000):
+        store.set(f"s{i}", {"status": "queued"})
+    assert len(store) == 10
+    assert len(store._expiry[0]) <= 2 * store.shard_cap
+
+
+def test_memory_reap_skips_evicted_sessions():
+    store = _memory(max_entries=2, ttl=timedelta(milliseconds=50))
+    for sid in "abc":
+        store.set(sid, {"status": "queued"})
+    time.sleep(0.06)
+    assert store.reap() == 2                        # "a" was evicted, not expired
+    assert store.stats()["evicted"] == 1
+
+
+# ---------------------------------------------------------------------------
+# SqliteSessionStore
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def _sqlite(path, max_entries=100, ttl=timedelta(minutes=5)):
+    return app.SqliteSessionStore(path, ttl, max_entries)
+
+
+def test_sqlite_ttl_expiry(db_path):
+    store = _sqlite(db_path, ttl=timedelta(milliseconds=50))
+    store.set("s", {"status": "queued"})
+    assert store.get("s")["status"] == "queued"
+    time.sleep(0.06)
+    assert store.get("s") is None and len(store) == 0
+    assert store.reap() == 1
+
+
+def test_sqlite_reap_trims_least_recently_updated(db_path):
+    store = _sqlite(db_path, max_entries=2)
+    for sid in "abc":
+        store.set(sid, {"status": "queued"})
+        time.sleep(0.002)
+    store.set("a", {"status": "completed"})         # "b" is now the oldest update
+    store.reap()
+    assert store.get("b") is None
+    assert store.get("a")["status"] == "completed" and store.get("c") is not None
+
+
+def test_sqlite_writes_are_visible_to_other_connections(db_path):
+    writer, reader = _sqlite(db_path), _sqlite(db_path)
+    writer.set("s", {"status": "queued"})
+    assert reader.get("s")["status"] == "queued"
+
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(writer.get("s")))  # own connection
+    writer.set("s", {"status": "completed", "data": {"ok": True}})
+    thread.start()
+    thread.join()
+    assert seen[0]["status"] == "completed" and seen[0]["data"] == {"ok": True}
+    assert reader.get("s")["data"] == {"ok": True}
+
+
+def test_sqlite_reads_do_not_wait_for_an_open_write(db_path):
+    writer, reader = _sqlite(db_path), _sqlite(db_path)
+    writer.set("s", {"status": "queued"})
+    conn = writer._conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("UPDATE sessions SET data = '{\"status\": \"failed\"}'")
+        started = time.perf_counter()
+        assert reader.get("s")["status"] == "queued"    # WAL: the last committed state
+        assert time.perf_counter() - started < 1.0
+    finally:
+        conn.execute("ROLLBACK")
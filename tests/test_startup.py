@@ -0,0 +1,18 @@
+"""Importing app.py must stay cheap: OCR backends load on first use."""
+
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+HEAVY = ["pytesseract", "easyocr", "torch", "pdf2image"]
+
+
+def test_import_does_not_load_ocr_backends():
+    code = f"import json, sys, app; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    env  = {**os.environ, "APP_PRELOAD": "0"}
+    out  = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                          capture_output=True, text=True).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == []
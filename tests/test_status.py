@@ -0,0 +1,112 @@
+"""Long-poll and Server-Sent Events on /api/status/<id>."""
+
+import json
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def _later(delay, *updates):
+    """Write ``updates`` (session_id, payload) to the store from another thread after ``delay``."""
+    def run():
+        for session_id, payload in updates:
+            time.sleep(delay)
+            app._store_set(session_id, payload)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_wait_returns_as_soon_as_the_status_changes(client):
+    app._store_set("poll-wake", {"status": "extracting"})
+    writer = _later(0.2, ("poll-wake", {"status": "completed", "data": {"ok": True}}))
+    started = time.monotonic()
+    resp = client.get("/api/status/poll-wake?wait=10")
+    writer.join()
+    assert time.monotonic() - started < 2
+    assert resp.status_code == 200
+    assert resp.get_json()["status"] == "completed"
+
+
+def test_wait_times_out_with_the_current_status(client):
+    app._store_set("poll-timeout", {"status": "forwarding"})
+    started = time.monotonic()
+    resp = client.get("/api/status/poll-timeout?wait=0.3")
+    elapsed = time.monotonic() - started
+    assert 0.25 < elapsed < 2
+    assert resp.status_code == 202
+    assert resp.get_json()["status"] == "forwarding"
+
+
+def test_final_status_is_returned_without_waiting(client):
+    app._store_set("poll-final", {"status": "failed", "error": "nope"})
+    started = time.monotonic()
+    resp = client.get("/api/status/poll-final?wait=10")
+    assert time.monotonic() - started < 1
+    assert resp.status_code == 200 and resp.get_json()["error"] == "nope"
+
+
+@pytest.mark.parametrize("wait", ["nan", "inf", "soon"])
+def test_bad_wait_is_rejected(client, wait):
+    app._store_set("poll-bad", {"status": "queued"})
+    assert client.get(f"/api/status/poll-bad?wait={wait}").status_code == 400
+
+
+def test_unknown_session(client):
+    assert client.get("/api/status/no-such-session?wait=1").status_code == 404
+    assert client.get("/api/status/no-such-session/events").status_code == 404
+
+
+def _events(body: str) -> list:
+    return [json.loads(block.split("data: ", 1)[1]) for block in body.split("\n\n")
+            if block.startswith("event: status")]
+
+
+def test_events_stream_until_a_final_status(client, monkeypatch):
+    monkeypatch.setattr(app, "STATUS_KEEPALIVE_SECONDS", 0.1)
+    app._store_set("sse-final", {"status": "extracting"})
+    writer = _later(0.25, ("sse-final", {"status": "forwarding"}),
+                    ("sse-final", {"status": "completed", "data": {"ok": True}}))
+    resp = client.get("/api/status/sse-final/events")
+    assert resp.mimetype == "text/event-stream"
+    body = resp.get_data(as_text=True)    # returns once the stream closes
+    writer.join()
+    assert [e["status"] for e in _events(body)] == ["extracting", "forwarding", "completed"]
+    assert ": keep-alive" in body
+
+
+def test_events_stream_closes_after_the_maximum_duration(client, monkeypatch):
+    monkeypatch.setattr(app, "STATUS_KEEPALIVE_SECONDS", 0.1)
+    monkeypatch.setattr(app, "STATUS_STREAM_MAX_SECONDS", 0.3)
+    app._store_set("sse-timeout", {"status": "forwarding"})
+    started = time.monotonic()
+    body = client.get("/api/status/sse-timeout/events").get_data(as_text=True)
+    assert time.monotonic() - started < 2
+    assert [e["status"] for e in _events(body)] == ["forwarding"]
+
+
+def test_writes_from_another_process_are_seen_on_the_next_poll(tmp_path):
+    # A second store on the same database stands in for another worker:
+    # its writes do not notify this process's waiters
+    ours   = app.SqliteSessionStore(str(tmp_path / "s.db"), timedelta(minutes=5), 100)
+    theirs = app.SqliteSessionStore(str(tmp_path / "s.db"), timedelta(minutes=5), 100)
+    ours.set("x", {"status": "forwarding"})
+    notifier = app.SessionNotifier(poll_interval=0.2)
+
+    def check():
+        entry = ours.get("x")
+        return entry if entry["status"] != "forwarding" else None
+
+    threading.Timer(0.1, theirs.set, ("x", {"status": "completed"})).start()
+    started = time.monotonic()
+    assert notifier.wait_for("x", check, timeout=5)["status"] == "completed"
+    assert 0.15 < time.monotonic() - started < 1